@@ -1,16 +1,51 @@
-from fastapi import APIRouter, HTTPException
-from datetime import datetime
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import StreamingResponse, PlainTextResponse
+from pydantic import BaseModel
+from typing import Any, AsyncIterator, Dict, List, Literal, Optional
+import json
 import time
 
 from app.models import (
     HealthResponse,
     ScrapeRequest,
     ScrapeResponse,
-    ScrapeResult,
-    Interactions
+    StreamScrapeRequest,
+    CrawlRequest,
+    BatchScrapeRequest,
+    BatchScrapeResponse,
+    BatchItemResult,
+    JobResponse,
+    ProfileOverride,
+    DomainProfileResponse,
+    ConsentCaptureRequest,
+    StorageStateResponse,
+    StatsResponse,
+    BrowserPoolStats,
+    HTTPClientStats,
+    RateLimiterStats,
+    CacheStats,
+    ParseExecutorStats,
+    AdmissionStats
 )
 from app.services.scraping_service import ScrapingService
+from app.services.batch_service import BatchScrapingService
+from app.services.crawl_service import CrawlService
+from app.services.job_service import job_manager
+from app.services.domain_profiles import domain_profiles
+from app.services.metrics import metrics
+from app.services.snapshots import snapshots
+from app.services.storage_states import storage_states
+from app.services.admission import admission, AdmissionRejected
+from app.api.responses import FastJSONResponse
 from app.scraper.utils import URLUtils
+from app.scraper.projection import Projection
+from app.scraper.browser_pool import browser_pool
+from app.scraper.js_scraper import JSScraper
+from app.scraper.http_client import http_client
+from app.scraper.rate_limiter import rate_limiter
+from app.services.cache import result_cache
+from app.scraper.executor import parse_executor
+from app.config import settings
 
 router = APIRouter()
 
@@ -20,48 +55,363 @@ async def health_check():
     return HealthResponse()
 
 
+@router.get("/metrics", response_class=PlainTextResponse)
+async def get_metrics():
+    """Prometheus text exposition format"""
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+
+@router.get("/stats", response_model=StatsResponse)
+async def get_stats():
+    return StatsResponse(
+        browser_pool=BrowserPoolStats(**browser_pool.stats()),
+        http_client=HTTPClientStats(**http_client.stats()),
+        rate_limiter=RateLimiterStats(**rate_limiter.stats()),
+        cache=CacheStats(**result_cache.stats()),
+        parse_executor=ParseExecutorStats(**parse_executor.stats()),
+        admission={kind: AdmissionStats(**stats) for kind, stats in admission.stats().items()}
+    )
+
+
 @router.post("/scrape", response_model=ScrapeResponse)
 async def scrape_url(request: ScrapeRequest):
     start_time = time.time()
 
+    service = ScrapingService(mode=request.mode)
+
     # ✅ Validate URL
-    is_valid, error_message = URLUtils.validate_url(request.url)
+    with service.timings.phase("validate"):
+        is_valid, error_message = URLUtils.validate_url(request.url)
     if not is_valid:
         raise HTTPException(status_code=400, detail=error_message)
 
+    since = await _since_snapshot(request.since, request.url) if request.since else None
+    projection = _projection(
+        request.fields,
+        request.include_raw_html,
+        since["fingerprint"] if since else None
+    )
+    service.projection = projection
+
     try:
     
         normalized_url = URLUtils.normalize_url(request.url)
 
-      
-        service = ScrapingService()
-
        
-        result = await service.scrape(normalized_url)
+        result = await service.scrape(
+            normalized_url,
+            use_cache=request.use_cache,
+            cache_ttl=request.cache_ttl
+        )
 
         processing_time = time.time() - start_time
 
-        return ScrapeResponse(
-    result=ScrapeResult(
-        url=normalized_url,
-        scrapedAt=datetime.utcnow().isoformat(),  
-        meta=result.get("meta"),
-        sections=result.get("sections", []),
-       interactions=Interactions(
-    clicks=result.get("interactions", {}).get("clicks", []),
-    scrolls=result.get("interactions", {}).get("scrolls", 0),
-    pages=result.get("interactions", {}).get("pages", [])
-),
-
-        errors=service.errors
-    ),
-    strategy=result.get("strategy", "static"),
-    processing_time=processing_time
-)
+        response = service.build_response(
+            normalized_url,
+            result,
+            processing_time,
+            include_timings=request.include_timings
+        )
+        await snapshots.track(normalized_url, result, response, since)
+
+        return FastJSONResponse(
+            response,
+            include=Projection.nest(ScrapeResponse, "result", projection.include())
+        )
 
+    except AdmissionRejected as e:
+        raise _overloaded(e)
 
     except Exception as e:
         raise HTTPException(
             status_code=500,
             detail=f"Scraping failed: {str(e)}"
         )
+
+
+@router.post("/scrape/stream")
+async def scrape_stream(request: StreamScrapeRequest):
+    return await _stream_response(request)
+
+
+@router.get("/scrape/stream")
+async def scrape_stream_get(
+    url: str,
+    mode: Optional[Literal["adaptive", "static", "js"]] = None,
+    use_cache: bool = True,
+    cache_ttl: Optional[int] = None,
+    format: Literal["ndjson", "sse"] = "sse",
+    fields: Optional[List[str]] = Query(default=None),
+    include_raw_html: bool = True,
+    since: Optional[str] = None,
+):
+    # GET variant for EventSource, which cannot send a body
+    return await _stream_response(
+        StreamScrapeRequest(
+            url=url,
+            mode=mode,
+            use_cache=use_cache,
+            cache_ttl=cache_ttl,
+            format=format,
+            fields=fields,
+            include_raw_html=include_raw_html,
+            since=since
+        )
+    )
+
+
+async def _stream_response(request: StreamScrapeRequest) -> StreamingResponse:
+    is_valid, error_message = URLUtils.validate_url(request.url)
+    if not is_valid:
+        raise HTTPException(status_code=400, detail=error_message)
+
+    since = await _since_snapshot(request.since, request.url) if request.since else None
+    projection = _projection(
+        request.fields,
+        request.include_raw_html,
+        since["fingerprint"] if since else None
+    )
+
+    # Rejections after the stream has started can only be reported in-stream
+    try:
+        admission.check("static")
+    except AdmissionRejected as e:
+        raise _overloaded(e)
+
+    if request.format == "sse":
+        media_type = "text/event-stream"
+    else:
+        media_type = "application/x-ndjson"
+
+    return StreamingResponse(
+        _stream_events(request, projection, since),
+        media_type=media_type,
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+async def _stream_events(
+    request: StreamScrapeRequest,
+    projection: Projection,
+    since: Optional[Dict[str, Any]] = None,
+) -> AsyncIterator[str]:
+    """
+    Meta first, then each section as soon as it is built, then interactions, errors
+    and end. Events for result fields the projection leaves out are skipped.
+
+    Given the since snapshot, only added and modified sections are sent and
+    end carries the changes; end also carries the snapshot id to pass as
+    since next time.
+    """
+    start_time = time.time()
+
+    normalized_url = URLUtils.normalize_url(request.url)
+    service = ScrapingService(mode=request.mode, projection=projection)
+    fields = {"meta": "meta", "section": "sections", "interactions": "interactions", "errors": "errors"}
+    previous = dict(since["sections"]) if since else {}
+    sections = []  # [section id, fingerprint] of every section, sent or not
+
+    try:
+        async for event, data in service.scrape_stream(
+            normalized_url,
+            use_cache=request.use_cache,
+            cache_ttl=request.cache_ttl
+        ):
+            if event == "end":
+                fingerprint = data.pop("fingerprint")
+                unchanged = data.pop("unchanged")
+                snapshot, changes = await snapshots.track_stream(normalized_url, fingerprint, unchanged, sections, since)
+                data = {
+                    **data,
+                    "url": normalized_url,
+                    "processing_time": time.time() - start_time,
+                    "snapshot": snapshot,
+                    "changes": changes.model_dump(mode="json") if changes else None
+                }
+                yield _format_event(request.format, event, data)
+                continue
+
+            if event == "section":
+                sections.append([data.id, data.fingerprint])
+                # The client already has this version of the section
+                if previous.get(data.id) == data.fingerprint:
+                    continue
+
+            if projection.wants(fields[event]):
+                yield _format_event(request.format, event, data, projection.include(fields[event]))
+
+    except Exception as e:
+        # Headers are already sent, so failures are reported in-stream
+        yield _format_event(request.format, "error", {"detail": f"Scraping failed: {str(e)}"})
+
+
+def _format_event(format: str, event: str, data: Any, include: Optional[Dict[str, Any]] = None) -> str:
+    if isinstance(data, BaseModel):
+        data = data.model_dump(mode="json", include=include)
+    elif isinstance(data, list):
+        data = [item.model_dump(mode="json", include=include) if isinstance(item, BaseModel) else item for item in data]
+
+    if format == "sse":
+        return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+    return json.dumps({"event": event, "data": data}) + "\n"
+
+
+@router.post("/scrape/batch", response_model=BatchScrapeResponse)
+async def scrape_batch(request: BatchScrapeRequest):
+    if len(request.urls) > settings.BATCH_MAX_URLS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"A batch can contain at most {settings.BATCH_MAX_URLS} URLs"
+        )
+
+    projection = _projection(request.fields, request.include_raw_html)
+
+    return FastJSONResponse(
+        await BatchScrapingService().scrape(request),
+        include=Projection.nest(
+            BatchScrapeResponse,
+            "results",
+            Projection.nest(BatchItemResult, "result", projection.include())
+        )
+    )
+
+
+@router.post("/crawl", response_model=ScrapeResponse)
+async def crawl(request: CrawlRequest):
+    is_valid, error_message = URLUtils.validate_url(request.url)
+    if not is_valid:
+        raise HTTPException(status_code=400, detail=error_message)
+
+    if request.max_pages is not None and request.max_pages > settings.CRAWL_MAX_PAGES_LIMIT:
+        raise HTTPException(
+            status_code=400,
+            detail=f"A crawl can fetch at most {settings.CRAWL_MAX_PAGES_LIMIT} pages"
+        )
+
+    return FastJSONResponse(await CrawlService(request).crawl())
+
+
+@router.post("/jobs", response_model=JobResponse, status_code=202)
+async def create_job(request: ScrapeRequest):
+    is_valid, error_message = URLUtils.validate_url(request.url)
+    if not is_valid:
+        raise HTTPException(status_code=400, detail=error_message)
+
+    _projection(request.fields, request.include_raw_html)
+    if request.since:
+        await _since_snapshot(request.since, request.url)
+
+    return await job_manager.submit(request)
+
+
+@router.get("/jobs/{job_id}", response_model=JobResponse)
+async def get_job(job_id: str):
+    job, include = await job_manager.get_projected(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return FastJSONResponse(job, include=include)
+
+
+@router.delete("/jobs/{job_id}", response_model=JobResponse)
+async def cancel_job(job_id: str):
+    job = await job_manager.cancel(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    if job.status != "cancelled":
+        raise HTTPException(status_code=409, detail=f"Job already {job.status}")
+    return job
+
+
+@router.get("/profiles/{domain}", response_model=DomainProfileResponse)
+async def get_profile(domain: str):
+    profile = domain_profiles.get(domain_profiles.normalize_domain(domain))
+    if profile is None:
+        raise HTTPException(status_code=404, detail="No profile for this domain")
+    return profile.describe()
+
+
+@router.put("/profiles/{domain}/override", response_model=DomainProfileResponse)
+async def set_profile_override(domain: str, override: ProfileOverride):
+    profile = await domain_profiles.set_override(
+        domain_profiles.normalize_domain(domain),
+        strategy=override.strategy,
+        scroll=override.scroll,
+        click=override.click
+    )
+    return profile.describe()
+
+
+@router.delete("/profiles/{domain}", status_code=204)
+async def reset_profile(domain: str):
+    if not await domain_profiles.reset(domain_profiles.normalize_domain(domain)):
+        raise HTTPException(status_code=404, detail="No profile for this domain")
+
+
+@router.post("/storage-states/consent", response_model=StorageStateResponse)
+async def capture_consent(request: ConsentCaptureRequest):
+    """Accept a page's consent banner once; later renders of its domain start accepted"""
+    if not settings.STORAGE_STATES_ENABLED:
+        raise HTTPException(status_code=400, detail="Storage states are disabled")
+
+    is_valid, error_message = URLUtils.validate_url(request.url)
+    if not is_valid:
+        raise HTTPException(status_code=400, detail=error_message)
+
+    url = URLUtils.normalize_url(request.url)
+    scraper = JSScraper(url, scroll=False, click=False)
+    try:
+        accepted = await scraper.accept_consent(
+            [request.selector] if request.selector else settings.CONSENT_ACCEPT_SELECTORS
+        )
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Consent capture failed: {str(e)}")
+
+    if accepted is None:
+        raise HTTPException(status_code=400, detail="No consent button found on the page")
+
+    await storage_states.save(url, scraper.storage_state, consent=True)
+    state = storage_states.describe(domain_profiles.domain_for(url))
+    if state is None:
+        raise HTTPException(status_code=500, detail="Consent state could not be stored")
+    return StorageStateResponse(**state, accepted_with=accepted)
+
+
+@router.get("/storage-states/{domain}", response_model=StorageStateResponse)
+async def get_storage_state(domain: str):
+    state = storage_states.describe(domain_profiles.normalize_domain(domain))
+    if state is None:
+        raise HTTPException(status_code=404, detail="No storage state for this domain")
+    return state
+
+
+@router.delete("/storage-states/{domain}", status_code=204)
+async def delete_storage_state(domain: str):
+    if not await storage_states.delete(domain_profiles.normalize_domain(domain)):
+        raise HTTPException(status_code=404, detail="No storage state for this domain")
+
+
+def _overloaded(e: AdmissionRejected) -> HTTPException:
+    return HTTPException(status_code=e.status_code, detail=str(e), headers={"Retry-After": str(e.retry_after)})
+
+
+def _projection(
+    fields: Optional[List[str]],
+    include_raw_html: bool,
+    known_fingerprint: Optional[str] = None,
+) -> Projection:
+    try:
+        return Projection(fields, include_raw_html, known_fingerprint)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+async def _since_snapshot(snapshot_id: str, url: str) -> Dict[str, Any]:
+    if not settings.SNAPSHOTS_ENABLED:
+        raise HTTPException(status_code=400, detail="Snapshots are disabled")
+
+    snapshot = await snapshots.get(snapshot_id)
+    if snapshot is None:
+        raise HTTPException(status_code=404, detail="Snapshot not found")
+    if snapshot["url"] != URLUtils.canonicalize_url(URLUtils.normalize_url(url)):
+        raise HTTPException(status_code=400, detail="Snapshot is for a different URL")
+    return snapshot
@@ -13,20 +13,223 @@ class Settings(BaseSettings):
     PLAYWRIGHT_TIMEOUT: int = 30000
     MAX_SECTIONS: int = 50
     MAX_RAW_HTML_LENGTH: int = 10000
+    PARSER_BACKEND: str = "selectolax"  # "selectolax" or "bs4"
+    # True: sections only hold content not inside a nested section, and
+    # ancestors fully covered by their children are dropped.
+    # False: ancestor sections repeat the content of their nested sections.
+    DROP_COVERED_SECTIONS: bool = True
+    PARSE_WORKERS: int = 2  # Parser processes; 0 parses everything on the event loop
+    PARSE_INLINE_THRESHOLD: int = 200_000  # Documents smaller than this (chars) are parsed inline
+    # Static downloads are streamed: bodies over STREAM_PARSE_THRESHOLD bytes
+    # are parsed chunk by chunk as they arrive instead of being buffered, and
+    # the download stops at MAX_DOCUMENT_BYTES (the result is marked truncated)
+    MAX_DOCUMENT_BYTES: int = 20 * 1024 * 1024
+    STREAM_PARSE_THRESHOLD: int = 2 * 1024 * 1024
+    STREAM_SECTION_BUFFER: int = 4  # Streamed sections built ahead of a slow client
+    # Content types the static scraper parses; a response without one is accepted
+    HTML_CONTENT_TYPES: list = ["text/html", "application/xhtml+xml"]
+    
+    # Strategy selection: "adaptive" (static first, escalate to JS), "static" or "js"
+    SCRAPE_MODE: str = "adaptive"
+    SPA_ROOT_SELECTORS: list = [
+        '#root',
+        '#app',
+        '#__next',
+        '#__nuxt',
+        '[data-reactroot]',
+        'app-root'
+    ]
     
     # JavaScript rendering settings
     USE_JS_THRESHOLD: int = 100  # Min characters to consider static content sufficient
     WAIT_FOR_NETWORK_IDLE: bool = True
     WAIT_FOR_SELECTOR_TIMEOUT: int = 5000
     
+    # Request blocking for JS renders (the main document is never blocked)
+    BLOCK_RESOURCES: bool = True
+    BLOCK_RESOURCE_TYPES: list = ["image", "media", "font"]
+    BLOCK_STYLESHEETS: bool = False  # Layout-dependent pages may need CSS to render
+    BLOCKED_DOMAINS: list = [  # Matched against the host and its parent domains
+        'doubleclick.net',
+        'googlesyndication.com',
+        'googleadservices.com',
+        'google-analytics.com',
+        'googletagmanager.com',
+        'googletagservices.com',
+        'adservice.google.com',
+        'facebook.net',
+        'connect.facebook.net',
+        'scorecardresearch.com',
+        'hotjar.com',
+        'segment.io',
+        'segment.com',
+        'mixpanel.com',
+        'amplitude.com',
+        'taboola.com',
+        'outbrain.com',
+        'criteo.com',
+        'adnxs.com',
+        'amazon-adsystem.com',
+        'quantserve.com',
+        'newrelic.com',
+        'nr-data.net'
+    ]
+    # Typical transfer size per blocked request, used to estimate bytes saved
+    BLOCKED_BYTES_ESTIMATE: dict = {
+        "image": 50_000,
+        "media": 500_000,
+        "font": 40_000,
+        "stylesheet": 20_000,
+        "script": 30_000,
+        "other": 5_000
+    }
+    
     # Interaction settings
     MAX_SCROLLS: int = 3
     MAX_PAGES: int = 3
-    SCROLL_DELAY: int = 1000
+    SCROLL_DELAY: int = 1000  # Max ms to wait for the page to grow after a scroll
+    
+    # Waits are event driven: a page is "settled" once the DOM and (with
+    # WAIT_FOR_NETWORK_IDLE) the network have been quiet for SETTLE_QUIET_WINDOW
+    # ms; the timeouts below are upper bounds, not fixed delays.
+    SETTLE_QUIET_WINDOW: int = 300
+    PAGE_READY_TIMEOUT: int = 5000  # Max ms for the page to settle after navigation
+    CLICK_SETTLE_TIMEOUT: int = 1500  # Max ms for the page to settle after a click
+    
+    # Crawl settings
+    CRAWL_MAX_PAGES_LIMIT: int = 100  # Upper bound for a request's max_pages (default MAX_PAGES)
+    CRAWL_MAX_DEPTH: int = 2  # Link hops from the seed URL
+    CRAWL_CONCURRENCY: int = 4  # Pages fetched at once per crawl
+    # Links followed in "pagination" crawls; each selector is matched on its
+    # own and the results are kept in this order (rel=next first)
+    PAGINATION_SELECTORS: list = [
+        'link[rel~="next"]',
+        'a[rel~="next"]',
+        'a[aria-label*="next" i]',
+        'a.next',
+        '.pagination a',
+        '.pager a',
+        'nav[aria-label*="pagination" i] a'
+    ]
+    
+    # HTTP client settings
+    HTTP2_ENABLED: bool = True  # Only used when the optional 'h2' package is installed
+    HTTP_MAX_CONNECTIONS: int = 100
+    HTTP_MAX_KEEPALIVE_CONNECTIONS: int = 20
+    HTTP_MAX_CONNECTIONS_PER_HOST: int = 6
+    HTTP_KEEPALIVE_EXPIRY: float = 30.0
+    
+    # Per-host rate limiting (static fetches and JS navigations). Each host
+    # gets a token bucket whose rate grows by RATE_LIMIT_INCREASE per fast
+    # success and is multiplied by RATE_LIMIT_DECREASE on throttling, errors
+    # or latency above RATE_LIMIT_LATENCY_FACTOR x the host's fastest recent response
+    RATE_LIMIT_ENABLED: bool = True
+    RATE_LIMIT_INITIAL_RPS: float = 5.0  # Requests per second to a host not seen yet
+    RATE_LIMIT_MIN_RPS: float = 0.2
+    RATE_LIMIT_MAX_RPS: float = 50.0
+    RATE_LIMIT_BURST: int = 5  # Requests a host can receive back to back
+    RATE_LIMIT_INCREASE: float = 0.5
+    RATE_LIMIT_DECREASE: float = 0.5
+    RATE_LIMIT_DECREASE_INTERVAL: float = 1.0  # Seconds; closer failures count as one
+    RATE_LIMIT_LATENCY_FACTOR: float = 4.0
+    RATE_LIMIT_LATENCY_ALPHA: float = 0.2  # Weight of the newest response time in the average
+    RATE_LIMIT_BASELINE_DECAY: float = 0.05  # Share of the gap to the average the baseline rises per response
+    RATE_LIMIT_MAX_BLOCK: float = 300.0  # Longest Retry-After (seconds) applied to a whole host
+    RATE_LIMIT_MAX_HOSTS: int = 10000  # Least recently used hosts beyond this are forgotten
+    
+    # Retries of throttled (Retry-After is honored) or failed requests
+    RETRY_STATUSES: list = [429, 502, 503, 504]
+    RETRY_MAX_ATTEMPTS: int = 3  # 1 disables retries
+    RETRY_BACKOFF_BASE: float = 0.5  # Seconds, doubled per attempt and jittered
+    RETRY_BACKOFF_MAX: float = 10.0
+    RETRY_BUDGET: float = 30.0  # Max seconds a fetch may spend waiting for its host and retrying
+    
+    # Batch scraping settings
+    BATCH_MAX_URLS: int = 500
+    BATCH_CONCURRENCY: int = 8  # URLs scraped at once per batch
+    BATCH_PER_HOST_CONCURRENCY: int = 2  # URLs scraped at once per host in a batch
+    
+    # Per-domain rendering profiles (only used in adaptive mode)
+    PROFILES_ENABLED: bool = True
+    PROFILE_DB_PATH: Optional[str] = "profiles.sqlite3"  # None keeps profiles in memory only
+    PROFILE_HALF_LIFE: int = 7 * 24 * 3600  # Seconds for an observation to lose half its weight
+    PROFILE_MIN_SAMPLES: float = 5  # Decayed observations needed before a rate is trusted
+    PROFILE_STATIC_RATE: float = 0.9  # Static sufficiency at or above this: escalate only empty pages
+    PROFILE_JS_RATE: float = 0.1  # Static sufficiency at or below this: render straight away
+    PROFILE_MIN_GAIN_RATE: float = 0.1  # Scroll / click phases adding content less often are skipped
+    PROFILE_RENDER_TIME_ALPHA: float = 0.3  # Weight of the newest render in the average
+    
+    # Admission control: static fetches and JS renders running at once, and
+    # the bounded priority queues in front of them. A full queue answers 429,
+    # a request that waited longer than its class' timeout (or was pushed out
+    # by a more important one) 503, both with Retry-After
+    ADMISSION_ENABLED: bool = True
+    ADMISSION_STATIC_CONCURRENCY: int = 32
+    ADMISSION_STATIC_QUEUE_SIZE: int = 200
+    ADMISSION_JS_CONCURRENCY: int = 4  # Keep at or below BROWSER_POOL_MAX_CONTEXTS
+    ADMISSION_JS_QUEUE_SIZE: int = 16
+    # Max seconds a request may wait for a slot, per priority class
+    ADMISSION_QUEUE_TIMEOUTS: dict = {"interactive": 15.0, "batch": 60.0, "background": 300.0}
+    ADMISSION_SERVICE_TIME_ALPHA: float = 0.2  # Weight of the newest run in the Retry-After estimate
+    
+    # Background job settings
+    JOB_DB_PATH: str = "jobs.sqlite3"
+    JOB_WORKERS: int = 2
+    JOB_RETENTION: int = 7 * 24 * 3600  # Seconds finished jobs are kept
+    
+    # Browser storage state (cookies, localStorage) carried between renders of a domain
+    STORAGE_STATES_ENABLED: bool = True
+    STORAGE_STATE_DB_PATH: Optional[str] = "storage_states.sqlite3"  # None keeps states in memory only
+    STORAGE_STATE_TTL: int = 24 * 3600  # Seconds a state left by a render is reused
+    STORAGE_STATE_CONSENT_TTL: int = 30 * 24 * 3600  # ...and one captured by accepting the consent banner
+    STORAGE_STATE_MAX_BYTES: int = 512 * 1024  # Larger states are not kept
+    # Consent "accept" buttons tried in order by POST /api/storage-states/consent
+    CONSENT_ACCEPT_SELECTORS: list = [
+        '#onetrust-accept-btn-handler',
+        '#CybotCookiebotDialogBodyLevelButtonLevelOptinAllowAll',
+        '#CybotCookiebotDialogBodyButtonAccept',
+        '#didomi-notice-agree-button',
+        '#truste-consent-button',
+        '.fc-cta-consent',
+        '[data-testid="uc-accept-all-button"]',
+        'button:has-text("Accept all")',
+        'button:has-text("Accept")',
+        'button:has-text("I agree")',
+        'button:has-text("Allow all")',
+        'button[id*="accept" i]',
+        'button[class*="accept" i]'
+    ]
+    
+    # Section snapshots for since= change detection
+    SNAPSHOTS_ENABLED: bool = True
+    SNAPSHOT_DB_PATH: Optional[str] = "snapshots.sqlite3"  # None keeps snapshots in memory only
+    SNAPSHOT_RETENTION: int = 30 * 24 * 3600  # Seconds a snapshot stays usable as since
+    
+    # Result cache settings
+    CACHE_ENABLED: bool = True
+    CACHE_TTL: int = 300  # Seconds before an entry must be revalidated
+    CACHE_MAX_ENTRIES: int = 512
+    CACHE_MAX_BYTES: int = 64 * 1024 * 1024  # Memory tier budget
+    CACHE_DB_PATH: Optional[str] = None  # e.g. "cache.sqlite3" to enable the disk tier
+    CACHE_DISK_MAX_ENTRIES: int = 10000
+    
+    # Browser pool settings
+    BROWSER_HEADLESS: bool = True
+    BROWSER_POOL_MAX_CONTEXTS: int = 4  # Max concurrent browser contexts
+    USER_AGENT: str = (
+        "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
+        "AppleWebKit/537.36 (KHTML, like Gecko) "
+        "Chrome/120 Safari/537.36"
+    )
     
     # Filtering settings
+    # Elements matching these are removed before extraction, in the
+    # rendered page (JS) and in the parsed tree (static)
+    NOISE_FILTER_ENABLED: bool = True
     NOISE_SELECTORS: list = [
         '[class*="cookie"]',
+        '[class*="consent"]',
+        '[aria-label*="cookie"]',
         '[class*="banner"]',
         '[class*="modal"]',
         '[class*="popup"]',
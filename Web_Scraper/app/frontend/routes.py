@@ -1,16 +1,12 @@
 from fastapi import APIRouter, Request, Form, HTTPException
 from fastapi.responses import HTMLResponse
 from fastapi.templating import Jinja2Templates
-from datetime import datetime
 import time
 
-from app.models import (
-    ScrapeRequest,
-    ScrapeResponse,
-    ScrapeResult,
-    Interactions,
-)
+from app.models import ScrapeRequest
 from app.services.scraping_service import ScrapingService
+from app.services.snapshots import snapshots
+from app.services.admission import AdmissionRejected
 from app.scraper.utils import URLUtils
 
 router = APIRouter()
@@ -53,24 +49,8 @@ async def scrape_web(request: Request, url: str = Form(...)):
 
         processing_time = time.time() - start_time
 
-        response = ScrapeResponse(
-            result=ScrapeResult(
-                url=normalized_url,
-                scrapedAt=datetime.utcnow().isoformat(),
-                meta=raw_result.get("meta"),
-                sections=raw_result.get("sections", []),
-                interactions=Interactions(
-                    clicks=raw_result.get("interactions", {}).get("clicks", []),
-                    scrolls=raw_result.get("interactions", {}).get("scrolls", 0),
-                    pages=raw_result.get("interactions", {}).get(
-                        "pages", [normalized_url]
-                    ),
-                ),
-                errors=raw_result.get("errors", []),
-            ),
-            strategy=raw_result.get("strategy", "static"),
-            processing_time=processing_time,
-        )
+        response = service.build_response(normalized_url, raw_result, processing_time)
+        await snapshots.track(normalized_url, raw_result, response)
 
         result_dict = response.model_dump()
 
@@ -87,6 +67,22 @@ async def scrape_web(request: Request, url: str = Form(...)):
             },
         )
 
+    except AdmissionRejected as e:
+        return templates.TemplateResponse(
+            "index.html",
+            {
+                "request": request,
+                "title": "Web Scraper",
+                "url": url,
+                "result": None,
+                "pretty_json": {},
+                "has_error": True,
+                "error": str(e),
+            },
+            status_code=e.status_code,
+            headers={"Retry-After": str(e.retry_after)},
+        )
+
     except Exception as e:
         error_msg = str(e.detail) if hasattr(e, "detail") else str(e)
 
@@ -12,6 +12,14 @@ import uvicorn
 from app.api.routes import router as api_router
 from app.frontend.routes import router as frontend_router
 from app.config import settings
+from app.scraper.browser_pool import browser_pool
+from app.scraper.http_client import http_client
+from app.services.cache import result_cache
+from app.scraper.executor import parse_executor
+from app.services.job_service import job_manager
+from app.services.domain_profiles import domain_profiles
+from app.services.snapshots import snapshots
+from app.services.storage_states import storage_states
 
 app = FastAPI(
     title="Web Scraper API",
@@ -40,10 +48,30 @@ app.include_router(frontend_router)
 @app.on_event("startup")
 async def startup_event():
     print("Web Scraper API starting up...")
+    await http_client.start()
+    result_cache.open()
+    domain_profiles.open()
+    snapshots.open()
+    storage_states.open()
+    parse_executor.start()
+    await job_manager.start()
+    try:
+        await browser_pool.start()
+    except Exception as e:
+        # The pool retries the launch on the first JS scrape
+        print(f"Browser pool failed to start: {str(e)}")
 
 @app.on_event("shutdown")
 async def shutdown_event():
     print("Web Scraper API shutting down...")
+    await job_manager.close()
+    await browser_pool.close()
+    await http_client.close()
+    result_cache.close()
+    domain_profiles.close()
+    snapshots.close()
+    storage_states.close()
+    parse_executor.close()
 
 if __name__ == "__main__":
     uvicorn.run(
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Literal
 from datetime import datetime
 from enum import Enum
 
@@ -48,6 +48,7 @@ class Section(BaseModel):
     content: Content
     rawHtml: str
     truncated: bool = False
+    fingerprint: str = ""  # Hash of the section's content; changes whenever the content does
 
 
 class Error(BaseModel):
@@ -55,6 +56,18 @@ class Error(BaseModel):
     phase: str
 
 
+class SectionChanges(BaseModel):
+    """
+    Difference to the snapshot a request passed as since, by section id;
+    result.sections only holds the added and modified sections.
+    """
+    since: str
+    unchanged: bool = False
+    added: List[str] = []
+    modified: List[str] = []
+    removed: List[str] = []
+
+
 class Interactions(BaseModel):
     clicks: List[Click] = []
     scrolls: int = 0
@@ -75,10 +88,43 @@ class ScrapeResult(BaseModel):
     sections: List[Section]
     interactions: Interactions
     errors: List[Error] = []
+    truncated: bool = False  # The document exceeded MAX_DOCUMENT_BYTES and was cut off
 
 
 class ScrapeRequest(BaseModel):
     url: str
+    mode: Optional[Literal["adaptive", "static", "js"]] = None  # Defaults to settings.SCRAPE_MODE
+    use_cache: bool = True
+    cache_ttl: Optional[int] = Field(default=None, ge=0)  # Entry TTL and max accepted age; defaults to settings.CACHE_TTL
+    include_timings: bool = False  # Return per-phase timings in the response
+    fields: Optional[List[str]] = None  # Result fields to return, e.g. ["meta", "sections.content.text"]; all by default
+    include_raw_html: bool = True  # False skips building sections' rawHtml
+    since: Optional[str] = None  # Snapshot id from an earlier response: only changed sections are returned
+
+
+class StreamScrapeRequest(ScrapeRequest):
+    format: Literal["ndjson", "sse"] = "ndjson"
+
+
+class CrawlRequest(BaseModel):
+    url: str  # Seed URL
+    mode: Optional[Literal["adaptive", "static", "js"]] = None
+    use_cache: bool = True
+    cache_ttl: Optional[int] = Field(default=None, ge=0)
+    max_pages: Optional[int] = Field(default=None, ge=1)  # Defaults to settings.MAX_PAGES
+    max_depth: Optional[int] = Field(default=None, ge=0)  # Defaults to settings.CRAWL_MAX_DEPTH
+    same_origin: bool = True
+    follow: Literal["pagination", "links"] = "pagination"
+
+
+class BatchScrapeRequest(BaseModel):
+    urls: List[str] = Field(min_length=1)
+    mode: Optional[Literal["adaptive", "static", "js"]] = None
+    use_cache: bool = True
+    cache_ttl: Optional[int] = Field(default=None, ge=0)
+    include_timings: bool = False
+    fields: Optional[List[str]] = None
+    include_raw_html: bool = True
 
 
 class HealthResponse(BaseModel):
@@ -87,7 +133,172 @@ class HealthResponse(BaseModel):
     timestamp: str = Field(default_factory=lambda: datetime.now().isoformat())  # ✅ FIXED
 
 
+class BrowserPoolStats(BaseModel):
+    running: bool = False
+    max_contexts: int = 0
+    active_contexts: int = 0
+    peak_active_contexts: int = 0
+    waiting: int = 0
+    launches: int = 0
+    contexts_created: int = 0
+    total_wait_time: float = 0.0
+
+
+class HTTPClientStats(BaseModel):
+    open: bool = False
+    http2: bool = False
+    requests: int = 0
+    active_requests: int = 0
+    hosts: int = 0
+    max_connections: int = 0
+    max_connections_per_host: int = 0
+
+
+class RateLimiterStats(BaseModel):
+    enabled: bool = False
+    hosts: int = 0
+    min_host_rate: float = 0.0  # Requests per second of the most throttled host
+    waits: int = 0
+    total_wait_time: float = 0.0
+    throttled: int = 0  # 429 / 503 responses
+    retries: int = 0
+    budget_exceeded: int = 0  # Requests that gave up waiting or retrying
+
+
+class CacheStats(BaseModel):
+    entries: int = 0
+    bytes: int = 0
+    max_bytes: int = 0
+    disk: bool = False
+    hits: int = 0
+    revalidated: int = 0
+    misses: int = 0
+    evictions: int = 0
+    hit_rate: float = 0.0
+
+
+class ParseExecutorStats(BaseModel):
+    workers: int = 0
+    running: bool = False
+    inline: int = 0
+    offloaded: int = 0
+    pending: int = 0
+    queue_depth: int = 0
+    max_pending: int = 0
+    failures: int = 0
+
+
+class AdmissionStats(BaseModel):
+    concurrency: int = 0
+    active: int = 0
+    queued: int = 0
+    queue_size: int = 0
+    admitted: int = 0
+    rejected: int = 0  # Turned away with 429 because the queue was full
+    shed: int = 0  # Pushed out of the queue by higher priority work (503)
+    timed_out: int = 0  # Gave up waiting for a slot (503)
+    total_wait_time: float = 0.0
+
+
+class StatsResponse(BaseModel):
+    browser_pool: BrowserPoolStats
+    http_client: HTTPClientStats
+    rate_limiter: RateLimiterStats
+    cache: CacheStats
+    parse_executor: ParseExecutorStats
+    admission: Dict[str, AdmissionStats] = {}  # By kind: "static", "js"
+
+
+class ResourceStats(BaseModel):
+    """Requests aborted by the resource blocker during a JS render"""
+    blocked: int = 0
+    allowed: int = 0
+    blocked_by_type: Dict[str, int] = {}
+    blocked_by_domain: int = 0
+    bytes_saved_estimate: int = 0
+
+
 class ScrapeResponse(BaseModel):
     result: ScrapeResult
     strategy: Optional[str] = None
     processing_time: Optional[float] = None
+    cache: Optional[Literal["hit", "revalidated", "miss", "bypass"]] = None
+    resources: Optional[ResourceStats] = None  # Only set for JS renders
+    timings: Optional[Dict[str, float]] = None  # Seconds per phase, with include_timings
+    snapshot: Optional[str] = None  # Pass as since on the next scrape of this URL
+    changes: Optional[SectionChanges] = None  # Only set with since
+
+
+class ProfileOverride(BaseModel):
+    """Manual per-domain settings; None leaves the decision to the profile"""
+    strategy: Optional[Literal["adaptive", "static", "js"]] = None
+    scroll: Optional[bool] = None
+    click: Optional[bool] = None
+
+
+class ProfilePlan(BaseModel):
+    mode: Literal["adaptive", "static", "js"]
+    scroll: bool
+    click: bool
+
+
+class DomainProfileResponse(BaseModel):
+    domain: str
+    static_checks: float = 0.0  # Decayed number of static sufficiency checks
+    static_sufficiency_rate: Optional[float] = None  # None until enough samples
+    renders: float = 0.0
+    avg_render_time: Optional[float] = None
+    scroll_gain_rate: Optional[float] = None
+    click_gain_rate: Optional[float] = None
+    last_failure: Optional[str] = None
+    last_failure_at: Optional[float] = None
+    override: ProfileOverride
+    plan: ProfilePlan
+    updated_at: float
+
+
+class ConsentCaptureRequest(BaseModel):
+    url: str
+    # Accept button to click; defaults to settings.CONSENT_ACCEPT_SELECTORS
+    selector: Optional[str] = None
+
+
+class StorageStateResponse(BaseModel):
+    domain: str
+    consent: bool = False  # Captured by accepting the consent banner
+    cookies: int = 0
+    origins: int = 0  # Origins with localStorage
+    expires_at: float
+    updated_at: float
+    accepted_with: Optional[str] = None  # Selector clicked, for consent captures
+
+
+class BatchItemResult(BaseModel):
+    url: str
+    success: bool
+    result: Optional[ScrapeResult] = None
+    strategy: Optional[str] = None
+    cache: Optional[str] = None
+    resources: Optional[ResourceStats] = None
+    timings: Optional[Dict[str, float]] = None
+    processing_time: Optional[float] = None
+    error: Optional[str] = None
+
+
+class BatchScrapeResponse(BaseModel):
+    results: List[BatchItemResult]
+    total: int
+    succeeded: int
+    failed: int
+    processing_time: float
+
+
+class JobResponse(BaseModel):
+    id: str
+    status: Literal["queued", "running", "completed", "failed", "cancelled"]
+    url: str
+    created_at: float
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    result: Optional[ScrapeResponse] = None
+    error: Optional[str] = None
@@ -1,10 +1,12 @@
 from abc import ABC, abstractmethod
 from typing import List, Dict, Any, Optional
-from urllib.parse import urljoin, urlparse
-import hashlib
+from urllib.parse import urlparse
 import re
 
 from app.models import Section, Content, Link, Image, SectionType
+from app.scraper.utils import URLUtils, ContentUtils
+from app.scraper.timings import PhaseTimings
+from app.scraper.projection import FULL_PROJECTION
 from app.config import settings
 
 class BaseScraper(ABC):
@@ -15,6 +17,10 @@ class BaseScraper(ABC):
         self.base_url = self._get_base_url(url)
         self.errors = []
         self.sections = []
+        self.validators = {}  # ETag / Last-Modified of the fetched document
+        self.truncated = False  # The document was cut off at MAX_DOCUMENT_BYTES
+        self.timings = PhaseTimings()
+        self.projection = FULL_PROJECTION  # Which parts of the sections to build
         self.interactions = {
             "clicks": [],
             "scrolls": 0,
@@ -28,24 +34,11 @@ class BaseScraper(ABC):
     
     def _make_absolute_url(self, url: str) -> str:
         """Convert relative URL to absolute"""
-        if not url:
-            return ""
-        
-        if url.startswith(('http://', 'https://')):
-            return url
-        
-        if url.startswith('//'):
-            return f"{urlparse(self.url).scheme}:{url}"
-        
-        if url.startswith('/'):
-            return urljoin(self.base_url, url)
-        
-        return urljoin(self.url, url)
+        return URLUtils.make_absolute_url(url, self.url)
     
     def _generate_section_id(self, element_text: str) -> str:
         """Generate a stable section ID"""
-        text_hash = hashlib.md5(element_text.encode()).hexdigest()[:8]
-        return f"section-{text_hash}"
+        return ContentUtils.generate_section_id(element_text)
     
     def _extract_text_content(self, html: str) -> str:
         """Extract clean text content from HTML"""
@@ -63,17 +56,7 @@ class BaseScraper(ABC):
     
     def _truncate_html(self, html: str, max_length: int = settings.MAX_RAW_HTML_LENGTH) -> tuple[str, bool]:
         """Truncate HTML content"""
-        if len(html) <= max_length:
-            return html, False
-        
-        # Try to truncate at a tag boundary
-        truncated = html[:max_length]
-        last_tag = truncated.rfind('>')
-        
-        if last_tag != -1:
-            truncated = truncated[:last_tag + 1]
-        
-        return truncated + "...", True
+        return ContentUtils.truncate_html(html, max_length)
     
     @abstractmethod
     async def scrape(self) -> Dict[str, Any]:
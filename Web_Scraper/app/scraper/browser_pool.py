@@ -0,0 +1,127 @@
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from typing import Dict, Any, Optional, AsyncIterator
+
+from playwright.async_api import async_playwright, Browser, BrowserContext, Playwright
+
+from app.config import settings
+
+
+class BrowserPool:
+    """
+    Long-lived Chromium instance shared by all JS scrapes.
+
+    The browser is launched once (on app startup) and every scrape gets its
+    own fresh BrowserContext, so a render only pays for a context and a page.
+    The number of contexts open at the same time is capped by a semaphore.
+    """
+
+    def __init__(self, max_contexts: int = settings.BROWSER_POOL_MAX_CONTEXTS):
+        self.max_contexts = max_contexts
+        self._playwright: Optional[Playwright] = None
+        self._browser: Optional[Browser] = None
+        self._semaphore = asyncio.Semaphore(max_contexts)
+        self._lock = asyncio.Lock()
+
+        self.launches = 0
+        self.contexts_created = 0
+        self.active_contexts = 0
+        self.peak_active_contexts = 0
+        self.waiting = 0
+        self.total_wait_time = 0.0
+
+    @property
+    def is_running(self) -> bool:
+        return self._browser is not None and self._browser.is_connected()
+
+    async def start(self):
+        """Start Playwright and launch Chromium (no-op if already running)"""
+        async with self._lock:
+            await self._ensure_browser()
+
+    async def close(self):
+        """Close the browser and stop Playwright"""
+        async with self._lock:
+            if self._browser:
+                try:
+                    await self._browser.close()
+                except Exception as e:
+                    print(f"Error closing browser: {str(e)}")
+                self._browser = None
+
+            if self._playwright:
+                await self._playwright.stop()
+                self._playwright = None
+
+    async def _ensure_browser(self) -> Browser:
+        """Launch the browser, relaunching it if it crashed or was closed"""
+        if self.is_running:
+            return self._browser
+
+        if self._playwright is None:
+            self._playwright = await async_playwright().start()
+
+        print("Launching shared Chromium browser...")
+        self._browser = await self._playwright.chromium.launch(
+            headless=settings.BROWSER_HEADLESS,
+            args=["--disable-blink-features=AutomationControlled"],
+        )
+        self.launches += 1
+        return self._browser
+
+    @asynccontextmanager
+    async def context(self, **options) -> AsyncIterator[BrowserContext]:
+        """
+        Hand out a fresh BrowserContext, waiting for a free slot if the
+        pool is at capacity. The context is closed on exit.
+        """
+        wait_start = time.perf_counter()
+        self.waiting += 1
+        try:
+            await self._semaphore.acquire()
+        finally:
+            self.waiting -= 1
+        self.total_wait_time += time.perf_counter() - wait_start
+
+        context = None
+        try:
+            async with self._lock:
+                browser = await self._ensure_browser()
+
+            context_options = {
+                "viewport": {"width": 1920, "height": 1080},
+                "user_agent": settings.USER_AGENT,
+            }
+            context_options.update(options)
+
+            context = await browser.new_context(**context_options)
+            self.contexts_created += 1
+            self.active_contexts += 1
+            self.peak_active_contexts = max(self.peak_active_contexts, self.active_contexts)
+
+            yield context
+
+        finally:
+            if context is not None:
+                self.active_contexts -= 1
+                try:
+                    await context.close()
+                except Exception:
+                    pass
+            self._semaphore.release()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "running": self.is_running,
+            "max_contexts": self.max_contexts,
+            "active_contexts": self.active_contexts,
+            "peak_active_contexts": self.peak_active_contexts,
+            "waiting": self.waiting,
+            "launches": self.launches,
+            "contexts_created": self.contexts_created,
+            "total_wait_time": round(self.total_wait_time, 4),
+        }
+
+
+browser_pool = BrowserPool()
@@ -0,0 +1,152 @@
+import asyncio
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, Any, Optional, Iterator, AsyncIterator, TypeVar
+
+from app.scraper.parsers import get_parser
+from app.scraper.projection import Projection
+from app.config import settings
+
+T = TypeVar("T")
+
+
+def parse_document(
+    url: str,
+    html: str,
+    backend: Optional[str] = None,
+    projection: Optional[Projection] = None,
+) -> Dict[str, Any]:
+    """
+    Parse one document into BaseParser.parse's dict plus "errors".
+
+    Runs in a worker process, so arguments and the result must be picklable.
+    """
+    parser = get_parser(url, backend, projection)
+    result = parser.parse(html)
+    result["errors"] = parser.errors
+    return result
+
+
+class ParseExecutor:
+    """
+    Runs HTML parsing off the event loop.
+
+    Documents smaller than PARSE_INLINE_THRESHOLD are parsed inline since
+    shipping them to a worker costs more than parsing them. Larger ones go
+    to a process pool so a huge page does not stall other requests.
+
+    iterate() runs lazy work (building streamed sections one by one) on a
+    thread instead, since its items are consumed as they are produced.
+    """
+
+    def __init__(self, workers: int = settings.PARSE_WORKERS):
+        self.workers = workers
+        self._pool: Optional[ProcessPoolExecutor] = None
+
+        self.inline = 0
+        self.offloaded = 0
+        self.pending = 0
+        self.max_pending = 0
+        self.failures = 0
+
+    def start(self):
+        if self.workers > 0 and self._pool is None:
+            # spawn: forking a process that runs an event loop is not safe
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+            # Start the workers now rather than on the first large page
+            for _ in range(self.workers):
+                self._pool.submit(get_parser, "about:blank")
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    async def parse(self, url: str, html: str, projection: Optional[Projection] = None) -> Dict[str, Any]:
+        if self.workers <= 0 or len(html) < settings.PARSE_INLINE_THRESHOLD:
+            self.inline += 1
+            return parse_document(url, html, projection=projection)
+
+        self.start()
+        self.offloaded += 1
+        self.pending += 1
+        self.max_pending = max(self.max_pending, self.pending)
+
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(
+                self._pool, parse_document, url, html, settings.PARSER_BACKEND, projection
+            )
+
+        except BrokenProcessPool:
+            # A worker died (e.g. OOM); replace the pool and parse this one inline
+            self.failures += 1
+            self.close()
+            return parse_document(url, html, projection=projection)
+
+        finally:
+            self.pending -= 1
+
+    async def iterate(self, items: Iterator[T]) -> AsyncIterator[T]:
+        """
+        Run an iterator on a worker thread and yield its items as they are
+        produced. At most STREAM_SECTION_BUFFER items wait to be consumed,
+        so a slow consumer holds the producer back; when the consumer stops
+        early the producer stops after its current item.
+        """
+        loop = asyncio.get_running_loop()
+        queue: asyncio.Queue = asyncio.Queue(maxsize=max(1, settings.STREAM_SECTION_BUFFER))
+        stopped = threading.Event()
+        done = object()
+
+        def produce():
+            try:
+                for item in items:
+                    asyncio.run_coroutine_threadsafe(queue.put((item, None)), loop).result()
+                    if stopped.is_set():
+                        return
+                outcome = (done, None)
+            except Exception as e:
+                outcome = (None, e)
+            asyncio.run_coroutine_threadsafe(queue.put(outcome), loop).result()
+
+        producer = loop.run_in_executor(None, produce)
+        try:
+            while True:
+                item, error = await queue.get()
+                if error is not None:
+                    raise error
+                if item is done:
+                    break
+                yield item
+            await producer
+        finally:
+            stopped.set()
+            # Unblock a producer waiting for room in the queue
+            while not queue.empty():
+                queue.get_nowait()
+
+    @property
+    def queue_depth(self) -> int:
+        """Documents waiting for a free worker"""
+        return max(0, self.pending - self.workers)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "workers": self.workers,
+            "running": self._pool is not None,
+            "inline": self.inline,
+            "offloaded": self.offloaded,
+            "pending": self.pending,
+            "queue_depth": self.queue_depth,
+            "max_pending": self.max_pending,
+            "failures": self.failures,
+        }
+
+
+parse_executor = ParseExecutor()
@@ -0,0 +1,183 @@
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from typing import Dict, Any, Optional, AsyncIterator, Tuple
+from urllib.parse import urlparse
+
+import httpx
+
+from app.scraper.rate_limiter import rate_limiter
+from app.services.admission import admission
+from app.config import settings
+
+try:
+    import h2  # noqa: F401 - only needed so httpx can negotiate HTTP/2
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+
+class SharedHTTPClient:
+    """
+    App-wide httpx.AsyncClient with pooled keep-alive connections.
+
+    Reusing one client keeps TCP/TLS connections (and their DNS lookups)
+    alive between scrapes of the same host. A per-host semaphore caps how
+    many requests go to a single host at once, since httpx only limits
+    connections globally; a host's semaphore is dropped as soon as no
+    request holds or waits for it, so crawling many hosts does not grow it.
+
+    Every request is paced by the shared rate_limiter; throttled (429 /
+    503) and failed attempts are retried within RETRY_BUDGET, honoring
+    Retry-After. Slots (per-host and admission) are given up while waiting
+    to retry.
+    """
+
+    def __init__(self):
+        self._client: Optional[httpx.AsyncClient] = None
+        self._host_semaphores: Dict[str, asyncio.Semaphore] = {}
+        self._host_users: Dict[str, int] = {}  # Requests holding or waiting for each semaphore
+
+        self.requests = 0
+        self.active_requests = 0
+
+    @property
+    def http2(self) -> bool:
+        return settings.HTTP2_ENABLED and HTTP2_AVAILABLE
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """The pooled client, created on first use if start() was not called"""
+        if self._client is None or self._client.is_closed:
+            self._client = self._create_client()
+        return self._client
+
+    def _create_client(self) -> httpx.AsyncClient:
+        if settings.HTTP2_ENABLED and not HTTP2_AVAILABLE:
+            print("HTTP/2 requested but 'h2' is not installed, using HTTP/1.1")
+
+        # httpx decompresses gzip/deflate itself (and brotli when installed)
+        # and advertises only the encodings it can decode.
+        return httpx.AsyncClient(
+            timeout=settings.REQUEST_TIMEOUT,
+            follow_redirects=True,
+            http2=self.http2,
+            headers={"User-Agent": settings.USER_AGENT},
+            limits=httpx.Limits(
+                max_connections=settings.HTTP_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.HTTP_MAX_KEEPALIVE_CONNECTIONS,
+                keepalive_expiry=settings.HTTP_KEEPALIVE_EXPIRY,
+            ),
+        )
+
+    async def start(self):
+        if self._client is None or self._client.is_closed:
+            self._client = self._create_client()
+
+    async def close(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    @asynccontextmanager
+    async def _host_slot(self, url: str) -> AsyncIterator[None]:
+        """Hold one of the host's HTTP_MAX_CONNECTIONS_PER_HOST request slots"""
+        host = urlparse(url).netloc
+        semaphore = self._host_semaphores.get(host)
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(settings.HTTP_MAX_CONNECTIONS_PER_HOST)
+            self._host_semaphores[host] = semaphore
+        self._host_users[host] = self._host_users.get(host, 0) + 1
+
+        try:
+            async with semaphore:
+                yield
+        finally:
+            self._host_users[host] -= 1
+            if not self._host_users[host]:
+                del self._host_users[host]
+                del self._host_semaphores[host]
+
+    async def get(self, url: str, headers: Optional[Dict[str, str]] = None) -> httpx.Response:
+        """GET a URL through the shared pool, respecting the per-host limit"""
+        async with self.stream(url, headers) as response:
+            await response.aread()
+        return response
+
+    @asynccontextmanager
+    async def stream(self, url: str, headers: Optional[Dict[str, str]] = None) -> AsyncIterator[httpx.Response]:
+        """
+        GET a URL without reading its body, which the caller consumes with
+        response.aiter_bytes(). The per-host slot is held until the block
+        exits, but not while waiting to retry a throttled or failed attempt;
+        neither is the caller's admission slot.
+        """
+        deadline = rate_limiter.deadline()
+        attempt = 0
+        while True:
+            async with self._host_slot(url):
+                self.active_requests += 1
+                try:
+                    response, delay = await self._send(url, headers, attempt, deadline)
+                    if delay is None:
+                        try:
+                            yield response
+                        finally:
+                            await response.aclose()
+                        return
+                finally:
+                    self.active_requests -= 1
+
+            attempt += 1
+            print(f"Retrying {url} in {delay:.1f}s (attempt {attempt + 1})")
+            async with admission.paused():
+                await asyncio.sleep(delay)
+
+    async def _send(
+        self,
+        url: str,
+        headers: Optional[Dict[str, str]],
+        attempt: int,
+        deadline: float,
+    ) -> Tuple[Optional[httpx.Response], Optional[float]]:
+        """
+        Send one streamed GET. Returns (response, None) when it is final, or
+        (None, seconds to wait) when it should be retried.
+        """
+        await rate_limiter.acquire(url, deadline)
+        self.requests += 1
+        started = time.monotonic()
+
+        try:
+            response = await self.client.send(self.client.build_request("GET", url, headers=headers), stream=True)
+        except httpx.TransportError:
+            rate_limiter.observe(url, None, time.monotonic() - started)
+            delay = rate_limiter.retry_delay(attempt, deadline)
+            if delay is None:
+                raise
+            return None, delay
+
+        retry_after = response.headers.get("retry-after")
+        rate_limiter.observe(url, response.status_code, time.monotonic() - started, retry_after)
+        if response.status_code not in settings.RETRY_STATUSES:
+            return response, None
+
+        delay = rate_limiter.retry_delay(attempt, deadline, retry_after)
+        if delay is None:
+            return response, None
+        await response.aclose()
+        return None, delay
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "open": self._client is not None and not self._client.is_closed,
+            "http2": self.http2,
+            "requests": self.requests,
+            "active_requests": self.active_requests,
+            "hosts": len(self._host_semaphores),
+            "max_connections": settings.HTTP_MAX_CONNECTIONS,
+            "max_connections_per_host": settings.HTTP_MAX_CONNECTIONS_PER_HOST,
+        }
+
+
+http_client = SharedHTTPClient()
@@ -1,49 +1,186 @@
 import asyncio
-from typing import Dict, Any, Optional
-from playwright.async_api import async_playwright, Page
+import time
+from urllib.parse import urldefrag
+from typing import Dict, Any, List, Optional
+from playwright.async_api import BrowserContext, Page, Request, Response, Error as PlaywrightError, TimeoutError as PlaywrightTimeoutError
 
 from app.scraper.base import BaseScraper
 from app.scraper.static_scraper import StaticScraper
+from app.scraper.browser_pool import browser_pool
+from app.scraper.resource_blocker import ResourceBlocker
+from app.scraper.noise_filter import noise_filter
+from app.scraper.rate_limiter import rate_limiter
+from app.services.admission import admission
 from app.config import settings
 from datetime import datetime
 
+# Resolves once the DOM has had no mutations for `quiet` ms, or after `max` ms
+_DOM_QUIET_SCRIPT = """
+([quiet, max]) => new Promise(resolve => {
+    let timer, cap;
+    const done = () => { observer.disconnect(); clearTimeout(timer); clearTimeout(cap); resolve(); };
+    const observer = new MutationObserver(() => { clearTimeout(timer); timer = setTimeout(done, quiet); });
+    observer.observe(document, { childList: true, subtree: true, attributes: true, characterData: true });
+    timer = setTimeout(done, quiet);
+    cap = setTimeout(done, max);
+})
+"""
+
+
+# Attribute that marks the elements found by _FIND_CLICK_CANDIDATES_SCRIPT
+_CANDIDATE_ATTRIBUTE = "data-scrape-candidate"
+
+# Finds every click candidate in one call: for each [label, css, text] the
+# first `perSelector` matches (optionally containing `text`, case-insensitive)
+# that are visible and have text, deduplicated across selectors. Each is
+# tagged with a handle so it can be clicked without another lookup.
+_FIND_CLICK_CANDIDATES_SCRIPT = """
+([candidates, perSelector]) => {
+    const seen = new Set();
+    const found = [];
+    for (const [label, css, text] of candidates) {
+        let matches = Array.from(document.querySelectorAll(css));
+        if (text) {
+            const needle = text.toLowerCase();
+            matches = matches.filter(el => (el.textContent || "").toLowerCase().includes(needle));
+        }
+        for (const el of matches.slice(0, perSelector)) {
+            if (seen.has(el)) continue;
+            seen.add(el);
+
+            const rect = el.getBoundingClientRect();
+            if (!rect.width || !rect.height || getComputedStyle(el).visibility === "hidden") continue;
+
+            const elementText = (el.textContent || "").trim();
+            if (elementText.length < 2) continue;
+
+            const handle = String(found.length);
+            el.setAttribute("%s", handle);
+            found.push({ handle, selector: label, text: elementText.slice(0, 50), id: el.id || "" });
+        }
+    }
+    return found;
+}
+""" % _CANDIDATE_ATTRIBUTE
+
+# Removes the handles again so they do not end up in the captured HTML
+_CLEAR_CLICK_CANDIDATES_SCRIPT = """
+() => document.querySelectorAll("[%s]").forEach(el => el.removeAttribute("%s"))
+""" % (_CANDIDATE_ATTRIBUTE, _CANDIDATE_ATTRIBUTE)
+
+
 class JSScraper(BaseScraper):
     """
     JavaScript-rendered scraper using Playwright
     """
 
-    def __init__(self, url: str):
+    # [label, css selector, required text]; the label is what click records report
+    CLICK_CANDIDATES = [
+        ['button', 'button', None],
+        ['a', 'a', None],
+        ['[role="button"]', '[role="button"]', None],
+        ['[aria-expanded]', '[aria-expanded]', None],
+        ['button:has-text("More")', 'button', 'More'],
+        ['button:has-text("Load")', 'button', 'Load'],
+        ['button:has-text("Show")', 'button', 'Show'],
+        ['button:has-text("View")', 'button', 'View'],
+        ['button:has-text("Next")', 'button', 'Next'],
+    ]
+    CLICKS_PER_SELECTOR = 5
+
+    def __init__(self, url: str, scroll: bool = True, click: bool = True):
         # ✅ Call parent __init__ to properly set up interactions
         super().__init__(url)
         self.page: Optional[Page] = None
-        self.browser = None
+        self.scroll = scroll
+        self.click = click
+
+        # Read by the domain profiles: time of a successful render and
+        # whether each interaction phase added content
+        self.render_time: Optional[float] = None
+        self.phase_gains: Dict[str, bool] = {}
+        self.resources: Optional[Dict[str, Any]] = None  # ResourceBlocker stats of the render
+        # Playwright storage state loaded into the context; after a render,
+        # the state the page left it in
+        self.storage_state: Optional[Dict[str, Any]] = None
+
+        # In-flight requests of the page, for network-idle waits
+        self._inflight = 0
+        self._last_network_activity = 0.0
 
     async def scrape(self) -> Dict[str, Any]:
         try:
-            async with async_playwright() as p:
-                self.browser = await p.chromium.launch(
-                    headless=True,
-                    args=["--disable-blink-features=AutomationControlled"],
-                )
+            html = await self.render()
 
-                context = await self.browser.new_context(
-                    viewport={"width": 1920, "height": 1080},
-                    user_agent=(
-                        "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
-                        "AppleWebKit/537.36 (KHTML, like Gecko) "
-                        "Chrome/120 Safari/537.36"
-                    ),
-                )
+            # Parse HTML using StaticScraper - but preserve our interactions
+            static_scraper = StaticScraper(self.url)
+            static_scraper.timings = self.timings
+            static_scraper.projection = self.projection
+            
+            # ✅ Get the static scraping result
+            result = await static_scraper.scrape_from_html(html)
+            
+            # ✅ PRESERVE OUR INTERACTIONS
+            result["interactions"] = self.interactions  # This should have clicks and scrolls
+            result["strategy"] = "js"
+            result["validators"] = self.validators
+            result["resources"] = self.resources
+            
+            # ✅ Also preserve errors
+            if self.errors:
+                result["errors"] = self.errors + result.get("errors", [])
+            
+            print(f"Final result interactions: {result.get('interactions')}")
+            return result
 
+        except Exception as e:
+            self.errors.append({"message": str(e), "phase": "render"})
+            # Fall back to static but preserve what we have
+            fallback_scraper = StaticScraper(self.url)
+            fallback_scraper.timings = self.timings
+            fallback_scraper.projection = self.projection
+            static_result = await fallback_scraper.scrape()
+            static_result["interactions"] = self.interactions
+            static_result["resources"] = self.resources
+            static_result["errors"] = self.errors + static_result.get("errors", [])
+            return static_result
+
+    async def render(self) -> str:
+        """Render the page in a pooled browser context and return the final HTML"""
+        # Only a fresh context is created per scrape; the browser itself
+        # is shared and stays alive between requests.
+        render_start = time.perf_counter()
+        async with browser_pool.context(storage_state=self.storage_state) as context:
+            # Waiting for a free context, launching the browser if needed, new_context()
+            self.timings.add("browser_context", time.perf_counter() - render_start)
+
+            blocker = None
+            if settings.BLOCK_RESOURCES:
+                blocker = ResourceBlocker()
+                await blocker.attach(context)
+
+            try:
                 self.page = await context.new_page()
+                self.page.on("request", self._on_request_started)
+                self.page.on("requestfinished", self._on_request_done)
+                self.page.on("requestfailed", self._on_request_done)
 
                 # ✅ Log that we're starting
                 print(f"Starting JS scraper for: {self.url}")
                 print(f"Initial interactions state: {self.interactions}")
 
-                await self.page.goto(self.url, wait_until="domcontentloaded", timeout=30000)
-                await self._wait_for_page_ready()
-                await self._remove_noise()
+                with self.timings.phase("goto"):
+                    response = await self._goto()
+                if response is not None:
+                    self.validators = {
+                        "etag": response.headers.get("etag"),
+                        "last_modified": response.headers.get("last-modified")
+                    }
+
+                with self.timings.phase("ready_wait"):
+                    await self._wait_for_page_ready()
+                with self.timings.phase("noise_removal"):
+                    await self._remove_noise()
 
                 # ✅ Perform interactions
                 await self._perform_interactions()
@@ -51,70 +188,159 @@ class JSScraper(BaseScraper):
                 # ✅ Log after interactions
                 print(f"After interactions - clicks: {len(self.interactions['clicks'])}, scrolls: {self.interactions['scrolls']}")
 
-                # Get final HTML
-                html = await self.page.content()
+                # Get final HTML; it is parsed after the context is released
+                with self.timings.phase("content"):
+                    html = await self.page.content()
+                self.render_time = time.perf_counter() - render_start
 
-                # Parse HTML using StaticScraper - but preserve our interactions
-                static_scraper = StaticScraper(self.url)
-                
-                # ✅ Get the static scraping result
-                result = static_scraper.scrape_from_html(html)
-                
-                # ✅ PRESERVE OUR INTERACTIONS
-                result["interactions"] = self.interactions  # This should have clicks and scrolls
-                result["strategy"] = "js"
-                
-                # ✅ Also preserve errors
-                if self.errors:
-                    result["errors"] = self.errors + result.get("errors", [])
-                
-                print(f"Final result interactions: {result.get('interactions')}")
-                return result
+                await self._capture_storage_state(context)
+                return html
+
+            finally:
+                self.page = None
+                if blocker is not None:
+                    self.resources = blocker.stats()
+
+    async def accept_consent(self, selectors: List[str]) -> Optional[str]:
+        """
+        Load the page in a blank context and click the first visible consent
+        "accept" button among selectors. Returns the selector clicked (None
+        if there was none) and leaves the resulting state in storage_state.
+        """
+        async with browser_pool.context() as context:
+            try:
+                self.page = await context.new_page()
+                self.page.on("request", self._on_request_started)
+                self.page.on("requestfinished", self._on_request_done)
+                self.page.on("requestfailed", self._on_request_done)
+
+                await self._goto()
+                await self._wait_for_page_ready()
+
+                for selector in selectors:
+                    button = self.page.locator(selector).first
+                    try:
+                        if not await button.is_visible():
+                            continue
+                        await button.click(timeout=2000)
+                    except Exception:
+                        continue
+
+                    print(f"Accepted consent on {self.url} with {selector}")
+                    await self._wait_for_settled(settings.CLICK_SETTLE_TIMEOUT)
+                    await self._capture_storage_state(context)
+                    return selector
+
+                return None
 
+            finally:
+                self.page = None
+
+    async def _capture_storage_state(self, context: BrowserContext):
+        if not settings.STORAGE_STATES_ENABLED:
+            return
+        try:
+            self.storage_state = await context.storage_state()
         except Exception as e:
-            self.errors.append({"message": str(e), "phase": "render"})
-            # Fall back to static but preserve what we have
-            static_result = await StaticScraper(self.url).scrape()
-            static_result["interactions"] = self.interactions
-            static_result["errors"] = self.errors + static_result.get("errors", [])
-            return static_result
+            print(f"Could not read the storage state of {self.url}: {str(e)}")
 
-        finally:
-            if self.browser:
-                await self.browser.close()
+    async def _goto(self) -> Optional[Response]:
+        """Navigate to the URL, paced and retried like static fetches (see HostRateLimiter)"""
+        deadline = rate_limiter.deadline()
+        attempt = 0
+
+        while True:
+            await rate_limiter.acquire(self.url, deadline)
+            started = time.monotonic()
+
+            try:
+                response = await self.page.goto(self.url, wait_until="domcontentloaded", timeout=30000)
+            except PlaywrightError:
+                rate_limiter.observe(self.url, None, time.monotonic() - started, kind="navigation")
+                delay = rate_limiter.retry_delay(attempt, deadline)
+                if delay is None:
+                    raise
+            else:
+                # None for same-document navigations, which made no request
+                if response is None:
+                    return None
+
+                retry_after = response.headers.get("retry-after")
+                # Time to DOMContentLoaded is not comparable to a fetch's time to headers
+                rate_limiter.observe(
+                    self.url, response.status, time.monotonic() - started, retry_after, kind="navigation"
+                )
+                if response.status not in settings.RETRY_STATUSES:
+                    return response
+
+                delay = rate_limiter.retry_delay(attempt, deadline, retry_after)
+                if delay is None:
+                    return response
+
+            attempt += 1
+            print(f"Retrying navigation to {self.url} in {delay:.1f}s (attempt {attempt + 1})")
+            async with admission.paused():
+                await asyncio.sleep(delay)
 
     # ------------------------------------------------------------------
     # PAGE WAIT
     # ------------------------------------------------------------------
 
     async def _wait_for_page_ready(self):
+        await self._wait_for_settled(settings.PAGE_READY_TIMEOUT)
+
+    async def _wait_for_settled(self, timeout_ms: int):
+        """
+        Wait until the DOM (and, with WAIT_FOR_NETWORK_IDLE, the network)
+        has been quiet for SETTLE_QUIET_WINDOW ms, for at most timeout_ms.
+        """
+        waits = [self._wait_for_dom_quiet(timeout_ms)]
+        if settings.WAIT_FOR_NETWORK_IDLE:
+            waits.append(self._wait_for_network_idle())
+
         try:
-            await self.page.wait_for_function(
-                "() => document.readyState === 'complete'", timeout=15000
-            )
-            await self.page.wait_for_selector("body", timeout=10000)
-            await self.page.wait_for_selector("button, a", timeout=5000)
-            await asyncio.sleep(1)
-        except:
+            await asyncio.wait_for(asyncio.gather(*waits), timeout_ms / 1000)
+        except asyncio.TimeoutError:
             pass
+        except Exception as e:
+            # e.g. the page navigated while we were waiting
+            print(f"Settle wait failed: {str(e)}")
+
+    async def _wait_for_dom_quiet(self, timeout_ms: int):
+        await self.page.evaluate(_DOM_QUIET_SCRIPT, [settings.SETTLE_QUIET_WINDOW, timeout_ms])
+
+    async def _wait_for_network_idle(self):
+        """Return once no request has been in flight for SETTLE_QUIET_WINDOW ms"""
+        loop = asyncio.get_running_loop()
+        quiet = settings.SETTLE_QUIET_WINDOW / 1000
+
+        while True:
+            if self._inflight == 0:
+                idle_for = loop.time() - self._last_network_activity
+                if idle_for >= quiet:
+                    return
+                await asyncio.sleep(quiet - idle_for)
+            else:
+                await asyncio.sleep(0.05)
+
+    def _on_request_started(self, request: Request):
+        self._inflight += 1
+        self._last_network_activity = asyncio.get_running_loop().time()
+
+    def _on_request_done(self, request: Request):
+        self._inflight = max(0, self._inflight - 1)
+        self._last_network_activity = asyncio.get_running_loop().time()
 
     # ------------------------------------------------------------------
     # REMOVE NOISE
     # ------------------------------------------------------------------
 
     async def _remove_noise(self):
-        selectors = [
-            '[id*="cookie"]',
-            '[class*="cookie"]',
-            '[aria-label*="cookie"]',
-            '[class*="consent"]',
-        ]
-        for sel in selectors:
-            try:
-                for el in await self.page.query_selector_all(sel):
-                    await el.evaluate("el => el.remove()")
-            except:
-                pass
+        try:
+            removed = await noise_filter.remove_from_page(self.page)
+            print(f"Removed {removed} noise elements")
+        except Exception as e:
+            print(f"Noise removal failed: {str(e)}")
 
     # ------------------------------------------------------------------
     # INTERACTIONS
@@ -123,16 +349,35 @@ class JSScraper(BaseScraper):
     async def _perform_interactions(self):
         """Perform all interactions"""
         print("Starting interactions...")
-        await self._scroll_page()
-        await self._click_buttons()
+        if self.scroll:
+            with self.timings.phase("scroll"):
+                size = await self._content_size()
+                await self._scroll_page()
+                self.phase_gains["scroll"] = await self._content_size() > size
+
+        if self.click:
+            with self.timings.phase("click"):
+                size = await self._content_size()
+                await self._click_buttons()
+                self.phase_gains["click"] = await self._content_size() > size
+
         await self._handle_pagination()
         print(f"Completed interactions: {self.interactions}")
 
+    async def _content_size(self) -> int:
+        """Length of the visible text, to tell whether a phase added content"""
+        try:
+            return await self.page.evaluate("document.body ? document.body.innerText.length : 0")
+        except Exception:
+            return 0
+
     async def _scroll_page(self):
         """Scroll the page and count scrolls"""
         try:
             print("Starting to scroll...")
             for i in range(settings.MAX_SCROLLS):
+                height = await self.page.evaluate("document.body.scrollHeight")
+
                 # Scroll to bottom
                 await self.page.evaluate("window.scrollTo(0, document.body.scrollHeight)")
                 
@@ -140,15 +385,22 @@ class JSScraper(BaseScraper):
                 self.interactions["scrolls"] += 1
                 print(f"Scroll #{i+1} completed. Total scrolls: {self.interactions['scrolls']}")
                 
-                await asyncio.sleep(2)
-                
-                # Check if we're at the bottom
-                current_position = await self.page.evaluate("window.pageYOffset + window.innerHeight")
-                total_height = await self.page.evaluate("document.body.scrollHeight")
-                
-                if current_position >= total_height:
-                    print("Reached bottom of page")
+                # Wait for lazy-loaded content to grow the page and settle;
+                # SCROLL_DELAY caps both waits together
+                step_start = time.perf_counter()
+                try:
+                    await self.page.wait_for_function(
+                        "height => document.body.scrollHeight > height",
+                        arg=height,
+                        timeout=settings.SCROLL_DELAY
+                    )
+                except PlaywrightTimeoutError:
+                    print("Page did not grow, reached bottom of page")
                     break
+
+                remaining = settings.SCROLL_DELAY - (time.perf_counter() - step_start) * 1000
+                if remaining > 0:
+                    await self._wait_for_settled(int(remaining))
                     
         except Exception as e:
             error_msg = f"Scroll error: {str(e)}"
@@ -157,78 +409,76 @@ class JSScraper(BaseScraper):
 
     async def _click_buttons(self):
         """Click interactive elements"""
-        selectors = [
-            'button',
-            'a',
-            '[role="button"]',
-            '[aria-expanded]',
-            'button:has-text("More")',
-            'button:has-text("Load")',
-            'button:has-text("Show")',
-            'button:has-text("View")',
-            'button:has-text("Next")',
-        ]
+        try:
+            await self._click_candidates()
+        finally:
+            try:
+                await self.page.evaluate(_CLEAR_CLICK_CANDIDATES_SCRIPT)
+            except Exception as e:
+                print(f"Error clearing click candidates: {str(e)}")
 
+    async def _click_candidates(self):
+        try:
+            candidates = await self.page.evaluate(
+                _FIND_CLICK_CANDIDATES_SCRIPT,
+                [self.CLICK_CANDIDATES, self.CLICKS_PER_SELECTOR]
+            )
+        except Exception as e:
+            print(f"Error finding click candidates: {str(e)}")
+            return
+
+        print(f"Found {len(candidates)} click candidates")
+
+        start_url = urldefrag(self.page.url).url
         clicked = set()
         click_count = 0
 
-        for sel in selectors:
-            try:
-                elements = await self.page.query_selector_all(sel)
-                print(f"Found {len(elements)} elements for selector: {sel}")
-                
-                for el in elements[:5]:  # Limit to first 5 per selector
-                    try:
-                        if not await el.is_visible():
-                            continue
-
-                        text = (await el.text_content() or "").strip()
-                        if len(text) < 2:
-                            continue
+        for candidate in candidates:
+            text = candidate["text"]
+            element_id = candidate["id"]
 
-                        # Create a unique key
-                        element_id = await el.evaluate("el => el.id || ''")
-                        key = f"{sel}-{text[:30]}-{element_id}"
-                        
-                        if key in clicked:
-                            continue
+            key = f"{text[:30]}-{element_id}"
+            if key in clicked:
+                continue
 
-                        # Scroll into view and click
-                        await el.scroll_into_view_if_needed()
-                        await el.click(force=True, timeout=3000)
-
-                        # ✅ ADD CLICK RECORD
-                        click_record = {
-                            "text": text[:50],
-                            "selector": sel,
-                            "element_id": element_id,
-                            "timestamp": datetime.utcnow().isoformat()
-                        }
-                        self.interactions["clicks"].append(click_record)
-                        clicked.add(key)
-                        click_count += 1
-                        
-                        print(f"Clicked: {text[:50]}")
-
-                        await asyncio.sleep(1)
-                        
-                    except Exception as e:
-                        print(f"Failed to click element: {str(e)}")
-                        continue
-                        
+            try:
+                # click() scrolls the element into view itself
+                await self.page.click(
+                    f'[{_CANDIDATE_ATTRIBUTE}="{candidate["handle"]}"]',
+                    force=True,
+                    timeout=3000
+                )
             except Exception as e:
-                print(f"Error with selector {sel}: {str(e)}")
+                print(f"Failed to click element: {str(e)}")
                 continue
-        
+
+            # ✅ ADD CLICK RECORD
+            click_record = {
+                "text": text[:50],
+                "selector": candidate["selector"],
+                "element_id": element_id,
+                "timestamp": datetime.utcnow().isoformat()
+            }
+            self.interactions["clicks"].append(click_record)
+            clicked.add(key)
+            click_count += 1
+
+            print(f"Clicked: {text[:50]}")
+
+            await self._wait_for_settled(settings.CLICK_SETTLE_TIMEOUT)
+
+            # The remaining candidates belonged to the page we navigated away from
+            if urldefrag(self.page.url).url != start_url:
+                print("Click navigated away, stopping clicks")
+                break
+
         print(f"Total clicks performed: {click_count}")
 
     async def _handle_pagination(self):
         """
-        Handle pagination or multi-page navigation.
-        For this MVP, pagination is handled implicitly
-        via scrolling and click interactions.
+        Pagination across URLs is not followed here: the rendered HTML's
+        rel=next / pagination links end up in result["pagination"] and
+        CrawlService (POST /api/crawl) fetches those pages concurrently.
+        In-page "load more" pagination is covered by scrolling and clicks.
         """
-        print("Handling pagination...")
-        # For now, this is a placeholder method
-        # You can implement actual pagination logic here if needed
         return
\ No newline at end of file
@@ -0,0 +1,65 @@
+from typing import List, Optional
+
+import soupsieve
+from playwright.async_api import Page
+
+from app.config import settings
+
+# Removes every match of a selector in one call; returns how many were removed
+_REMOVE_NOISE_SCRIPT = """
+(selector) => {
+    const protectedNodes = [document.documentElement, document.head, document.body];
+    let removed = 0;
+    for (const el of document.querySelectorAll(selector)) {
+        // Descendants of an element removed earlier are already detached
+        if (protectedNodes.includes(el) || !el.isConnected) continue;
+        el.remove();
+        removed++;
+    }
+    return removed;
+}
+"""
+
+
+class NoiseFilter:
+    """
+    Removes cookie banners, modals, popups and similar noise before
+    sections are extracted.
+
+    Settings.NOISE_SELECTORS is compiled once into a single grouped
+    selector. The JS engine strips matches in the live page with one
+    script call; the static engine prunes them from the parsed tree
+    (see BaseParser.load). <html>, <head> and <body> are never removed,
+    even when a selector matches them (e.g. body.modal-open).
+    """
+
+    PROTECTED_TAGS = {"html", "head", "body"}
+
+    def __init__(self, selectors: Optional[List[str]] = None):
+        if selectors is None:
+            selectors = settings.NOISE_SELECTORS
+
+        self.selectors = []
+        for selector in selectors:
+            try:
+                soupsieve.compile(selector)
+            except Exception as e:
+                # One bad selector would otherwise break the whole group
+                print(f"Ignoring invalid noise selector {selector!r}: {str(e)}")
+                continue
+            self.selectors.append(selector)
+
+        self.selector = ", ".join(self.selectors)
+
+    @property
+    def enabled(self) -> bool:
+        return settings.NOISE_FILTER_ENABLED and bool(self.selector)
+
+    async def remove_from_page(self, page: Page) -> int:
+        """Remove every noise element from a rendered page in one call"""
+        if not self.enabled:
+            return 0
+        return await page.evaluate(_REMOVE_NOISE_SCRIPT, self.selector)
+
+
+noise_filter = NoiseFilter()
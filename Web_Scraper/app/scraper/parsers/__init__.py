@@ -0,0 +1,32 @@
+from typing import Dict, Optional, Type
+
+from .base import BaseParser, ParsedDocument
+from app.scraper.projection import Projection
+from .bs4_parser import BeautifulSoupParser
+from .stream_parser import StreamingParser
+from app.config import settings
+
+PARSERS: Dict[str, Type[BaseParser]] = {
+    BeautifulSoupParser.name: BeautifulSoupParser,
+}
+
+try:
+    from .selectolax_parser import SelectolaxParser
+    PARSERS[SelectolaxParser.name] = SelectolaxParser
+except ImportError:
+    SelectolaxParser = None
+
+
+def get_parser(url: str, backend: Optional[str] = None, projection: Optional[Projection] = None) -> BaseParser:
+    """Create a parser for url using the configured backend (falls back to bs4)"""
+    backend = backend or settings.PARSER_BACKEND
+    parser_class = PARSERS.get(backend)
+
+    if parser_class is None:
+        print(f"Parser backend '{backend}' is not available, using bs4")
+        parser_class = BeautifulSoupParser
+
+    return parser_class(url, projection)
+
+
+__all__ = ['BaseParser', 'ParsedDocument', 'BeautifulSoupParser', 'SelectolaxParser', 'StreamingParser', 'PARSERS', 'get_parser']
@@ -0,0 +1,519 @@
+from abc import ABC, abstractmethod
+from typing import List, Dict, Any, Optional, Iterable, Iterator
+
+from app.models import Section, Content, Link, Image, SectionType, Meta
+from app.scraper.utils import URLUtils, ContentUtils
+from app.scraper.noise_filter import noise_filter
+from app.scraper.projection import Projection, FULL_PROJECTION
+from app.config import settings
+
+# Node kinds returned by BaseParser._kind
+TEXT = "text"
+ELEMENT = "element"
+
+
+class SectionBuilder:
+    """Content the single-pass walk assigns to one section"""
+
+    def __init__(self, tag: str, node: Any, parent: Optional["SectionBuilder"] = None):
+        self.tag = tag
+        self.node = node
+        self.parent = parent
+        self.text_parts: List[str] = []
+        self.headings: List[str] = []
+        self.links: List[Link] = []
+        self.images: List[Image] = []
+        self.label_heading: Optional[str] = None
+        # Raw href / src values, collected whatever the projection so the
+        # fingerprint does not depend on it
+        self.references: List[str] = []
+        self._fingerprint: Optional[str] = None
+
+    def merge(self, child: "SectionBuilder"):
+        """Append a closed child's content (it always follows ours in document order)"""
+        self.text_parts.extend(child.text_parts)
+        self.headings.extend(child.headings)
+        self.links.extend(child.links)
+        self.images.extend(child.images)
+        self.references.extend(child.references)
+        if self.label_heading is None:
+            self.label_heading = child.label_heading
+
+    @property
+    def fingerprint(self) -> str:
+        """Hash of the section's text, headings and link / image targets"""
+        if self._fingerprint is None:
+            parts = [self.tag, *self.headings, "", *self.text_parts, "", *self.references]
+            self._fingerprint = ContentUtils.generate_fingerprint(parts)
+        return self._fingerprint
+
+    def to_content(self) -> Content:
+        return Content.model_construct(
+            headings=self.headings,
+            text=" ".join(self.text_parts),
+            links=self.links,
+            images=self.images,
+            lists=[],
+            tables=[]
+        )
+
+
+class ParsedDocument:
+    """
+    A walked document whose Section models are built lazily.
+
+    Building a section (models, rawHtml) is the expensive part, so callers
+    that stream can turn one section into output before building the next.
+    """
+
+    def __init__(
+        self,
+        parser: "SectionParser",
+        meta: Meta,
+        spa_root: bool,
+        pagination: List[str],
+        body: SectionBuilder,
+        builders: List[SectionBuilder],
+    ):
+        self.parser = parser
+        self.meta = meta
+        self.spa_root = spa_root
+        self.pagination = pagination
+        self.body = body
+        self.builders = builders
+
+    @property
+    def _candidates(self) -> List[SectionBuilder]:
+        with_text = [builder for builder in self.builders if builder.text_parts]
+        return with_text or [self.body]
+
+    @property
+    def has_sections(self) -> bool:
+        return any(builder.text_parts for builder in self._candidates)
+
+    @property
+    def text(self) -> str:
+        """All section text, for sufficiency checks before sections are built"""
+        return " ".join(" ".join(builder.text_parts) for builder in self._candidates)
+
+    @property
+    def fingerprint(self) -> str:
+        """
+        Hash of the metadata and every section's content, known before any
+        section is built.
+        """
+        parts = [self.meta.title, self.meta.description, self.meta.language, self.meta.canonical or ""]
+        parts.extend(builder.fingerprint for builder in self._candidates[:settings.MAX_SECTIONS])
+        return ContentUtils.generate_fingerprint(parts)
+
+    def iter_sections(self) -> Iterator[Section]:
+        built = 0
+        for section in self.parser._iter_sections(self.builders):
+            built += 1
+            yield section
+
+        # Fallback: the whole body when there are no usable semantic sections
+        if not built:
+            yield from self.parser._iter_sections([self.body])
+
+
+class SectionParser(ABC):
+    """
+    Turns walked SectionBuilders into Section models.
+
+    Shared by the tree parsers (BaseParser) and the StreamingParser, which
+    walk documents differently but assign content to sections the same way.
+
+    The walk produces already-typed values, so Content, Link, Image and
+    Section are created with model_construct instead of being validated
+    field by field. Parts a Projection leaves out (rawHtml, links, images)
+    are not built at all and stay empty.
+    """
+
+    SEMANTIC_TAGS = {"header", "nav", "main", "section", "article", "footer"}
+    HEADING_TAGS = {"h1", "h2", "h3", "h4", "h5", "h6"}
+    LABEL_HEADING_TAGS = {"h1", "h2", "h3"}
+    # Contents of these tags are not page text
+    SKIPPED_TAGS = {"script", "style", "template"}
+
+    def __init__(self, url: str, projection: Optional[Projection] = None):
+        self.url = url
+        self.projection = projection or FULL_PROJECTION
+        self.errors = []
+
+    def _result(self, document: ParsedDocument) -> Dict[str, Any]:
+        """
+        {"meta", "sections", "spa_root", "pagination", "fingerprint",
+        "unchanged"} of a walked document.
+
+        When the page fingerprint equals the projection's known_fingerprint
+        the caller already has this content, so no section is built and
+        "unchanged" is True.
+        """
+        fingerprint = document.fingerprint
+        unchanged = fingerprint == self.projection.known_fingerprint
+
+        return {
+            "meta": document.meta,
+            "sections": [] if unchanged else list(document.iter_sections()),
+            "spa_root": document.spa_root,
+            "pagination": document.pagination,
+            "fingerprint": fingerprint,
+            "unchanged": unchanged,
+        }
+
+    @abstractmethod
+    def _section_html(self, builder: SectionBuilder) -> str:
+        """Outer HTML of a section (only called when the projection wants rawHtml)"""
+
+    def _iter_sections(self, builders: List[SectionBuilder]) -> Iterator[Section]:
+        built = 0
+        raw_html = self.projection.raw_html
+        ids: Dict[str, int] = {}  # Sections sharing a label get "-2", "-3"... ids
+
+        for builder in builders:
+            # Sections without text of their own are fully covered by their
+            # children (or empty) and are dropped.
+            if not builder.text_parts:
+                continue
+
+            try:
+                section = self._build_section(
+                    builder.tag,
+                    builder.to_content(),
+                    builder.label_heading,
+                    self._section_html(builder) if raw_html else None,
+                    builder.fingerprint
+                )
+            except Exception as e:
+                self.errors.append({"message": str(e), "phase": "parse"})
+                continue
+
+            ids[section.id] = ids.get(section.id, 0) + 1
+            if ids[section.id] > 1:
+                section.id = f"{section.id}-{ids[section.id]}"
+
+            yield section
+            built += 1
+
+            if built >= settings.MAX_SECTIONS:
+                break
+
+    # ---------------- HELPERS ---------------- #
+
+    def _make_absolute_url(self, url: str) -> str:
+        return URLUtils.make_absolute_url(url, self.url)
+
+    def _determine_section_type(self, tag: str) -> SectionType:
+        if tag == "nav":
+            return SectionType.NAV
+        if tag == "footer":
+            return SectionType.FOOTER
+        if tag == "header":
+            return SectionType.HERO
+        if tag == "section":
+            return SectionType.SECTION
+
+        return SectionType.UNKNOWN
+
+    def _generate_section_label(self, heading: Optional[str], text: str, tag: str) -> str:
+        if heading is not None:
+            return heading
+
+        if text:
+            return " ".join(text.split()[:6])
+
+        return tag.capitalize() if tag else "Content"
+
+    def _build_section(
+        self,
+        tag: str,
+        content: Content,
+        heading: Optional[str],
+        raw_html: Optional[str],
+        fingerprint: str = "",
+    ) -> Section:
+        label = self._generate_section_label(heading, content.text, tag)
+        if raw_html is None:
+            truncated_html, truncated = "", False
+        else:
+            truncated_html, truncated = ContentUtils.truncate_html(raw_html, settings.MAX_RAW_HTML_LENGTH)
+
+        return Section.model_construct(
+            id=ContentUtils.generate_section_id(label),
+            type=self._determine_section_type(tag),
+            label=label,
+            sourceUrl=self.url,
+            content=content,
+            rawHtml=truncated_html,
+            truncated=truncated,
+            fingerprint=fingerprint
+        )
+
+
+class BaseParser(SectionParser):
+    """
+    Base class for HTML parser backends.
+
+    A parser turns one HTML document into the Meta / Section / Content
+    models. Sections are built in a single walk of the tree that assigns
+    every text node, heading, link and image to its innermost semantic
+    section. Backends only provide the node accessors, so every engine
+    produces the same output and they can be swapped with
+    settings.PARSER_BACKEND.
+    """
+
+    name = ""
+
+    def parse(self, html: str) -> Dict[str, Any]:
+        """Parse a document into SectionParser._result's dict"""
+        return self._result(self.load(html))
+
+    def load(self, html: str) -> ParsedDocument:
+        """Parse and walk a document without building its sections yet"""
+        doc = self._load(html)
+
+        if noise_filter.enabled:
+            self._remove_noise(doc)
+
+        root = self._body(doc)
+        if root is None:
+            root = self._html_element(doc)
+
+        if root is None:
+            body, builders = SectionBuilder("body", None), []
+        else:
+            body, builders = self._walk(root)
+
+        return ParsedDocument(
+            self,
+            self._extract_metadata(doc),
+            self._detect_spa_root(doc),
+            self._extract_pagination(doc),
+            body,
+            builders
+        )
+
+    # ---------------- BACKEND ACCESSORS ---------------- #
+
+    @abstractmethod
+    def _load(self, html: str) -> Any:
+        """Parse html into the backend's document object"""
+
+    @abstractmethod
+    def _html_element(self, doc: Any) -> Any:
+        """The <html> element (None if missing)"""
+
+    @abstractmethod
+    def _body(self, doc: Any) -> Any:
+        """The <body> element (None if missing)"""
+
+    @abstractmethod
+    def _select_one(self, doc: Any, selector: str) -> Any:
+        """First node matching a CSS selector (None if no match)"""
+
+    @abstractmethod
+    def _select_all(self, doc: Any, selector: str) -> List[Any]:
+        """All nodes matching a CSS selector, in document order"""
+
+    @abstractmethod
+    def _remove(self, nodes: List[Any]):
+        """Remove nodes (which may be nested in each other) from the tree"""
+
+    @abstractmethod
+    def _kind(self, node: Any) -> Optional[str]:
+        """TEXT, ELEMENT, or None for anything that carries no content"""
+
+    @abstractmethod
+    def _tag(self, node: Any) -> str:
+        """Lower-case tag name of an element"""
+
+    @abstractmethod
+    def _children(self, node: Any) -> Iterable[Any]:
+        """Child nodes (elements and text) in document order"""
+
+    @abstractmethod
+    def _string(self, node: Any) -> str:
+        """Value of a text node"""
+
+    @abstractmethod
+    def _attr(self, node: Any, name: str) -> Optional[str]:
+        """Attribute value; "" for a valueless attribute, None if absent"""
+
+    @abstractmethod
+    def _serialize(self, node: Any) -> str:
+        """Outer HTML of an element"""
+
+    def _section_html(self, builder: SectionBuilder) -> str:
+        return self._serialize(builder.node)
+
+    # ---------------- NOISE ---------------- #
+
+    def _remove_noise(self, doc: Any):
+        """Prune NOISE_SELECTORS matches so they never reach text or rawHtml"""
+        nodes = [
+            node for node in self._select_all(doc, noise_filter.selector)
+            if self._tag(node) not in noise_filter.PROTECTED_TAGS
+        ]
+        if nodes:
+            self._remove(nodes)
+
+    # ---------------- METADATA ---------------- #
+
+    def _extract_metadata(self, doc: Any) -> Meta:
+        meta = Meta()
+
+        title = self._select_one(doc, "title")
+        if title is not None:
+            meta.title = self._collect_text(title, "")
+
+        desc = self._select_one(doc, 'meta[name="description"]')
+        if desc is not None:
+            meta.description = self._attr(desc, "content") or ""
+
+        html = self._html_element(doc)
+        if html is not None:
+            meta.language = self._attr(html, "lang") or ""
+
+        canonical = self._select_one(doc, 'link[rel="canonical"]')
+        if canonical is not None:
+            meta.canonical = self._make_absolute_url(self._attr(canonical, "href"))
+
+        return meta
+
+    # ---------------- SECTIONS ---------------- #
+
+    def _walk(self, root: Any):
+        """
+        Walk the tree once, assigning content to the innermost open section.
+
+        Returns the body builder (content outside any semantic section) and
+        the semantic section builders in document order.
+        """
+        drop_covered = settings.DROP_COVERED_SECTIONS
+        collect_links = self.projection.links
+        collect_images = self.projection.images
+
+        body = SectionBuilder("body", root)
+        builders: List[SectionBuilder] = []
+        current = body
+
+        # Text of the headings / links currently open; text is added to each
+        captures: List[List[str]] = []
+
+        # (node, closing) events; a closing event is pushed before the children
+        stack = [(child, False) for child in reversed(list(self._children(root)))]
+
+        while stack:
+            node, closing = stack.pop()
+
+            if closing:
+                tag = self._tag(node)
+
+                if tag in self.SEMANTIC_TAGS:
+                    if not drop_covered:
+                        current.parent.merge(current)
+                    current = current.parent
+
+                elif tag in self.HEADING_TAGS:
+                    heading = "".join(captures.pop())
+                    current.headings.append(heading)
+                    if tag in self.LABEL_HEADING_TAGS and current.label_heading is None:
+                        current.label_heading = heading
+
+                elif collect_links and tag == "a" and self._attr(node, "href") is not None:
+                    current.links.append(
+                        Link.model_construct(
+                            text="".join(captures.pop()),
+                            href=self._make_absolute_url(self._attr(node, "href"))
+                        )
+                    )
+                continue
+
+            kind = self._kind(node)
+
+            if kind == TEXT:
+                text = self._string(node).strip()
+                if text:
+                    current.text_parts.append(text)
+                    for capture in captures:
+                        capture.append(text)
+                continue
+
+            if kind != ELEMENT:
+                continue
+
+            tag = self._tag(node)
+            if tag in self.SKIPPED_TAGS:
+                continue
+
+            if tag in self.SEMANTIC_TAGS:
+                current = SectionBuilder(tag, node, current)
+                builders.append(current)
+            elif tag in self.HEADING_TAGS:
+                captures.append([])
+            elif tag == "a" and self._attr(node, "href") is not None:
+                current.references.append(self._attr(node, "href"))
+                if collect_links:
+                    captures.append([])
+            elif tag == "img":
+                src = self._attr(node, "src")
+                if src is not None:
+                    current.references.append(src)
+                if collect_images and src is not None:
+                    current.images.append(
+                        Image.model_construct(
+                            src=self._make_absolute_url(src),
+                            alt=self._attr(node, "alt") or ""
+                        )
+                    )
+
+            stack.append((node, True))
+            stack.extend((child, False) for child in reversed(list(self._children(node))))
+
+        return body, builders
+
+    # ---------------- HELPERS ---------------- #
+
+    def _collect_text(self, node: Any, separator: str) -> str:
+        """Stripped, non-empty text of a subtree joined by separator"""
+        parts = []
+        stack = list(self._children(node))
+        stack.reverse()
+
+        while stack:
+            child = stack.pop()
+            kind = self._kind(child)
+
+            if kind == TEXT:
+                text = self._string(child).strip()
+                if text:
+                    parts.append(text)
+            elif kind == ELEMENT and self._tag(child) not in self.SKIPPED_TAGS:
+                children = list(self._children(child))
+                children.reverse()
+                stack.extend(children)
+
+        return separator.join(parts)
+
+    def _detect_spa_root(self, doc: Any) -> bool:
+        """Detect an empty SPA mount point (e.g. <div id="root"></div>)"""
+        for selector in settings.SPA_ROOT_SELECTORS:
+            root = self._select_one(doc, selector)
+            if root is not None and not self._collect_text(root, ""):
+                return True
+        return False
+
+    def _extract_pagination(self, doc: Any) -> List[str]:
+        """Absolute URLs of rel=next and pagination links, next links first"""
+        urls = []
+        for selector in settings.PAGINATION_SELECTORS:
+            for node in self._select_all(doc, selector):
+                href = self._attr(node, "href")
+                if not href or href.startswith(("#", "javascript:", "mailto:")):
+                    continue
+
+                url = self._make_absolute_url(href)
+                if url not in urls and url != self.url:
+                    urls.append(url)
+        return urls
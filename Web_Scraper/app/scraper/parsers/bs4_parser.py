@@ -0,0 +1,60 @@
+from typing import Any, Iterable, List, Optional
+from bs4 import BeautifulSoup, Tag, NavigableString, CData
+
+from app.scraper.parsers.base import BaseParser, TEXT, ELEMENT
+
+# Comments, doctypes and script/style strings are NavigableString subclasses
+# too, so text nodes are matched on their exact type.
+_TEXT_TYPES = (NavigableString, CData)
+
+
+class BeautifulSoupParser(BaseParser):
+    """Parser backend using BeautifulSoup on top of lxml"""
+
+    name = "bs4"
+
+    def _load(self, html: str) -> BeautifulSoup:
+        return BeautifulSoup(html, "lxml")
+
+    def _html_element(self, doc: BeautifulSoup) -> Optional[Tag]:
+        return doc.html
+
+    def _body(self, doc: BeautifulSoup) -> Optional[Tag]:
+        return doc.body
+
+    def _select_one(self, doc: BeautifulSoup, selector: str) -> Optional[Tag]:
+        return doc.select_one(selector)
+
+    def _select_all(self, doc: BeautifulSoup, selector: str) -> List[Tag]:
+        return doc.select(selector)
+
+    def _remove(self, nodes: List[Tag]):
+        for node in nodes:
+            # decompose() marks the whole subtree, so nested matches are skipped
+            if not node.decomposed:
+                node.decompose()
+
+    def _kind(self, node: Any) -> Optional[str]:
+        if isinstance(node, Tag):
+            return ELEMENT
+        if type(node) in _TEXT_TYPES:
+            return TEXT
+        return None
+
+    def _tag(self, node: Tag) -> str:
+        return node.name
+
+    def _children(self, node: Tag) -> Iterable[Any]:
+        return node.contents
+
+    def _string(self, node: NavigableString) -> str:
+        return str(node)
+
+    def _attr(self, node: Tag, name: str) -> Optional[str]:
+        value = node.get(name)
+        if isinstance(value, list):
+            return " ".join(value)
+        return value
+
+    def _serialize(self, node: Tag) -> str:
+        return str(node)
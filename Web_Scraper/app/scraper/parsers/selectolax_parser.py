@@ -0,0 +1,64 @@
+from typing import Any, Iterable, List, Optional
+from selectolax.lexbor import LexborHTMLParser, LexborNode
+
+from app.scraper.parsers.base import BaseParser, TEXT, ELEMENT
+
+
+class SelectolaxParser(BaseParser):
+    """Parser backend using selectolax's Lexbor engine"""
+
+    name = "selectolax"
+
+    def _load(self, html: str) -> LexborHTMLParser:
+        return LexborHTMLParser(html)
+
+    def _html_element(self, doc: LexborHTMLParser) -> Optional[LexborNode]:
+        # css_first("html") does not match the root element on every version
+        return doc.root
+
+    def _body(self, doc: LexborHTMLParser) -> Optional[LexborNode]:
+        return doc.body
+
+    def _select_one(self, doc: LexborHTMLParser, selector: str) -> Optional[LexborNode]:
+        return doc.css_first(selector)
+
+    def _select_all(self, doc: LexborHTMLParser, selector: str) -> List[LexborNode]:
+        # One selector at a time: grouped selectors lose document order
+        return doc.css(selector)
+
+    def _remove(self, nodes: List[LexborNode]):
+        # Only the outermost matches are destroyed; destroying a node whose
+        # ancestor was already destroyed would touch freed memory
+        matched = {node.mem_id for node in nodes}
+        for node in nodes:
+            parent = node.parent
+            while parent is not None and parent.mem_id not in matched:
+                parent = parent.parent
+            if parent is None:
+                node.decompose()
+
+    def _kind(self, node: LexborNode) -> Optional[str]:
+        tag = node.tag
+        if tag == "-text":
+            return TEXT
+        if tag.startswith(("-", "!", "_")):
+            return None
+        return ELEMENT
+
+    def _tag(self, node: LexborNode) -> str:
+        return node.tag
+
+    def _children(self, node: LexborNode) -> Iterable[Any]:
+        return node.iter(include_text=True)
+
+    def _string(self, node: LexborNode) -> str:
+        return node.text_content or ""
+
+    def _attr(self, node: LexborNode, name: str) -> Optional[str]:
+        attributes = node.attributes
+        if name not in attributes:
+            return None
+        return attributes[name] or ""
+
+    def _serialize(self, node: LexborNode) -> str:
+        return node.html or ""
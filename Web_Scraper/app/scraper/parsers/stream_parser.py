@@ -0,0 +1,452 @@
+import html
+import re
+from typing import Any, Dict, List, Optional, Tuple
+
+from lxml import etree
+
+from app.models import Meta, Link, Image
+from app.scraper.parsers.base import SectionParser, SectionBuilder, ParsedDocument
+from app.scraper.noise_filter import noise_filter
+from app.scraper.projection import Projection
+from app.config import settings
+
+VOID_TAGS = {
+    "area", "base", "br", "col", "embed", "hr", "img", "input",
+    "link", "meta", "param", "source", "track", "wbr",
+}
+
+# One compound selector part: tag, #id, .class or [attr op "value" i]
+_SELECTOR_TOKEN = re.compile(r"""
+    \s*(?P<child>>)\s*
+  | (?P<descendant>\s+)
+  | (?P<tag>[a-zA-Z][\w-]*|\*)
+  | \#(?P<id>[\w-]+)
+  | \.(?P<cls>[\w-]+)
+  | \[\s*(?P<attr>[\w-]+)\s*
+      (?:(?P<op>[~|^$*]?=)\s*(?:"(?P<dq>[^"]*)"|'(?P<sq>[^']*)'|(?P<bare>[\w-]+))\s*(?P<flag>[iIsS])?\s*)?
+    \]
+""", re.X)
+
+# (element tag, attributes) of one element on the open-element chain
+Element = Tuple[str, Dict[str, str]]
+
+
+class StreamSelector:
+    """
+    A CSS selector matched against the chain of open elements.
+
+    The streaming parser never has a tree, only the element being opened
+    and its ancestors, so selectors are limited to tag / id / class /
+    attribute compounds joined by descendant or child combinators. That
+    covers NOISE_SELECTORS, SPA_ROOT_SELECTORS and PAGINATION_SELECTORS;
+    compile() returns None for anything else.
+    """
+
+    def __init__(self, parts: List[Tuple[Optional[str], List[tuple], Optional[str]]]):
+        # (tag, attribute tests, combinator to the next part on the left), rightmost first
+        self.parts = parts
+
+        # What an element needs to possibly match: "@attr", a tag, or "" for anything
+        tag, tests, _ = parts[0]
+        self.key = "@" + tests[0][0] if tests else tag or ""
+
+    @classmethod
+    def compile(cls, selector: str) -> Optional["StreamSelector"]:
+        compounds: List[list] = [[None, [], None]]
+        position = 0
+        selector = selector.strip()
+
+        while position < len(selector):
+            match = _SELECTOR_TOKEN.match(selector, position)
+            if match is None or match.end() == position:
+                return None
+            position = match.end()
+            groups = match.groupdict()
+
+            if groups["child"] or groups["descendant"]:
+                compounds[-1][2] = ">" if groups["child"] else " "
+                compounds.append([None, [], None])
+            elif groups["tag"]:
+                compounds[-1][0] = None if groups["tag"] == "*" else groups["tag"].lower()
+            elif groups["id"]:
+                compounds[-1][1].append(("id", "=", groups["id"], False))
+            elif groups["cls"]:
+                compounds[-1][1].append(("class", "~=", groups["cls"], False))
+            else:
+                value = next((groups[name] for name in ("dq", "sq", "bare") if groups[name] is not None), None)
+                ignore_case = (groups["flag"] or "").lower() == "i"
+                if ignore_case and value is not None:
+                    value = value.lower()
+                compounds[-1][1].append((groups["attr"].lower(), groups["op"], value, ignore_case))
+
+        # The combinator is stored on the part to its left; shift it right-to-left
+        parts = []
+        for index in range(len(compounds) - 1, -1, -1):
+            tag, tests, _ = compounds[index]
+            combinator = compounds[index - 1][2] if index > 0 else None
+            parts.append((tag, tests, combinator))
+        return cls(parts)
+
+    def match(self, chain: List[Element]) -> bool:
+        """Whether the last element of chain matches"""
+        return self._match(chain, 0, len(chain) - 1)
+
+    def _match(self, chain: List[Element], part: int, index: int) -> bool:
+        tag, tests, combinator = self.parts[part]
+        if not self._match_compound(tag, tests, chain[index]):
+            return False
+        if combinator is None:
+            return True
+
+        if combinator == ">":
+            return index > 0 and self._match(chain, part + 1, index - 1)
+        return any(self._match(chain, part + 1, ancestor) for ancestor in range(index - 1, -1, -1))
+
+    @staticmethod
+    def _match_compound(tag: Optional[str], tests: List[tuple], element: Element) -> bool:
+        if tag is not None and element[0] != tag:
+            return False
+
+        attrs = element[1]
+        for name, op, expected, ignore_case in tests:
+            value = attrs.get(name)
+            if value is None:
+                return False
+            if op is None:
+                continue
+            if ignore_case:
+                value = value.lower()
+
+            if op == "=":
+                matched = value == expected
+            elif op == "~=":
+                matched = expected in value.split()
+            elif op == "*=":
+                matched = bool(expected) and expected in value
+            elif op == "^=":
+                matched = bool(expected) and value.startswith(expected)
+            elif op == "$=":
+                matched = bool(expected) and value.endswith(expected)
+            else:  # |=
+                matched = value == expected or value.startswith(expected + "-")
+
+            if not matched:
+                return False
+        return True
+
+
+class StreamSelectorSet:
+    """
+    Selectors indexed by an attribute name or tag their rightmost part
+    requires, so an element is only tested against selectors it can match.
+    """
+
+    def __init__(self, selectors: List[str]):
+        self.selectors: List[StreamSelector] = []
+        self._index: Dict[str, List[Tuple[int, StreamSelector]]] = {}
+
+        for selector in selectors:
+            stream_selector = StreamSelector.compile(selector)
+            if stream_selector is None:
+                print(f"Selector {selector!r} is not supported by the streaming parser, ignoring it there")
+                continue
+
+            self._index.setdefault(stream_selector.key, []).append((len(self.selectors), stream_selector))
+            self.selectors.append(stream_selector)
+
+    def __len__(self) -> int:
+        return len(self.selectors)
+
+    def matching(self, chain: List[Element]) -> List[int]:
+        """Indexes of the selectors the last element of chain matches"""
+        tag, attrs = chain[-1]
+        candidates = list(self._index.get("", ()))
+        candidates.extend(self._index.get(tag, ()))
+        for name in attrs:
+            candidates.extend(self._index.get("@" + name, ()))
+
+        return [index for index, selector in candidates if selector.match(chain)]
+
+
+class StreamSectionBuilder(SectionBuilder):
+    """A section whose rawHtml is captured from parser events, up to MAX_RAW_HTML_LENGTH"""
+
+    def __init__(self, tag: str, parent: Optional[SectionBuilder] = None):
+        super().__init__(tag, None, parent)
+        self.raw_parts: List[str] = []
+        self.raw_length = 0
+
+
+class StreamingParser(SectionParser):
+    """
+    Incremental parser for documents too large to hold in memory.
+
+    Chunks are fed to lxml's feed parser with this object as its target,
+    so no tree is ever built: start / end / data events drive the same
+    assignment of text, headings, links and images to sections as
+    BaseParser._walk. Memory is bounded by the extracted content plus at
+    most MAX_RAW_HTML_LENGTH of captured markup per open section.
+
+    NOISE_SELECTORS, SPA_ROOT_SELECTORS and PAGINATION_SELECTORS are
+    matched against the chain of open elements (see StreamSelectorSet).
+    """
+
+    NOISE_SELECTORS = StreamSelectorSet(noise_filter.selectors)
+    SPA_ROOT_SELECTORS = StreamSelectorSet(settings.SPA_ROOT_SELECTORS)
+    PAGINATION_SELECTORS = StreamSelectorSet(settings.PAGINATION_SELECTORS)
+
+    def __init__(self, url: str, projection: Optional[Projection] = None, encoding: str = "utf-8"):
+        super().__init__(url, projection)
+        self._parser = etree.HTMLParser(target=self, encoding=encoding, huge_tree=True, no_network=True)
+
+        self._drop_covered = settings.DROP_COVERED_SECTIONS
+        self._collect_links = self.projection.links
+        self._collect_images = self.projection.images
+        self._raw_html = self.projection.raw_html
+        self._noise = noise_filter.enabled and len(self.NOISE_SELECTORS) > 0
+
+        self._chain: List[Element] = []  # Open elements, outermost first
+        self._roles: List[Optional[str]] = []  # What each open element means to the walk
+        self._text: List[str] = []  # Data events since the last tag: one text node
+        self._noise_depth = 0  # > 0 inside a removed noise element
+        self._skipped_depth = 0  # > 0 inside script / style / template
+
+        self.meta = Meta()
+        self._title: Optional[List[str]] = None  # Text of the first <title> while it is open
+        self._seen = set()  # Metadata taken from its first element only
+
+        self.body: Optional[StreamSectionBuilder] = None
+        self.builders: List[StreamSectionBuilder] = []
+        self._current: Optional[StreamSectionBuilder] = None
+        self._captures: List[List[str]] = []
+
+        # Per SPA root selector: None until its first match, then [depth, has_text, closed]
+        self._spa_roots: List[Optional[list]] = [None] * len(self.SPA_ROOT_SELECTORS)
+        self._pagination: List[List[str]] = [[] for _ in self.PAGINATION_SELECTORS.selectors]
+
+    # ---------------- FEEDING ---------------- #
+
+    def feed(self, data: bytes):
+        self._parser.feed(data)
+
+    def finish(self) -> Dict[str, Any]:
+        """Close the parser and return BaseParser.parse's dict"""
+        return self._result(self.document())
+
+    def document(self) -> ParsedDocument:
+        """Close the parser and return the walked document, like BaseParser.load"""
+        self._parser.close()
+
+        body = self.body or StreamSectionBuilder("body")
+        return ParsedDocument(self, self.meta, self._spa_root(), self._pagination_urls(), body, self.builders)
+
+    def _section_html(self, builder: StreamSectionBuilder) -> str:
+        return "".join(builder.raw_parts)
+
+    # ---------------- TARGET EVENTS ---------------- #
+
+    def start(self, tag: str, attrib: Dict[str, str]):
+        self._flush_text()
+
+        if self._noise_depth:
+            self._noise_depth += 1
+            return
+
+        attrs = dict(attrib)
+        self._chain.append((tag, attrs))
+
+        if self._noise and tag not in noise_filter.PROTECTED_TAGS and self.NOISE_SELECTORS.matching(self._chain):
+            self._chain.pop()
+            self._noise_depth = 1
+            return
+
+        self._start_metadata(tag, attrs)
+        self._roles.append(self._start_walk(tag, attrs))
+        self._capture(self._start_tag(tag, attrs))
+
+    def end(self, tag: str):
+        self._flush_text()
+
+        if self._noise_depth:
+            self._noise_depth -= 1
+            return
+        if not self._chain:
+            return
+
+        tag, attrs = self._chain[-1]
+        if tag not in VOID_TAGS:
+            self._capture(f"</{tag}>")
+
+        self._end_walk(tag, attrs, self._roles.pop())
+        self._end_metadata(tag)
+        self._chain.pop()
+
+    def data(self, data: str):
+        if not self._noise_depth:
+            self._text.append(data)
+
+    def comment(self, text: str):
+        self._flush_text()
+
+    def close(self):
+        self._flush_text()
+
+    # ---------------- WALK ---------------- #
+
+    def _start_walk(self, tag: str, attrs: Dict[str, str]) -> Optional[str]:
+        if tag == "body" and self.body is None:
+            self.body = self._current = StreamSectionBuilder("body")
+            return "body"
+
+        if self._current is None:
+            return None
+
+        if self._skipped_depth or tag in self.SKIPPED_TAGS:
+            self._skipped_depth += 1
+            return "skipped"
+
+        current = self._current
+        if tag in self.SEMANTIC_TAGS:
+            self._current = StreamSectionBuilder(tag, current)
+            self.builders.append(self._current)
+            return "section"
+
+        if tag in self.HEADING_TAGS:
+            self._captures.append([])
+            return "heading"
+
+        if tag == "a" and "href" in attrs:
+            current.references.append(attrs["href"])
+            if self._collect_links:
+                self._captures.append([])
+                return "link"
+        elif tag == "img" and "src" in attrs:
+            current.references.append(attrs["src"])
+            if self._collect_images:
+                current.images.append(
+                    Image.model_construct(src=self._make_absolute_url(attrs["src"]), alt=attrs.get("alt") or "")
+                )
+        return None
+
+    def _end_walk(self, tag: str, attrs: Dict[str, str], role: Optional[str]):
+        if role == "skipped":
+            self._skipped_depth -= 1
+
+        elif role == "body":
+            self._current = None
+
+        elif role == "section":
+            if not self._drop_covered:
+                self._current.parent.merge(self._current)
+            self._current = self._current.parent
+
+        elif role == "heading":
+            heading = "".join(self._captures.pop())
+            self._current.headings.append(heading)
+            if tag in self.LABEL_HEADING_TAGS and self._current.label_heading is None:
+                self._current.label_heading = heading
+
+        elif role == "link":
+            self._current.links.append(
+                Link.model_construct(
+                    text="".join(self._captures.pop()),
+                    href=self._make_absolute_url(attrs["href"])
+                )
+            )
+
+    def _flush_text(self):
+        """Handle the data events since the last tag as one text node"""
+        if not self._text:
+            return
+        text = "".join(self._text)
+        self._text.clear()
+
+        if self._title is not None:
+            self._title.append(text.strip())
+
+        if self._skipped_depth:
+            self._capture(text)
+            return
+
+        self._capture(html.escape(text, quote=False))
+        stripped = text.strip()
+        if not stripped:
+            return
+
+        for state in self._spa_roots:
+            if state is not None and not state[2]:
+                state[1] = True
+
+        if self._current is not None:
+            self._current.text_parts.append(stripped)
+            for capture in self._captures:
+                capture.append(stripped)
+
+    def _capture(self, markup: str):
+        """Append markup to the rawHtml of every open section that is not full yet"""
+        if not self._raw_html:
+            return
+
+        builder = self._current
+        while builder is not None:
+            if builder.raw_length <= settings.MAX_RAW_HTML_LENGTH:
+                builder.raw_parts.append(markup)
+                builder.raw_length += len(markup)
+            builder = builder.parent
+
+    @staticmethod
+    def _start_tag(tag: str, attrs: Dict[str, str]) -> str:
+        if not attrs:
+            return f"<{tag}>"
+        rendered = " ".join(f'{name}="{html.escape(value)}"' for name, value in attrs.items())
+        return f"<{tag} {rendered}>"
+
+    # ---------------- METADATA ---------------- #
+
+    def _start_metadata(self, tag: str, attrs: Dict[str, str]):
+        if tag == "html" and "html" not in self._seen:
+            self._seen.add("html")
+            self.meta.language = attrs.get("lang") or ""
+        elif tag == "title" and "title" not in self._seen:
+            self._seen.add("title")
+            self._title = []
+        elif tag == "meta" and attrs.get("name") == "description" and "description" not in self._seen:
+            self._seen.add("description")
+            self.meta.description = attrs.get("content") or ""
+        elif tag == "link" and attrs.get("rel") == "canonical" and "canonical" not in self._seen:
+            self._seen.add("canonical")
+            self.meta.canonical = self._make_absolute_url(attrs.get("href"))
+
+        depth = len(self._chain)
+        for index in self.SPA_ROOT_SELECTORS.matching(self._chain):
+            if self._spa_roots[index] is None:
+                self._spa_roots[index] = [depth, False, False]
+
+        if "href" in attrs:
+            for index in self.PAGINATION_SELECTORS.matching(self._chain):
+                self._pagination[index].append(attrs["href"])
+
+    def _end_metadata(self, tag: str):
+        if tag == "title" and self._title is not None:
+            self.meta.title = "".join(self._title)
+            self._title = None
+
+        depth = len(self._chain)
+        for state in self._spa_roots:
+            if state is not None and state[0] == depth:
+                state[2] = True
+
+    def _spa_root(self) -> bool:
+        return any(state is not None and not state[1] for state in self._spa_roots)
+
+    def _pagination_urls(self) -> List[str]:
+        urls = []
+        for hrefs in self._pagination:
+            for href in hrefs:
+                if not href or href.startswith(("#", "javascript:", "mailto:")):
+                    continue
+
+                url = self._make_absolute_url(href)
+                if url not in urls and url != self.url:
+                    urls.append(url)
+        return urls
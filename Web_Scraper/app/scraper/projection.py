@@ -0,0 +1,170 @@
+from typing import Any, Dict, List, Optional, Type, get_args, get_origin
+
+from pydantic import BaseModel
+
+from app.models import ScrapeResult
+
+
+def _model_of(annotation: Any) -> Optional[Type[BaseModel]]:
+    """The model inside an annotation such as List[Section] or Optional[Meta]"""
+    if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+        return annotation
+    for arg in get_args(annotation):
+        model = _model_of(arg)
+        if model is not None:
+            return model
+    return None
+
+
+def _is_list(annotation: Any) -> bool:
+    if get_origin(annotation) is list:
+        return True
+    return any(_is_list(arg) for arg in get_args(annotation))
+
+
+class Projection:
+    """
+    The parts of a ScrapeResult a request asked for.
+
+    Fields are dotted paths relative to the result ("meta",
+    "sections.label", "sections.content.text"); a path selects everything
+    below it, and url / scrapedAt are always returned. The selection is a
+    tree of field names whose leaves are True.
+
+    Besides trimming the response, the parsers read raw_html, links and
+    images to skip work whose output would be dropped: serializing and
+    truncating rawHtml and resolving link and image URLs. A page whose
+    fingerprint equals known_fingerprint (the client's snapshot) is not
+    built at all.
+    """
+
+    ALWAYS = ("url", "scrapedAt")
+
+    def __init__(
+        self,
+        fields: Optional[List[str]] = None,
+        include_raw_html: bool = True,
+        known_fingerprint: Optional[str] = None,
+    ):
+        self.fields = fields
+        self.include_raw_html = include_raw_html
+        self.known_fingerprint = known_fingerprint
+
+        if fields is None:
+            self.tree: Dict[str, Any] = {name: True for name in ScrapeResult.model_fields}
+        else:
+            self.tree = {name: True for name in self.ALWAYS}
+            for path in fields:
+                self._add(self.tree, ScrapeResult, path.split("."), path)
+
+        if not include_raw_html:
+            self._remove(self.tree, ScrapeResult, ["sections", "rawHtml"])
+            self._remove(self.tree, ScrapeResult, ["sections", "truncated"])
+
+        self.raw_html = self.wants("sections.rawHtml")
+        self.links = self.wants("sections.content.links")
+        self.images = self.wants("sections.content.images")
+
+    @property
+    def is_full(self) -> bool:
+        return self.fields is None and self.include_raw_html
+
+    @property
+    def cache_variant(self) -> str:
+        """Part of the cache key: results parsed without some content are cached apart"""
+        skipped = [
+            name for name, wanted in (("rawHtml", self.raw_html), ("links", self.links), ("images", self.images))
+            if not wanted
+        ]
+        return "-" + ",".join(skipped) if skipped else ""
+
+    def wants(self, path: str) -> bool:
+        """Whether any part of the field at path is selected"""
+        node = self.tree
+        for name in path.split("."):
+            node = node.get(name)
+            if node is None:
+                return False
+            if node is True:
+                return True
+        return True
+
+    # ---------------- PYDANTIC INCLUDE ---------------- #
+
+    def include(self, name: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """
+        model_dump include= for the whole result, or for the field name of
+        it (e.g. one streamed section). None means the value is not trimmed.
+        """
+        if self.is_full:
+            return None
+        if name is None:
+            return self._include(self.tree, ScrapeResult)
+
+        node = self.tree.get(name)
+        if node is None or node is True:
+            return None
+        return self._include(node, _model_of(ScrapeResult.model_fields[name].annotation))
+
+    @staticmethod
+    def nest(model: Type[BaseModel], field: str, include: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        """include= for model: every field, with field trimmed by include"""
+        if include is None:
+            return None
+
+        nested: Dict[str, Any] = {name: True for name in model.model_fields}
+        if _is_list(model.model_fields[field].annotation):
+            include = {"__all__": include}
+        nested[field] = include
+        return nested
+
+    def _include(self, tree: Dict[str, Any], model: Type[BaseModel]) -> Dict[str, Any]:
+        include = {}
+        for name, node in tree.items():
+            annotation = model.model_fields[name].annotation
+            value = True if node is True else self._include(node, _model_of(annotation))
+            include[name] = {"__all__": value} if _is_list(annotation) and value is not True else value
+        return include
+
+    # ---------------- TREE ---------------- #
+
+    def _add(self, tree: Dict[str, Any], model: Type[BaseModel], names: List[str], path: str):
+        field = model.model_fields.get(names[0])
+        if field is None:
+            raise ValueError(f"Unknown field '{path}'")
+
+        if len(names) == 1:
+            tree[names[0]] = True
+            return
+
+        submodel = _model_of(field.annotation)
+        if submodel is None:
+            raise ValueError(f"Unknown field '{path}'")
+
+        node = tree.get(names[0])
+        if node is True:
+            # Already selected as a whole; only validate the rest of the path
+            node = {}
+        else:
+            node = tree.setdefault(names[0], {})
+        self._add(node, submodel, names[1:], path)
+
+    def _remove(self, tree: Dict[str, Any], model: Type[BaseModel], names: List[str]):
+        node = tree.get(names[0])
+        if node is None:
+            return
+
+        if len(names) == 1:
+            del tree[names[0]]
+            return
+
+        submodel = _model_of(model.model_fields[names[0]].annotation)
+        if node is True:
+            node = tree[names[0]] = {name: True for name in submodel.model_fields}
+        self._remove(node, submodel, names[1:])
+
+        if not node:
+            del tree[names[0]]
+
+
+FULL_PROJECTION = Projection()
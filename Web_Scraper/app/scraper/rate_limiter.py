@@ -0,0 +1,239 @@
+import asyncio
+import random
+import time
+from collections import OrderedDict
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Dict, Any, Optional
+from urllib.parse import urlparse
+
+from app.config import settings
+
+
+class RetryBudgetExceeded(Exception):
+    """Waiting for a host would exceed the request's RETRY_BUDGET"""
+
+
+class HostBucket:
+    """
+    Token bucket for one host whose rate adapts to how the host responds.
+
+    Additive increase on fast successes; multiplicative decrease on
+    throttling (429 / 503), server errors, connection failures and on
+    latency well above the host's baseline. Decreases are applied at most
+    once per RATE_LIMIT_DECREASE_INTERVAL so a burst of in-flight failures
+    counts as one signal.
+
+    Latency is tracked per kind of request, since a static fetch (time to
+    headers) and a browser navigation (time to DOMContentLoaded) are not
+    comparable. The baseline is the lowest recent latency: it drifts up
+    towards the average by RATE_LIMIT_BASELINE_DECAY per response, so one
+    unusually fast response does not count every later one as slow.
+    """
+
+    def __init__(self):
+        self.rate = settings.RATE_LIMIT_INITIAL_RPS
+        self.tokens = float(settings.RATE_LIMIT_BURST)
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0  # Set from Retry-After
+        self.last_decrease = 0.0
+
+        self.latency: Dict[str, float] = {}  # Moving average per kind, seconds
+        self.baseline: Dict[str, float] = {}  # Lowest recent latency per kind
+
+    def reserve(self, now: float) -> float:
+        """
+        Take a token, going into debt if there is none, and return the
+        seconds until the request may be sent. Waiting requests each hold
+        their own slot, so they are released one by one at the host's rate.
+        """
+        self.tokens = min(settings.RATE_LIMIT_BURST, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        self.tokens -= 1
+
+        wait = max(0.0, self.blocked_until - now)
+        if self.tokens < 0:
+            wait = max(wait, -self.tokens / self.rate)
+        return wait
+
+    def increase(self):
+        self.rate = min(settings.RATE_LIMIT_MAX_RPS, self.rate + settings.RATE_LIMIT_INCREASE)
+
+    def decrease(self, now: float):
+        if now - self.last_decrease < settings.RATE_LIMIT_DECREASE_INTERVAL:
+            return
+        self.last_decrease = now
+        self.rate = max(settings.RATE_LIMIT_MIN_RPS, self.rate * settings.RATE_LIMIT_DECREASE)
+
+    def observe_latency(self, kind: str, seconds: float) -> bool:
+        """Record a response time of a kind of request; True if it is slow for this host"""
+        latency = self.latency.get(kind)
+        alpha = settings.RATE_LIMIT_LATENCY_ALPHA
+        latency = self.latency[kind] = seconds if latency is None else alpha * seconds + (1 - alpha) * latency
+
+        baseline = self.baseline.get(kind)
+        if baseline is not None:
+            baseline += settings.RATE_LIMIT_BASELINE_DECAY * max(0.0, latency - baseline)
+        baseline = self.baseline[kind] = seconds if baseline is None else min(baseline, seconds)
+
+        return latency > baseline * settings.RATE_LIMIT_LATENCY_FACTOR
+
+
+class HostRateLimiter:
+    """
+    Per-host request pacing and retry scheduling, shared by every fetch.
+
+    acquire() is awaited before each request to a host (static fetches and
+    JS navigations alike) and observe() is told how it went. Buckets of the
+    RATE_LIMIT_MAX_HOSTS most recently used hosts are kept. retry_delay()
+    decides whether a failed attempt is retried and after how long:
+    Retry-After when the host sent one, otherwise exponential backoff with
+    full jitter, and never past the request's deadline.
+    """
+
+    def __init__(self):
+        self._buckets: "OrderedDict[str, HostBucket]" = OrderedDict()
+
+        self.waits = 0
+        self.total_wait_time = 0.0
+        self.throttled = 0
+        self.retries = 0
+        self.budget_exceeded = 0
+
+    @property
+    def enabled(self) -> bool:
+        return settings.RATE_LIMIT_ENABLED
+
+    def _bucket(self, url: str) -> HostBucket:
+        host = urlparse(url).netloc
+        bucket = self._buckets.get(host)
+        if bucket is None:
+            bucket = HostBucket()
+            self._buckets[host] = bucket
+            if len(self._buckets) > settings.RATE_LIMIT_MAX_HOSTS:
+                self._buckets.popitem(last=False)
+        else:
+            self._buckets.move_to_end(host)
+        return bucket
+
+    def deadline(self) -> float:
+        """monotonic() time by which a fetch started now must be done retrying"""
+        return time.monotonic() + settings.RETRY_BUDGET
+
+    # ---------------- PACING ---------------- #
+
+    async def acquire(self, url: str, deadline: Optional[float] = None):
+        """Wait for the host's next request slot"""
+        if not self.enabled:
+            return
+
+        bucket = self._bucket(url)
+        while True:
+            now = time.monotonic()
+            wait = bucket.reserve(now)
+            if wait <= 0:
+                return
+
+            if deadline is not None and now + wait > deadline:
+                bucket.tokens += 1
+                self.budget_exceeded += 1
+                raise RetryBudgetExceeded(
+                    f"Rate limit for {urlparse(url).netloc} would delay the request past its retry budget"
+                )
+
+            self.waits += 1
+            self.total_wait_time += wait
+            await asyncio.sleep(wait)
+
+            # A Retry-After received while we slept moves the slot back
+            if bucket.blocked_until <= time.monotonic():
+                return
+            bucket.tokens += 1
+
+    def observe(
+        self,
+        url: str,
+        status: Optional[int],
+        latency: float,
+        retry_after: Optional[str] = None,
+        kind: str = "fetch",
+    ):
+        """
+        Adapt the host's rate to a response (status None: the request
+        failed). kind separates latencies that are not comparable, e.g.
+        "fetch" and "navigation".
+        """
+        if not self.enabled:
+            return
+
+        bucket = self._bucket(url)
+        now = time.monotonic()
+
+        if status is None or status in settings.RETRY_STATUSES:
+            if status in (429, 503):
+                self.throttled += 1
+            delay = self.parse_retry_after(retry_after)
+            if delay is not None:
+                delay = min(delay, settings.RATE_LIMIT_MAX_BLOCK)
+                bucket.blocked_until = max(bucket.blocked_until, now + delay)
+            bucket.decrease(now)
+            return
+
+        if bucket.observe_latency(kind, latency):
+            bucket.decrease(now)
+        else:
+            bucket.increase()
+
+    # ---------------- RETRIES ---------------- #
+
+    def retry_delay(self, attempt: int, deadline: float, retry_after: Optional[str] = None) -> Optional[float]:
+        """
+        Seconds to wait before retrying after failed attempt number attempt
+        (0-based), or None if the request should not be retried.
+        """
+        if attempt + 1 >= settings.RETRY_MAX_ATTEMPTS:
+            return None
+
+        backoff = random.uniform(0, min(settings.RETRY_BACKOFF_MAX, settings.RETRY_BACKOFF_BASE * 2 ** attempt))
+        delay = max(backoff, self.parse_retry_after(retry_after) or 0.0)
+
+        if time.monotonic() + delay > deadline:
+            self.budget_exceeded += 1
+            return None
+
+        self.retries += 1
+        return delay
+
+    @staticmethod
+    def parse_retry_after(value: Optional[str]) -> Optional[float]:
+        """Retry-After as seconds from now; it is either seconds or an HTTP date"""
+        if not value:
+            return None
+
+        value = value.strip()
+        if value.isdigit():
+            return float(value)
+
+        try:
+            retry_at = parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            return None
+        if retry_at.tzinfo is None:
+            retry_at = retry_at.replace(tzinfo=timezone.utc)
+        return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+    def stats(self) -> Dict[str, Any]:
+        rates = [bucket.rate for bucket in self._buckets.values()]
+        return {
+            "enabled": self.enabled,
+            "hosts": len(self._buckets),
+            "min_host_rate": min(rates) if rates else 0.0,
+            "waits": self.waits,
+            "total_wait_time": round(self.total_wait_time, 3),
+            "throttled": self.throttled,
+            "retries": self.retries,
+            "budget_exceeded": self.budget_exceeded,
+        }
+
+
+rate_limiter = HostRateLimiter()
@@ -1,176 +1,145 @@
-from unittest import result
+import asyncio
+import time
+from typing import Dict, Any, List, Optional, Tuple
+
 import httpx
-from typing import Dict, Any, List, Optional
-from bs4 import BeautifulSoup, Tag
-from urllib.parse import urljoin
 
 from app.scraper.base import BaseScraper
-from app.models import Section, Content, Link, Image, SectionType, Meta
+from app.scraper.http_client import http_client
+from app.scraper.executor import parse_executor
+from app.scraper.parsers import BaseParser, ParsedDocument, StreamingParser
+from app.models import Meta
 from app.config import settings
 
 
 class StaticScraper(BaseScraper):
-    """Static HTML scraper using httpx + BeautifulSoup"""
+    """
+    Static HTML scraper using httpx + the configured parser backend.
+
+    The body is streamed: small documents are buffered and parsed as usual,
+    while a document over STREAM_PARSE_THRESHOLD bytes is fed to a
+    StreamingParser chunk by chunk as it downloads, so it is never held in
+    memory as a whole. Downloads stop at MAX_DOCUMENT_BYTES.
+    """
 
     async def scrape(self) -> Dict[str, Any]:
         try:
-            async with httpx.AsyncClient(timeout=settings.REQUEST_TIMEOUT) as client:
-                response = await client.get(self.url, follow_redirects=True)
-                response.raise_for_status()
-
-                soup = BeautifulSoup(response.text, "lxml")
-
-                meta = self._extract_metadata(soup)
-                sections = self._extract_sections(soup)
-
-                result = {
-                    "meta": meta,
-                    "sections": sections,
-                    "interactions": self.interactions,
-                    "strategy": "static"
-}
-                return result
-
+            result = await self._fetch_and_parse()
+            result["strategy"] = "static"
+            result["validators"] = self.validators
+            result["truncated"] = self.truncated
+            return result
 
         except Exception as e:
             self.errors.append({"message": str(e), "phase": "fetch"})
             return {"meta": Meta(), "sections": [], "strategy": "static"}
 
-    # ---------------- METADATA ---------------- #
-    
-    def _extract_metadata(self, soup: BeautifulSoup) -> Meta:
-        meta = Meta()
-
-        title = soup.select_one("title")
-        if title:
-            meta.title = title.get_text(strip=True)
-
-        desc = soup.select_one('meta[name="description"]')
-        if desc:
-            meta.description = desc.get("content", "")
-
-        html = soup.select_one("html")
-        if html:
-            meta.language = html.get("lang", "")
-
-        canonical = soup.select_one('link[rel="canonical"]')
-        if canonical:
-            meta.canonical = self._make_absolute_url(canonical.get("href"))
-
-        return meta
-
-    # ---------------- SECTIONS ---------------- #
-
-    def _extract_sections(self, soup: BeautifulSoup) -> List[Section]:
-        sections: List[Section] = []
-
-        semantic_tags = ["header", "nav", "main", "section", "article", "footer"]
-
-    # 1️⃣ Semantic sections
-        for tag in semantic_tags:
-            for elem in soup.find_all(tag):
-                section = self._create_section_from_element(elem)
-                if section and section.content.text.strip():
-                    sections.append(section)
-    # 2️⃣ Fallback for modern websites (div-based layouts)
-        if not sections:
-            for div in soup.find_all("div", recursive=False):
-                section = self._create_section_from_element(div)
-                if section and section.content.text.strip():
-                    sections.append(section)
-    # 3️⃣ Last fallback: body
-        if not sections and soup.body:
-            section = self._create_section_from_element(soup.body)
-            if section and section.content.text.strip():
-                sections.append(section)
-
-        return sections[: settings.MAX_SECTIONS]
-
-    def _create_section_from_element(self, elem: Tag) -> Optional[Section]:
-        try:
-            section_type = self._determine_section_type(elem)
-            content = self._extract_content(elem)
-            label = self._generate_section_label(content.text, elem)
-
-            raw_html = str(elem)
-            truncated_html, truncated = self._truncate_html(raw_html)
-            section_id = self._generate_section_id(label)
-
-            return Section(
-                id=section_id,
-                type=section_type,
-                label=label,
-                sourceUrl=self.url,
-                content=content,
-                rawHtml=truncated_html,
-                truncated=truncated
-            )
-
-        except Exception as e:
-            self.errors.append({"message": str(e), "phase": "parse"})
-            return None
-
-    # ---------------- CONTENT ---------------- #
-
-    def _extract_content(self, elem: Tag) -> Content:
-        content = Content()
-
-        content.text = elem.get_text(" ", strip=True)
-
-        for h in elem.find_all(["h1", "h2", "h3", "h4", "h5", "h6"]):
-            content.headings.append(h.get_text(strip=True))
-
-        for a in elem.find_all("a", href=True):
-            content.links.append(
-                Link(
-                    text=a.get_text(strip=True),
-                    href=self._make_absolute_url(a["href"])
-                )
-            )
-
-        for img in elem.find_all("img", src=True):
-            content.images.append(
-                Image(
-                    src=self._make_absolute_url(img["src"]),
-                    alt=img.get("alt", "")
-                )
-            )
-
-        return content
-
-    # ---------------- HELPERS ---------------- #
-
-    def _determine_section_type(self, elem: Tag) -> SectionType:
-        tag = elem.name or ""
-
-        if tag == "nav":
-            return SectionType.NAV
-        if tag == "footer":
-            return SectionType.FOOTER
-        if tag == "header":
-            return SectionType.HERO
-        if tag == "section":
-            return SectionType.SECTION
-
-        return SectionType.UNKNOWN
-
-    def _generate_section_label(self, text: str, elem: Tag) -> str:
-        heading = elem.find(["h1", "h2", "h3"])
-        if heading:
-            return heading.get_text(strip=True)
-
-        if text:
-            return " ".join(text.split()[:6])
-
-        return elem.name.capitalize() if elem.name else "Content"
-    def scrape_from_html(self, html: str) -> Dict[str, Any]:
-        soup = BeautifulSoup(html, "lxml")
-        meta = self._extract_metadata(soup)
-        sections = self._extract_sections(soup)
+    async def scrape_from_html(self, html: str) -> Dict[str, Any]:
+        result = await self._parse(html)
+        result["strategy"] = "js"
+        return result
+
+    async def load(self, parser: BaseParser) -> ParsedDocument:
+        """
+        Download and walk the page without building its sections, for
+        callers that build and emit them one at a time. A large document is
+        walked by a StreamingParser as it downloads instead of by parser.
+        """
+        html, streaming = await self._download()
+        with self.timings.phase("parse"):
+            if streaming is None:
+                return await asyncio.to_thread(parser.load, html)
+            return await asyncio.to_thread(streaming.document)
+
+    async def _fetch_and_parse(self) -> Dict[str, Any]:
+        """Download and parse the page, switching to a StreamingParser once it is large"""
+        html, streaming = await self._download()
+        if streaming is None:
+            return await self._parse(html)
+
+        with self.timings.phase("parse"):
+            parsed = await asyncio.to_thread(streaming.finish)
+        parsed["errors"] = streaming.errors
+        return self._result(parsed)
+
+    async def _download(self) -> Tuple[Optional[str], Optional[StreamingParser]]:
+        """
+        Download the page. Returns (html, None) for a document up to
+        STREAM_PARSE_THRESHOLD bytes, or (None, parser) once a larger one
+        has been fed to a StreamingParser chunk by chunk as it arrived.
+        """
+        started = time.perf_counter()
+        parse_time = 0.0
+        chunks: List[bytes] = []
+        buffered = 0
+        parser = None
+
+        async with http_client.stream(self.url) as response:
+            self._accept(response)
+
+            async for chunk in self._read(response):
+                if parser is None:
+                    chunks.append(chunk)
+                    buffered += len(chunk)
+                    if buffered <= settings.STREAM_PARSE_THRESHOLD:
+                        continue
+
+                    parser = StreamingParser(self.url, self.projection, response.charset_encoding or "utf-8")
+                    chunk = b"".join(chunks)
+                    chunks = []
+
+                parse_start = time.perf_counter()
+                await asyncio.to_thread(parser.feed, chunk)
+                parse_time += time.perf_counter() - parse_start
+
+        # Parsing overlapped the download; report the two separately
+        self.timings.add("fetch", time.perf_counter() - started - parse_time)
+        if parser is not None:
+            self.timings.add("parse", parse_time)
+            return None, parser
+        return b"".join(chunks).decode(response.encoding or "utf-8", errors="replace"), None
+
+    def _accept(self, response: httpx.Response):
+        """Raise unless the response is a successful HTML document"""
+        response.raise_for_status()
+
+        content_type = response.headers.get("content-type", "").split(";")[0].strip().lower()
+        if content_type and content_type not in settings.HTML_CONTENT_TYPES:
+            raise ValueError(f"Unsupported content type: {content_type}")
+
+        self.validators = {
+            "etag": response.headers.get("etag"),
+            "last_modified": response.headers.get("last-modified")
+        }
+
+    async def _read(self, response: httpx.Response):
+        """Body chunks, stopping at MAX_DOCUMENT_BYTES"""
+        remaining = settings.MAX_DOCUMENT_BYTES
+        async for chunk in response.aiter_bytes():
+            if len(chunk) > remaining:
+                yield chunk[:remaining]
+                self.truncated = True
+                print(f"{self.url} exceeds {settings.MAX_DOCUMENT_BYTES} bytes, truncating")
+                return
+
+            remaining -= len(chunk)
+            yield chunk
+
+    async def _parse(self, html: str) -> Dict[str, Any]:
+        # Large documents are parsed in a worker process, off the event loop
+        with self.timings.phase("parse"):
+            parsed = await parse_executor.parse(self.url, html, self.projection)
+        return self._result(parsed)
+
+    def _result(self, parsed: Dict[str, Any]) -> Dict[str, Any]:
+        self.errors.extend(parsed["errors"])
 
         return {
-        "meta": meta,
-        "sections": sections,
-        "interactions": self.interactions,
-        "strategy": "js"
-    }
+            "meta": parsed["meta"],
+            "sections": parsed["sections"],
+            "interactions": self.interactions,
+            "spa_root": parsed["spa_root"],
+            "pagination": parsed["pagination"],
+            "fingerprint": parsed["fingerprint"],
+            "unchanged": parsed["unchanged"]
+        }
@@ -1,6 +1,7 @@
-from urllib.parse import urlparse
+from urllib.parse import urlparse, urlunparse, urljoin, parse_qsl, urlencode
+import hashlib
 import validators
-from typing import Optional
+from typing import List, Optional
 
 class URLUtils:
     """URL utility functions"""
@@ -29,6 +30,37 @@ class URLUtils:
         if not url.startswith(('http://', 'https://')):
             url = 'https://' + url
         return url
+    
+    @staticmethod
+    def make_absolute_url(url: str, page_url: str) -> str:
+        """Convert a (possibly relative) URL found on page_url to an absolute one"""
+        if not url:
+            return ""
+        
+        if url.startswith(('http://', 'https://')):
+            return url
+        
+        if url.startswith('//'):
+            return f"{urlparse(page_url).scheme}:{url}"
+        
+        return urljoin(page_url, url)
+    
+    @staticmethod
+    def canonicalize_url(url: str) -> str:
+        """Canonical form of a URL for use as a cache / dedup key"""
+        url = url.strip()
+        if '://' not in url:
+            url = 'https://' + url
+        parsed = urlparse(url)
+        scheme = parsed.scheme.lower()
+        netloc = parsed.netloc.lower()
+        
+        # Drop default ports
+        if (scheme == 'http' and netloc.endswith(':80')) or (scheme == 'https' and netloc.endswith(':443')):
+            netloc = netloc.rsplit(':', 1)[0]
+        
+        query = urlencode(sorted(parse_qsl(parsed.query, keep_blank_values=True)))
+        return urlunparse((scheme, netloc, parsed.path or '/', parsed.params, query, ''))
 
 class ContentUtils:
     """Content utility functions"""
@@ -38,6 +70,31 @@ class ContentUtils:
         """Estimate if text content is complete enough"""
         return len(text.strip()) >= threshold
     
+    @staticmethod
+    def generate_section_id(label: str) -> str:
+        """Generate a stable section ID"""
+        text_hash = hashlib.md5(label.encode()).hexdigest()[:8]
+        return f"section-{text_hash}"
+
+    @staticmethod
+    def generate_fingerprint(parts: List[str]) -> str:
+        """Short content hash of parts, for change detection"""
+        return hashlib.blake2b("\x1f".join(parts).encode(), digest_size=8).hexdigest()
+    
+    @staticmethod
+    def truncate_html(html: str, max_length: int) -> tuple[str, bool]:
+        """Truncate HTML content, preferably at a tag boundary"""
+        if len(html) <= max_length:
+            return html, False
+        
+        truncated = html[:max_length]
+        last_tag = truncated.rfind('>')
+        
+        if last_tag != -1:
+            truncated = truncated[:last_tag + 1]
+        
+        return truncated + "...", True
+    
     @staticmethod
     def clean_text(text: str) -> str:
         """Clean and normalize text"""
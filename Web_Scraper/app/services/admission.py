@@ -0,0 +1,236 @@
+import asyncio
+import heapq
+import itertools
+import math
+import time
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from typing import Dict, Any, List, Optional, AsyncIterator
+
+from app.config import settings
+
+# Priority classes, most important first
+PRIORITIES = {"interactive": 0, "batch": 1, "background": 2}
+
+# The slot the current task holds: [kind, priority, held]
+_current_slot: ContextVar[Optional[list]] = ContextVar("admission_slot", default=None)
+
+
+class AdmissionRejected(Exception):
+    """
+    Work was not admitted. status_code is 429 when the queue was full and
+    503 when the request waited too long or was shed for more important
+    work; retry_after is a hint in seconds.
+    """
+
+    def __init__(self, status_code: int, detail: str, retry_after: int):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.retry_after = retry_after
+
+
+class AdmissionQueue:
+    """
+    At most `concurrency` units of one kind of work at once, with a bounded
+    priority queue of waiters in front.
+
+    A free slot goes to the most important waiter, oldest first. When the
+    queue is full, a newcomer displaces the newest waiter of a less
+    important class (which is rejected with 503) or is itself rejected
+    with 429. Waiters give up with 503 after their class' queue timeout.
+    """
+
+    def __init__(self, kind: str, concurrency: int, queue_size: int):
+        self.kind = kind
+        self.concurrency = concurrency
+        self.queue_size = queue_size
+        self.active = 0
+        self._waiters: List[list] = []  # Heap of [priority, sequence, future]
+        self._sequence = itertools.count()
+
+        self.admitted = 0
+        self.rejected = 0
+        self.shed = 0
+        self.timed_out = 0
+        self.total_wait_time = 0.0
+        self.avg_service_time: Optional[float] = None
+
+    @property
+    def depth(self) -> int:
+        return len(self._waiters)
+
+    def retry_after(self) -> int:
+        """Seconds until the queue has likely drained enough to take more work"""
+        service_time = self.avg_service_time or 1.0
+        return max(1, math.ceil(service_time * (self.depth + 1) / max(1, self.concurrency)))
+
+    def check(self, priority: int):
+        """Raise AdmissionRejected if work of this priority would be turned away now"""
+        if self.depth < self.queue_size or (self.active < self.concurrency and not self._waiters):
+            return
+        if self._waiters and max(self._waiters)[0] > priority:
+            return
+
+        self.rejected += 1
+        raise AdmissionRejected(
+            429,
+            f"Too many {self.kind} scrapes queued, try again later",
+            self.retry_after()
+        )
+
+    async def acquire(self, priority: int, timeout: Optional[float]):
+        if self.active < self.concurrency and not self._waiters:
+            self.active += 1
+            self.admitted += 1
+            return
+
+        self.check(priority)
+        if self._waiters and self.depth >= self.queue_size:
+            self._shed(max(self._waiters))
+
+        future = asyncio.get_running_loop().create_future()
+        entry = [priority, next(self._sequence), future]
+        heapq.heappush(self._waiters, entry)
+        wait_start = time.monotonic()
+
+        try:
+            await asyncio.wait_for(future, timeout)
+        except asyncio.TimeoutError:
+            self.timed_out += 1
+            raise AdmissionRejected(
+                503,
+                f"Timed out after {timeout:g}s waiting for a {self.kind} scrape slot",
+                self.retry_after()
+            )
+        except asyncio.CancelledError:
+            # Granted just as the caller went away: hand the slot on
+            if future.done() and not future.cancelled() and future.exception() is None:
+                self.release()
+            raise
+        finally:
+            self.total_wait_time += time.monotonic() - wait_start
+            if entry in self._waiters:
+                self._waiters.remove(entry)
+                heapq.heapify(self._waiters)
+
+        self.admitted += 1
+
+    def release(self, service_time: Optional[float] = None):
+        if service_time is not None:
+            alpha = settings.ADMISSION_SERVICE_TIME_ALPHA
+            self.avg_service_time = service_time if self.avg_service_time is None else (
+                alpha * service_time + (1 - alpha) * self.avg_service_time
+            )
+
+        self.active -= 1
+        while self._waiters:
+            _, _, future = heapq.heappop(self._waiters)
+            if future.done():
+                continue
+            self.active += 1
+            future.set_result(None)
+            return
+
+    def _shed(self, entry: list):
+        self._waiters.remove(entry)
+        heapq.heapify(self._waiters)
+        self.shed += 1
+
+        future = entry[2]
+        if not future.done():
+            future.set_exception(AdmissionRejected(
+                503,
+                f"Shed from the {self.kind} queue for higher priority work",
+                self.retry_after()
+            ))
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "concurrency": self.concurrency,
+            "active": self.active,
+            "queued": self.depth,
+            "queue_size": self.queue_size,
+            "admitted": self.admitted,
+            "rejected": self.rejected,
+            "shed": self.shed,
+            "timed_out": self.timed_out,
+            "total_wait_time": round(self.total_wait_time, 4),
+        }
+
+
+class AdmissionController:
+    """
+    Admission control in front of the scrapers.
+
+    Static fetches and JS renders are admitted through separate queues
+    (ADMISSION_STATIC_* / ADMISSION_JS_*), so a burst of renders cannot
+    exhaust memory and does not hold up cheap static work. Cache hits
+    never go through admission. Callers state a priority class:
+    "interactive" API requests, "batch" (batches and crawls) or
+    "background" jobs.
+    """
+
+    def __init__(self):
+        self.queues = {
+            "static": AdmissionQueue(
+                "static", settings.ADMISSION_STATIC_CONCURRENCY, settings.ADMISSION_STATIC_QUEUE_SIZE
+            ),
+            "js": AdmissionQueue("js", settings.ADMISSION_JS_CONCURRENCY, settings.ADMISSION_JS_QUEUE_SIZE),
+        }
+
+    @property
+    def enabled(self) -> bool:
+        return settings.ADMISSION_ENABLED
+
+    def check(self, kind: str, priority: str = "interactive"):
+        """Fail fast when work of this class would be rejected (e.g. before a stream starts)"""
+        if self.enabled:
+            self.queues[kind].check(PRIORITIES[priority])
+
+    @asynccontextmanager
+    async def slot(self, kind: str, priority: str = "interactive") -> AsyncIterator[None]:
+        """Hold one slot of kind ("static" or "js") for the duration of the block"""
+        if not self.enabled:
+            yield
+            return
+
+        queue = self.queues[kind]
+        await queue.acquire(PRIORITIES[priority], settings.ADMISSION_QUEUE_TIMEOUTS.get(priority))
+
+        slot = [kind, priority, True]
+        token = _current_slot.set(slot)
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            _current_slot.reset(token)
+            if slot[2]:
+                queue.release(time.monotonic() - started)
+
+    @asynccontextmanager
+    async def paused(self) -> AsyncIterator[None]:
+        """
+        Give up the current task's slot for the duration of the block (e.g.
+        a retry backoff) and queue for it again afterwards. A no-op outside
+        of slot().
+        """
+        slot = _current_slot.get()
+        if slot is None or not slot[2]:
+            yield
+            return
+
+        kind, priority, _ = slot
+        queue = self.queues[kind]
+        queue.release()
+        slot[2] = False
+
+        # Not re-acquired if the block failed; slot() then has nothing to release
+        yield
+        await queue.acquire(PRIORITIES[priority], settings.ADMISSION_QUEUE_TIMEOUTS.get(priority))
+        slot[2] = True
+
+    def stats(self) -> Dict[str, Any]:
+        return {kind: queue.stats() for kind, queue in self.queues.items()}
+
+
+admission = AdmissionController()
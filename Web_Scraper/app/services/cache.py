@@ -0,0 +1,236 @@
+import asyncio
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Any, Optional
+
+from app.models import Meta, Section
+from app.scraper.utils import URLUtils
+from app.config import settings
+
+
+class CacheEntry:
+    """A cached scrape result plus the HTTP validators needed to revalidate it"""
+
+    def __init__(
+        self,
+        result: Dict[str, Any],
+        expires_at: float,
+        etag: Optional[str] = None,
+        last_modified: Optional[str] = None,
+        size: int = 0,
+        stored_at: Optional[float] = None,
+    ):
+        self.result = result
+        self.expires_at = expires_at
+        self.stored_at = time.time() if stored_at is None else stored_at
+        self.etag = etag
+        self.last_modified = last_modified
+        self.size = size
+
+    def is_fresh(self, max_age: Optional[int] = None) -> bool:
+        """Fresh if not expired and, when given, younger than max_age seconds"""
+        now = time.time()
+        if max_age is not None and now - self.stored_at >= max_age:
+            return False
+        return now < self.expires_at
+
+    @property
+    def can_revalidate(self) -> bool:
+        return bool(self.etag or self.last_modified)
+
+
+class ResultCache:
+    """
+    Two-tier cache of scrape results keyed by canonical URL and mode.
+
+    The memory tier is an LRU bounded by entry count and estimated size.
+    The optional disk tier (SQLite, enabled by CACHE_DB_PATH) keeps entries
+    across restarts and backs the memory tier on a miss. Stale entries are
+    kept so they can be revalidated with If-None-Match / If-Modified-Since.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = settings.CACHE_MAX_ENTRIES,
+        max_bytes: int = settings.CACHE_MAX_BYTES,
+        db_path: Optional[str] = settings.CACHE_DB_PATH,
+    ):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.db_path = db_path
+        self._entries: "OrderedDict[str, CacheEntry]" = OrderedDict()
+        self._bytes = 0
+        self._db: Optional[sqlite3.Connection] = None
+        self._db_lock = threading.Lock()
+
+        self.hits = 0
+        self.revalidated = 0
+        self.misses = 0
+        self.evictions = 0
+
+    # ---------------- LIFECYCLE ---------------- #
+
+    def open(self):
+        if self.db_path and self._db is None:
+            self._db = sqlite3.connect(self.db_path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS results ("
+                "key TEXT PRIMARY KEY, data TEXT NOT NULL, expires_at REAL NOT NULL, "
+                "etag TEXT, last_modified TEXT, stored_at REAL NOT NULL)"
+            )
+            self._db.commit()
+
+    def close(self):
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+
+    # ---------------- KEYS ---------------- #
+
+    @staticmethod
+    def make_key(url: str, mode: str, variant: str = "") -> str:
+        """variant separates results parsed with a Projection that skips content"""
+        return f"{mode}{variant}:{URLUtils.canonicalize_url(url)}"
+
+    # ---------------- ACCESS ---------------- #
+
+    async def get(self, key: str) -> Optional[CacheEntry]:
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+            return entry
+
+        if self._db is None:
+            return None
+
+        entry = await asyncio.to_thread(self._db_get, key)
+        if entry is not None:
+            self._store_memory(key, entry)
+        return entry
+
+    async def set(
+        self,
+        key: str,
+        result: Dict[str, Any],
+        ttl: Optional[int] = None,
+        etag: Optional[str] = None,
+        last_modified: Optional[str] = None,
+    ):
+        ttl = settings.CACHE_TTL if ttl is None else ttl
+        entry = CacheEntry(
+            result=result,
+            expires_at=time.time() + ttl,
+            etag=etag,
+            last_modified=last_modified,
+            size=self._estimate_size(result),
+        )
+        self._store_memory(key, entry)
+
+        if self._db is not None:
+            await asyncio.to_thread(self._db_set, key, entry)
+
+    async def refresh(self, key: str, entry: CacheEntry, ttl: Optional[int] = None):
+        """Extend the lifetime of an entry after a successful revalidation"""
+        ttl = settings.CACHE_TTL if ttl is None else ttl
+        entry.stored_at = time.time()
+        entry.expires_at = entry.stored_at + ttl
+
+        if self._db is not None:
+            await asyncio.to_thread(self._db_set, key, entry)
+
+    # ---------------- MEMORY TIER ---------------- #
+
+    def _store_memory(self, key: str, entry: CacheEntry):
+        previous = self._entries.pop(key, None)
+        if previous is not None:
+            self._bytes -= previous.size
+
+        # Entries larger than the whole budget are only kept on disk
+        if entry.size > self.max_bytes:
+            return
+
+        self._entries[key] = entry
+        self._bytes += entry.size
+
+        while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self._bytes -= evicted.size
+            self.evictions += 1
+
+    def _estimate_size(self, result: Dict[str, Any]) -> int:
+        """Rough byte size of a result, dominated by section text and HTML"""
+        size = 512
+        for section in result.get("sections", []):
+            content = section.content
+            size += 256 + len(section.rawHtml) + len(content.text)
+            size += sum(len(link.href) + len(link.text) + 64 for link in content.links)
+            size += sum(len(image.src) + len(image.alt) + 64 for image in content.images)
+        return size
+
+    # ---------------- DISK TIER ---------------- #
+
+    def _db_get(self, key: str) -> Optional[CacheEntry]:
+        with self._db_lock:
+            row = self._db.execute(
+                "SELECT data, expires_at, etag, last_modified, stored_at FROM results WHERE key = ?",
+                (key,),
+            ).fetchone()
+        if row is None:
+            return None
+
+        data, expires_at, etag, last_modified, stored_at = row
+        result = self._deserialize(data)
+        return CacheEntry(
+            result=result,
+            expires_at=expires_at,
+            etag=etag,
+            last_modified=last_modified,
+            size=self._estimate_size(result),
+            stored_at=stored_at,
+        )
+
+    def _db_set(self, key: str, entry: CacheEntry):
+        data = self._serialize(entry.result)
+        with self._db_lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO results (key, data, expires_at, etag, last_modified, stored_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (key, data, entry.expires_at, entry.etag, entry.last_modified, entry.stored_at),
+            )
+            self._db.execute(
+                "DELETE FROM results WHERE key NOT IN "
+                "(SELECT key FROM results ORDER BY stored_at DESC LIMIT ?)",
+                (settings.CACHE_DISK_MAX_ENTRIES,),
+            )
+            self._db.commit()
+
+    def _serialize(self, result: Dict[str, Any]) -> str:
+        return json.dumps(result, default=lambda obj: obj.model_dump(mode="json"))
+
+    def _deserialize(self, data: str) -> Dict[str, Any]:
+        result = json.loads(data)
+        result["meta"] = Meta.model_validate(result.get("meta") or {})
+        result["sections"] = [Section.model_validate(s) for s in result.get("sections", [])]
+        return result
+
+    # ---------------- STATS ---------------- #
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.revalidated + self.misses
+        return {
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "max_bytes": self.max_bytes,
+            "disk": self._db is not None,
+            "hits": self.hits,
+            "revalidated": self.revalidated,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": round((self.hits + self.revalidated) / lookups, 4) if lookups else 0.0,
+        }
+
+
+result_cache = ResultCache()
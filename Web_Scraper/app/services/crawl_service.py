@@ -0,0 +1,181 @@
+import asyncio
+import hashlib
+import time
+from datetime import datetime
+from typing import Dict, Any, List, Optional, Set, Tuple
+from urllib.parse import urlparse
+
+from app.models import CrawlRequest, ScrapeResponse, ScrapeResult, Interactions, Meta, Section
+from app.services.scraping_service import ScrapingService
+from app.scraper.utils import URLUtils
+from app.config import settings
+
+
+class CrawlService:
+    """
+    Crawl from a seed URL, scraping pages concurrently.
+
+    Pages are fetched from an async frontier by CRAWL_CONCURRENCY workers,
+    each through ScrapingService, so every page gets the configured
+    static / JS / adaptive strategy and the result cache. The crawl follows
+    pagination links (rel=next, PAGINATION_SELECTORS) or, with
+    follow="links", every link found in the page's sections.
+    """
+
+    def __init__(self, request: CrawlRequest):
+        self.request = request
+        self.max_pages = request.max_pages or settings.MAX_PAGES
+        self.max_depth = request.max_depth if request.max_depth is not None else settings.CRAWL_MAX_DEPTH
+
+        # 8-byte digests of canonical URLs; enough to dedup a crawl cheaply
+        self._seen: Set[bytes] = set()
+        self._frontier: Optional[asyncio.Queue] = None
+        self._scheduled = 0
+        self._origin = ""
+
+        # (discovery order, url, depth, scrape result)
+        self._pages: List[Tuple[int, str, int, Dict[str, Any]]] = []
+        self.errors = []
+
+    async def crawl(self) -> ScrapeResponse:
+        start_time = time.time()
+
+        seed = URLUtils.normalize_url(self.request.url)
+        self._origin = self._get_origin(seed)
+
+        self._frontier = asyncio.Queue()
+        self._schedule(seed, 0)
+
+        workers = [
+            asyncio.create_task(self._worker())
+            for _ in range(min(settings.CRAWL_CONCURRENCY, self.max_pages))
+        ]
+        try:
+            await self._frontier.join()
+        finally:
+            for worker in workers:
+                worker.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+
+        return self._build_response(seed, time.time() - start_time)
+
+    # ---------------- FRONTIER ---------------- #
+
+    def _schedule(self, url: str, depth: int):
+        if self._scheduled >= self.max_pages:
+            return
+
+        fingerprint = hashlib.blake2b(
+            URLUtils.canonicalize_url(url).encode("utf-8"), digest_size=8
+        ).digest()
+        if fingerprint in self._seen:
+            return
+
+        self._seen.add(fingerprint)
+        self._frontier.put_nowait((self._scheduled, url, depth))
+        self._scheduled += 1
+
+    async def _worker(self):
+        while True:
+            order, url, depth = await self._frontier.get()
+            try:
+                await self._crawl_page(order, url, depth)
+            except Exception as e:
+                self.errors.append({"message": f"{url}: {str(e)}", "phase": "crawl"})
+            finally:
+                self._frontier.task_done()
+
+    async def _crawl_page(self, order: int, url: str, depth: int):
+        service = ScrapingService(mode=self.request.mode, priority="batch")
+        result = await service.scrape(
+            url,
+            use_cache=self.request.use_cache,
+            cache_ttl=self.request.cache_ttl
+        )
+        result["errors"] = service.errors
+        self._pages.append((order, url, depth, result))
+
+        if depth >= self.max_depth:
+            return
+
+        for link in self._next_links(result):
+            if self._should_follow(link):
+                self._schedule(link, depth + 1)
+
+    def _next_links(self, result: Dict[str, Any]) -> List[str]:
+        links = list(result.get("pagination", []))
+        if self.request.follow == "links":
+            for section in result.get("sections", []):
+                links.extend(link.href for link in section.content.links)
+        return links
+
+    def _should_follow(self, url: str) -> bool:
+        is_valid, _ = URLUtils.validate_url(url)
+        if not is_valid:
+            return False
+        if self.request.same_origin and self._get_origin(url) != self._origin:
+            return False
+        return True
+
+    def _get_origin(self, url: str) -> str:
+        parsed = urlparse(URLUtils.canonicalize_url(url))
+        return f"{parsed.scheme}://{parsed.netloc}"
+
+    # ---------------- RESPONSE ---------------- #
+
+    def _build_response(self, seed: str, processing_time: float) -> ScrapeResponse:
+        """Merge the pages in discovery order; each section keeps its page's sourceUrl"""
+        pages = sorted(self._pages, key=lambda page: page[0])
+
+        meta = Meta()
+        sections = []
+        section_ids: Set[str] = set()
+        clicks = []
+        scrolls = 0
+        errors = []
+
+        for index, (order, url, depth, result) in enumerate(pages):
+            if order == 0:
+                meta = result.get("meta") or meta
+            sections.extend(self._page_sections(index, result.get("sections", []), section_ids))
+
+            interactions = result.get("interactions", {})
+            clicks.extend(interactions.get("clicks", []))
+            scrolls += interactions.get("scrolls", 0)
+            errors.extend(result.get("errors", []))
+
+        return ScrapeResponse(
+            result=ScrapeResult(
+                url=seed,
+                scrapedAt=datetime.utcnow().isoformat(),
+                meta=meta,
+                sections=sections,
+                interactions=Interactions(
+                    clicks=clicks,
+                    scrolls=scrolls,
+                    pages=[url for _, url, _, _ in pages]
+                ),
+                errors=errors + self.errors
+            ),
+            strategy="crawl",
+            processing_time=processing_time
+        )
+
+    @staticmethod
+    def _page_sections(index: int, page_sections: List[Section], section_ids: Set[str]) -> List[Section]:
+        """
+        A page's sections with ids prefixed by its index in interactions.pages.
+        Ids are derived from section labels, so pages sharing a layout would
+        otherwise repeat them. Copies are made since results may come from the cache.
+        """
+        sections = []
+        for section in page_sections:
+            section_id = base_id = f"page-{index}-{section.id}"
+            duplicate = 1
+            while section_id in section_ids:
+                duplicate += 1
+                section_id = f"{base_id}-{duplicate}"
+
+            section_ids.add(section_id)
+            sections.append(section.model_copy(update={"id": section_id}))
+        return sections
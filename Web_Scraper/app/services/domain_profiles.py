@@ -0,0 +1,278 @@
+import asyncio
+import json
+import sqlite3
+import threading
+import time
+from typing import Dict, Any, Optional
+from urllib.parse import urlparse
+
+from app.scraper.utils import URLUtils
+from app.config import settings
+
+
+class DomainProfile:
+    """
+    What past scrapes of one domain taught us.
+
+    Counts decay exponentially with PROFILE_HALF_LIFE, so old observations
+    fade out and a domain whose profile has gone quiet is probed again.
+    """
+
+    # Fields that decay; the rest are averages, timestamps or overrides
+    COUNTS = (
+        "static_checks",
+        "static_sufficient",
+        "renders",
+        "scroll_runs",
+        "scroll_gains",
+        "click_runs",
+        "click_gains",
+    )
+
+    def __init__(self, domain: str, **fields):
+        self.domain = domain
+
+        self.static_checks = 0.0
+        self.static_sufficient = 0.0
+        self.renders = 0.0
+        self.avg_render_time: Optional[float] = None
+        self.scroll_runs = 0.0
+        self.scroll_gains = 0.0
+        self.click_runs = 0.0
+        self.click_gains = 0.0
+        self.last_failure: Optional[str] = None
+        self.last_failure_at: Optional[float] = None
+
+        # Manual overrides; None means "learn it"
+        self.override_strategy: Optional[str] = None
+        self.override_scroll: Optional[bool] = None
+        self.override_click: Optional[bool] = None
+
+        self.updated_at = time.time()
+
+        for name, value in fields.items():
+            setattr(self, name, value)
+
+    # ---------------- LEARNING ---------------- #
+
+    def decay(self, now: Optional[float] = None):
+        now = time.time() if now is None else now
+        elapsed = now - self.updated_at
+        if elapsed > 0:
+            factor = 0.5 ** (elapsed / settings.PROFILE_HALF_LIFE)
+            for name in self.COUNTS:
+                setattr(self, name, getattr(self, name) * factor)
+        self.updated_at = now
+
+    def observe(self, observation: Dict[str, Any]):
+        self.decay()
+
+        if observation.get("static_sufficient") is not None:
+            self.static_checks += 1
+            self.static_sufficient += 1 if observation["static_sufficient"] else 0
+
+        render_time = observation.get("render_time")
+        if render_time is not None:
+            self.renders += 1
+            if self.avg_render_time is None:
+                self.avg_render_time = render_time
+            else:
+                alpha = settings.PROFILE_RENDER_TIME_ALPHA
+                self.avg_render_time = alpha * render_time + (1 - alpha) * self.avg_render_time
+
+        for phase in ("scroll", "click"):
+            gain = observation.get(f"{phase}_gain")
+            if gain is not None:
+                setattr(self, f"{phase}_runs", getattr(self, f"{phase}_runs") + 1)
+                setattr(self, f"{phase}_gains", getattr(self, f"{phase}_gains") + (1 if gain else 0))
+
+        if observation.get("failure"):
+            self.last_failure = observation["failure"]
+            self.last_failure_at = self.updated_at
+
+    # ---------------- DECISIONS ---------------- #
+
+    @staticmethod
+    def _rate(hits: float, runs: float) -> Optional[float]:
+        """Success rate, or None until there are PROFILE_MIN_SAMPLES (decayed) runs"""
+        if runs < settings.PROFILE_MIN_SAMPLES:
+            return None
+        return hits / runs
+
+    @property
+    def static_sufficiency_rate(self) -> Optional[float]:
+        return self._rate(self.static_sufficient, self.static_checks)
+
+    @property
+    def scroll_gain_rate(self) -> Optional[float]:
+        return self._rate(self.scroll_gains, self.scroll_runs)
+
+    @property
+    def click_gain_rate(self) -> Optional[float]:
+        return self._rate(self.click_gains, self.click_runs)
+
+    def plan(self) -> Dict[str, Any]:
+        """{"mode", "scroll", "click"} for an adaptive scrape of this domain"""
+        mode = "adaptive"
+        rate = self.static_sufficiency_rate
+        if self.override_strategy is not None:
+            mode = self.override_strategy
+        elif rate is not None and rate >= settings.PROFILE_STATIC_RATE:
+            mode = "static"
+        elif rate is not None and rate <= settings.PROFILE_JS_RATE:
+            mode = "js"
+
+        return {
+            "mode": mode,
+            "scroll": self._phase_enabled(self.override_scroll, self.scroll_gain_rate),
+            "click": self._phase_enabled(self.override_click, self.click_gain_rate),
+        }
+
+    def _phase_enabled(self, override: Optional[bool], gain_rate: Optional[float]) -> bool:
+        if override is not None:
+            return override
+        return gain_rate is None or gain_rate >= settings.PROFILE_MIN_GAIN_RATE
+
+    # ---------------- SERIALIZATION ---------------- #
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {name: value for name, value in vars(self).items() if name != "domain"}
+
+    def describe(self) -> Dict[str, Any]:
+        """Profile as returned by the API"""
+        return {
+            "domain": self.domain,
+            "static_checks": round(self.static_checks, 3),
+            "static_sufficiency_rate": self.static_sufficiency_rate,
+            "renders": round(self.renders, 3),
+            "avg_render_time": self.avg_render_time,
+            "scroll_gain_rate": self.scroll_gain_rate,
+            "click_gain_rate": self.click_gain_rate,
+            "last_failure": self.last_failure,
+            "last_failure_at": self.last_failure_at,
+            "override": {
+                "strategy": self.override_strategy,
+                "scroll": self.override_scroll,
+                "click": self.override_click,
+            },
+            "plan": self.plan(),
+            "updated_at": self.updated_at,
+        }
+
+
+class DomainProfileStore:
+    """
+    Per-domain rendering profiles, kept in memory and persisted to SQLite
+    (PROFILE_DB_PATH) so they survive restarts.
+    """
+
+    def __init__(self, db_path: Optional[str] = settings.PROFILE_DB_PATH):
+        self.db_path = db_path
+        self._profiles: Dict[str, DomainProfile] = {}
+        self._db: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    # ---------------- LIFECYCLE ---------------- #
+
+    def open(self):
+        if not self.db_path or self._db is not None:
+            return
+
+        self._db = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS profiles ("
+            "domain TEXT PRIMARY KEY, data TEXT NOT NULL, updated_at REAL NOT NULL)"
+        )
+        self._db.commit()
+
+        for domain, data in self._db.execute("SELECT domain, data FROM profiles"):
+            self._profiles[domain] = DomainProfile(domain, **json.loads(data))
+
+    def close(self):
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+
+    # ---------------- ACCESS ---------------- #
+
+    @staticmethod
+    def normalize_domain(host: str) -> str:
+        host = host.strip().lower()
+        return host[4:] if host.startswith("www.") else host
+
+    def domain_for(self, url: str) -> str:
+        return self.normalize_domain(urlparse(URLUtils.canonicalize_url(url)).hostname or "")
+
+    def get(self, domain: str) -> Optional[DomainProfile]:
+        profile = self._profiles.get(domain)
+        if profile is not None:
+            profile.decay()
+        return profile
+
+    def plan(self, url: str) -> Optional[Dict[str, Any]]:
+        """Plan for url's domain, or None if nothing is known about it yet"""
+        if not settings.PROFILES_ENABLED:
+            return None
+
+        profile = self.get(self.domain_for(url))
+        return profile.plan() if profile is not None else None
+
+    async def record(self, url: str, observation: Dict[str, Any]):
+        if not settings.PROFILES_ENABLED or not observation:
+            return
+
+        domain = self.domain_for(url)
+        profile = self._profiles.get(domain)
+        if profile is None:
+            profile = self._profiles[domain] = DomainProfile(domain)
+
+        profile.observe(observation)
+        await self._persist(profile)
+
+    async def set_override(
+        self,
+        domain: str,
+        strategy: Optional[str] = None,
+        scroll: Optional[bool] = None,
+        click: Optional[bool] = None,
+    ) -> DomainProfile:
+        profile = self.get(domain)
+        if profile is None:
+            profile = self._profiles[domain] = DomainProfile(domain)
+
+        profile.override_strategy = strategy
+        profile.override_scroll = scroll
+        profile.override_click = click
+        await self._persist(profile)
+        return profile
+
+    async def reset(self, domain: str) -> bool:
+        """Forget everything about a domain, overrides included"""
+        if self._profiles.pop(domain, None) is None:
+            return False
+
+        if self._db is not None:
+            await asyncio.to_thread(self._db_delete, domain)
+        return True
+
+    # ---------------- PERSISTENCE ---------------- #
+
+    async def _persist(self, profile: DomainProfile):
+        if self._db is not None:
+            await asyncio.to_thread(self._db_set, profile.domain, json.dumps(profile.to_dict()), profile.updated_at)
+
+    def _db_set(self, domain: str, data: str, updated_at: float):
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO profiles (domain, data, updated_at) VALUES (?, ?, ?)",
+                (domain, data, updated_at),
+            )
+            self._db.commit()
+
+    def _db_delete(self, domain: str):
+        with self._lock:
+            self._db.execute("DELETE FROM profiles WHERE domain = ?", (domain,))
+            self._db.commit()
+
+
+domain_profiles = DomainProfileStore()
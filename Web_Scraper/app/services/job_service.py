@@ -0,0 +1,296 @@
+import asyncio
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Dict, Any, List, Optional, Tuple
+
+from app.models import ScrapeRequest, ScrapeResponse, JobResponse
+from app.services.scraping_service import ScrapingService
+from app.scraper.utils import URLUtils
+from app.scraper.projection import Projection
+from app.services.snapshots import snapshots
+from app.services.admission import AdmissionRejected
+from app.config import settings
+
+QUEUED = "queued"
+RUNNING = "running"
+COMPLETED = "completed"
+FAILED = "failed"
+CANCELLED = "cancelled"
+
+FINISHED_STATUSES = {COMPLETED, FAILED, CANCELLED}
+
+
+class JobStore:
+    """SQLite-backed store of scrape jobs, so queued jobs survive a restart"""
+
+    def __init__(self, db_path: str = settings.JOB_DB_PATH):
+        self.db_path = db_path
+        self._db: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    def open(self):
+        if self._db is not None:
+            return
+
+        self._db = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS jobs ("
+            "id TEXT PRIMARY KEY, status TEXT NOT NULL, request TEXT NOT NULL, "
+            "result TEXT, error TEXT, created_at REAL NOT NULL, "
+            "started_at REAL, finished_at REAL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, created_at)")
+        self._db.commit()
+
+    def close(self):
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+
+    def _execute(self, query: str, params: tuple = ()) -> sqlite3.Cursor:
+        with self._lock:
+            cursor = self._db.execute(query, params)
+            self._db.commit()
+            return cursor
+
+    def create(self, request: ScrapeRequest) -> str:
+        job_id = uuid.uuid4().hex
+        self._execute(
+            "INSERT INTO jobs (id, status, request, created_at) VALUES (?, ?, ?, ?)",
+            (job_id, QUEUED, request.model_dump_json(), time.time()),
+        )
+        return job_id
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            cursor = self._db.cursor()
+            cursor.row_factory = sqlite3.Row
+            row = cursor.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return dict(row) if row else None
+
+    def queued_ids(self) -> List[str]:
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT id FROM jobs WHERE status = ? ORDER BY created_at", (QUEUED,)
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def claim(self, job_id: str) -> bool:
+        """Mark a queued job as running; False if it was cancelled meanwhile"""
+        cursor = self._execute(
+            "UPDATE jobs SET status = ?, started_at = ? WHERE id = ? AND status = ?",
+            (RUNNING, time.time(), job_id, QUEUED),
+        )
+        return cursor.rowcount == 1
+
+    def finish(self, job_id: str, status: str, result: Optional[str] = None, error: Optional[str] = None):
+        self._execute(
+            "UPDATE jobs SET status = ?, result = ?, error = ?, finished_at = ? WHERE id = ?",
+            (status, result, error, time.time(), job_id),
+        )
+
+    def requeue(self, job_id: Optional[str] = None):
+        """Put running jobs (one, or all after a crash) back in the queue"""
+        if job_id is None:
+            self._execute("UPDATE jobs SET status = ?, started_at = NULL WHERE status = ?", (QUEUED, RUNNING))
+        else:
+            self._execute("UPDATE jobs SET status = ?, started_at = NULL WHERE id = ?", (QUEUED, job_id))
+
+    def cancel_queued(self, job_id: str) -> bool:
+        cursor = self._execute(
+            "UPDATE jobs SET status = ?, finished_at = ? WHERE id = ? AND status = ?",
+            (CANCELLED, time.time(), job_id, QUEUED),
+        )
+        return cursor.rowcount == 1
+
+    def purge(self, older_than: float):
+        """Delete finished jobs that finished before older_than"""
+        self._execute(
+            "DELETE FROM jobs WHERE finished_at IS NOT NULL AND finished_at < ?",
+            (older_than,),
+        )
+
+
+class JobManager:
+    """
+    Runs scrape jobs in background workers inside the app.
+
+    Job ids are fed to an asyncio queue drained by JOB_WORKERS workers; the
+    job itself lives in the JobStore, which is the source of truth.
+    """
+
+    def __init__(self, store: Optional[JobStore] = None, workers: int = settings.JOB_WORKERS):
+        self.store = store or JobStore()
+        self.workers = workers
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker_tasks: List[asyncio.Task] = []
+        self._running: Dict[str, asyncio.Task] = {}
+        self._cancel_requested = set()
+
+    async def start(self):
+        await asyncio.to_thread(self.store.open)
+
+        # Jobs that were running when the app stopped are started again
+        await asyncio.to_thread(self.store.requeue)
+        await asyncio.to_thread(self.store.purge, time.time() - settings.JOB_RETENTION)
+
+        self._queue = asyncio.Queue()
+        for job_id in await asyncio.to_thread(self.store.queued_ids):
+            self._queue.put_nowait(job_id)
+
+        self._worker_tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def close(self):
+        for task in self._worker_tasks:
+            task.cancel()
+        await asyncio.gather(*self._worker_tasks, return_exceptions=True)
+        self._worker_tasks = []
+        self.store.close()
+
+    # ---------------- API ---------------- #
+
+    async def submit(self, request: ScrapeRequest) -> JobResponse:
+        job_id = await asyncio.to_thread(self.store.create, request)
+        self._queue.put_nowait(job_id)
+        return await self.get(job_id)
+
+    async def get(self, job_id: str) -> Optional[JobResponse]:
+        job, _ = await self.get_projected(job_id)
+        return job
+
+    async def get_projected(self, job_id: str) -> Tuple[Optional[JobResponse], Optional[Dict[str, Any]]]:
+        """
+        The job and the model_dump include= that trims its result to the
+        fields / include_raw_html it was submitted with. The full result is
+        stored; the projection is applied when the job is returned.
+        """
+        row = await asyncio.to_thread(self.store.get, job_id)
+        if row is None:
+            return None, None
+
+        request = ScrapeRequest.model_validate_json(row["request"])
+        job = JobResponse(
+            id=row["id"],
+            status=row["status"],
+            url=request.url,
+            created_at=row["created_at"],
+            started_at=row["started_at"],
+            finished_at=row["finished_at"],
+            result=ScrapeResponse.model_validate_json(row["result"]) if row["result"] else None,
+            error=row["error"]
+        )
+
+        projection = Projection(request.fields, request.include_raw_html)
+        include = Projection.nest(ScrapeResponse, "result", projection.include())
+        return job, Projection.nest(JobResponse, "result", include)
+
+    async def cancel(self, job_id: str) -> Optional[JobResponse]:
+        """Cancel a queued or running job; finished jobs are returned unchanged"""
+        job = await self.get(job_id)
+        if job is None or job.status in FINISHED_STATUSES:
+            return job
+
+        if not await asyncio.to_thread(self.store.cancel_queued, job_id):
+            task = self._running.get(job_id)
+            if task is not None and not task.done():
+                # Recorded before cancelling so a late result cannot overwrite it
+                self._cancel_requested.add(job_id)
+                await asyncio.to_thread(self.store.finish, job_id, CANCELLED)
+                task.cancel()
+
+        return await self.get(job_id)
+
+    # ---------------- WORKERS ---------------- #
+
+    async def _worker(self):
+        while True:
+            job_id = await self._queue.get()
+            try:
+                await self._run(job_id)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"Job {job_id} crashed: {str(e)}")
+            finally:
+                self._queue.task_done()
+
+    async def _run(self, job_id: str):
+        # Registered before the job is claimed, so a cancel arriving at any
+        # point after it left the queue finds the task
+        task = asyncio.create_task(self._execute(job_id))
+        self._running[job_id] = task
+        try:
+            await task
+
+        except asyncio.CancelledError:
+            if job_id in self._cancel_requested:
+                return
+            # Shutting down: run the job again on the next start
+            await asyncio.to_thread(self.store.requeue, job_id)
+            raise
+
+        finally:
+            self._running.pop(job_id, None)
+            self._cancel_requested.discard(job_id)
+
+    async def _execute(self, job_id: str):
+        if not await asyncio.to_thread(self.store.claim, job_id):
+            return
+
+        row = await asyncio.to_thread(self.store.get, job_id)
+        request = ScrapeRequest.model_validate_json(row["request"])
+
+        try:
+            response = await self._scrape(request)
+            if job_id not in self._cancel_requested:
+                await asyncio.to_thread(self.store.finish, job_id, COMPLETED, response.model_dump_json())
+
+        except AdmissionRejected as e:
+            # The scrapers are overloaded: postpone the job rather than fail it
+            if job_id not in self._cancel_requested:
+                await asyncio.to_thread(self.store.requeue, job_id)
+                asyncio.get_running_loop().call_later(e.retry_after, self._queue.put_nowait, job_id)
+
+        except Exception as e:
+            if job_id not in self._cancel_requested:
+                await asyncio.to_thread(self.store.finish, job_id, FAILED, None, f"Scraping failed: {str(e)}")
+
+    async def _scrape(self, request: ScrapeRequest) -> ScrapeResponse:
+        start_time = time.time()
+
+        normalized_url = URLUtils.normalize_url(request.url)
+
+        since = None
+        if request.since:
+            since = await snapshots.get(request.since)
+            if since is None:
+                raise ValueError(f"Snapshot {request.since} not found")
+
+        service = ScrapingService(
+            mode=request.mode,
+            projection=Projection(
+                request.fields,
+                request.include_raw_html,
+                since["fingerprint"] if since else None
+            ),
+            priority="background"
+        )
+        result = await service.scrape(
+            normalized_url,
+            use_cache=request.use_cache,
+            cache_ttl=request.cache_ttl
+        )
+
+        response = service.build_response(
+            normalized_url,
+            result,
+            time.time() - start_time,
+            include_timings=request.include_timings
+        )
+        await snapshots.track(normalized_url, result, response, since)
+        return response
+
+
+job_manager = JobManager()
@@ -0,0 +1,190 @@
+import threading
+from typing import Dict, Any, List, Optional, Sequence, Tuple
+
+from app.scraper.browser_pool import browser_pool
+from app.scraper.http_client import http_client
+from app.scraper.rate_limiter import rate_limiter
+from app.scraper.executor import parse_executor
+from app.services.cache import result_cache
+from app.services.admission import admission
+
+# Seconds; covers everything from a cached parse to a slow JS render
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    parts = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Histogram:
+    """Cumulative-bucket histogram rendered in the Prometheus text format"""
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self.buckets = tuple(buckets)
+        # label values -> [bucket counts..., sum, count]
+        self._series: Dict[Tuple[str, ...], List[float]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *label_values: str):
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                series = self._series[label_values] = [0] * len(self.buckets) + [0.0, 0]
+
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[index] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for label_values, series in sorted(self._series.items()):
+                for bound, count in zip(self.buckets, series):
+                    labels = _format_labels(self.labels, label_values, f'le="{bound}"')
+                    lines.append(f"{self.name}_bucket{labels} {count}")
+                labels = _format_labels(self.labels, label_values, 'le="+Inf"')
+                lines.append(f"{self.name}_bucket{labels} {series[-1]}")
+
+                labels = _format_labels(self.labels, label_values)
+                lines.append(f"{self.name}_sum{labels} {_format_value(series[-2])}")
+                lines.append(f"{self.name}_count{labels} {series[-1]}")
+        return lines
+
+
+class Counter:
+    def __init__(self, name: str, help: str, labels: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *label_values: str, amount: float = 1):
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for label_values, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_format_labels(self.labels, label_values)} {_format_value(value)}")
+        return lines
+
+
+class MetricsRegistry:
+    """
+    Process-wide scrape metrics, exposed at /api/metrics.
+
+    Histograms and counters are fed by ScrapingService; pool, cache and
+    executor gauges are read from their stats() when the page is rendered.
+    """
+
+    def __init__(self):
+        self.phase_seconds = Histogram(
+            "scraper_phase_duration_seconds",
+            "Time spent in each scrape phase",
+            labels=("phase",),
+        )
+        self.scrape_seconds = Histogram(
+            "scraper_scrape_duration_seconds",
+            "End-to-end scrape time by strategy",
+            labels=("strategy",),
+        )
+        self.errors_total = Counter(
+            "scraper_errors_total",
+            "Scrape errors by phase",
+            labels=("phase",),
+        )
+
+    def observe_phases(self, phases: Dict[str, float]):
+        for phase, seconds in phases.items():
+            self.phase_seconds.observe(seconds, phase)
+
+    def observe_errors(self, errors: List[Dict[str, Any]]):
+        for error in errors:
+            self.errors_total.inc(error.get("phase", "unknown"))
+
+    def observe_scrape(self, strategy: Optional[str], seconds: float):
+        self.scrape_seconds.observe(seconds, strategy or "unknown")
+
+    def render(self) -> str:
+        lines = []
+        for metric in (self.phase_seconds, self.scrape_seconds, self.errors_total):
+            lines.extend(metric.render())
+
+        for name, help, kind, value in self._gauges():
+            lines.append(f"# HELP {name} {help}")
+            lines.append(f"# TYPE {name} {kind}")
+            lines.append(f"{name} {_format_value(value)}")
+
+        return "\n".join(lines) + "\n"
+
+    def _gauges(self) -> List[Tuple[str, str, str, float]]:
+        pool = browser_pool.stats()
+        http = http_client.stats()
+        limiter = rate_limiter.stats()
+        cache = result_cache.stats()
+        executor = parse_executor.stats()
+
+        gauges = [
+            ("scraper_browser_running", "1 if the shared browser is running", "gauge", int(pool["running"])),
+            ("scraper_browser_contexts_max", "Browser context limit", "gauge", pool["max_contexts"]),
+            ("scraper_browser_contexts_active", "Browser contexts in use", "gauge", pool["active_contexts"]),
+            ("scraper_browser_contexts_waiting", "Scrapes waiting for a browser context", "gauge", pool["waiting"]),
+            ("scraper_browser_launches_total", "Browser launches", "counter", pool["launches"]),
+            ("scraper_browser_context_wait_seconds_total", "Time spent waiting for a context", "counter", pool["total_wait_time"]),
+            ("scraper_http_requests_total", "HTTP requests sent", "counter", http["requests"]),
+            ("scraper_http_requests_active", "HTTP requests in flight", "gauge", http["active_requests"]),
+            ("scraper_http_hosts", "Hosts with a connection limiter", "gauge", http["hosts"]),
+            ("scraper_rate_limit_min_host_rate", "Requests per second allowed to the most throttled host", "gauge", limiter["min_host_rate"]),
+            ("scraper_rate_limit_waits_total", "Requests delayed by a host's rate limit", "counter", limiter["waits"]),
+            ("scraper_rate_limit_wait_seconds_total", "Time requests spent waiting for their host", "counter", limiter["total_wait_time"]),
+            ("scraper_http_throttled_total", "429 and 503 responses", "counter", limiter["throttled"]),
+            ("scraper_http_retries_total", "Requests retried", "counter", limiter["retries"]),
+            ("scraper_retry_budget_exceeded_total", "Requests that gave up within their retry budget", "counter", limiter["budget_exceeded"]),
+            ("scraper_cache_entries", "Entries in the memory cache", "gauge", cache["entries"]),
+            ("scraper_cache_bytes", "Estimated size of the memory cache", "gauge", cache["bytes"]),
+            ("scraper_cache_hits_total", "Fresh cache hits", "counter", cache["hits"]),
+            ("scraper_cache_revalidated_total", "Stale entries revalidated with a 304", "counter", cache["revalidated"]),
+            ("scraper_cache_misses_total", "Cache misses", "counter", cache["misses"]),
+            ("scraper_cache_evictions_total", "Memory cache evictions", "counter", cache["evictions"]),
+            ("scraper_cache_hit_ratio", "Hits and revalidations over all lookups", "gauge", cache["hit_rate"]),
+            ("scraper_parse_workers", "Parser worker processes", "gauge", executor["workers"]),
+            ("scraper_parse_pending", "Documents being parsed or waiting", "gauge", executor["pending"]),
+            ("scraper_parse_queue_depth", "Documents waiting for a parser worker", "gauge", executor["queue_depth"]),
+            ("scraper_parse_offloaded_total", "Documents parsed in a worker process", "counter", executor["offloaded"]),
+            ("scraper_parse_failures_total", "Parser worker crashes", "counter", executor["failures"]),
+        ]
+
+        for kind, queue in admission.stats().items():
+            gauges.extend([
+                (f"scraper_admission_{kind}_active", f"{kind.capitalize()} scrapes running", "gauge", queue["active"]),
+                (f"scraper_admission_{kind}_queue_depth", f"{kind.capitalize()} scrapes waiting for a slot", "gauge", queue["queued"]),
+                (f"scraper_admission_{kind}_wait_seconds_total", f"Time {kind} scrapes spent queued", "counter", queue["total_wait_time"]),
+                (f"scraper_admission_{kind}_admitted_total", f"{kind.capitalize()} scrapes admitted", "counter", queue["admitted"]),
+                (f"scraper_admission_{kind}_rejected_total", f"{kind.capitalize()} scrapes rejected with 429", "counter", queue["rejected"]),
+                (f"scraper_admission_{kind}_shed_total", f"{kind.capitalize()} scrapes shed for higher priority work", "counter", queue["shed"]),
+                (f"scraper_admission_{kind}_timed_out_total", f"{kind.capitalize()} scrapes that timed out queued", "counter", queue["timed_out"]),
+            ])
+        return gauges
+
+
+metrics = MetricsRegistry()
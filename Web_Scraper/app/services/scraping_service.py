@@ -1,9 +1,44 @@
+import asyncio
 import platform
+import time
+from datetime import datetime
+from typing import Dict, Any, Optional, AsyncIterator, Iterator, Tuple
+
 from app.scraper.static_scraper import StaticScraper
 from app.scraper.js_scraper import JSScraper
+from app.scraper.utils import ContentUtils
+from app.scraper.parsers import get_parser, ParsedDocument
+from app.scraper.executor import parse_executor
+from app.scraper.timings import PhaseTimings
+from app.scraper.projection import Projection, FULL_PROJECTION
+from app.scraper.http_client import http_client
+from app.services.cache import result_cache, CacheEntry
+from app.services.domain_profiles import domain_profiles
+from app.services.storage_states import storage_states
+from app.services.metrics import metrics
+from app.services.admission import admission, AdmissionRejected
+from app.models import ScrapeResponse, ScrapeResult, Section, Interactions, Error, Click, Meta, ResourceStats
+from app.config import settings
 
 class ScrapingService:
-    def __init__(self):
+    # Static results that are escalated even when the domain profile says
+    # static is enough: a page that is empty without JS, e.g. one SPA route
+    # on a mostly static site
+    PROFILE_ESCALATION_REASONS = {"spa-root", "no-sections"}
+
+    def __init__(
+        self,
+        mode: Optional[str] = None,
+        projection: Optional[Projection] = None,
+        priority: str = "interactive",
+    ):
+        self.mode = mode or settings.SCRAPE_MODE
+        self.projection = projection or FULL_PROJECTION
+        self.priority = priority  # Admission class: "interactive", "batch" or "background"
+        self.resources: Optional[Dict[str, Any]] = None  # Set when streaming a JS render
+        self.truncated = False  # Set when a streamed static document was cut off
+        self.observation: Dict[str, Any] = {}  # What this scrape teaches the domain profile
+        self.timings = PhaseTimings()
         self.errors = []
         self.interactions = {
             "clicks": [],
@@ -11,11 +46,446 @@ class ScrapingService:
             "pages": []
         }
 
-    async def scrape(self, url: str):
-        # ✅ ALWAYS try JS first
-        scraper = JSScraper(url)
+    async def scrape(self, url: str, use_cache: bool = True, cache_ttl: Optional[int] = None):
+        result = await self._scrape_cached(url, use_cache, cache_ttl)
+        metrics.observe_phases(self.timings.phases)
+        return result
+
+    async def _scrape_cached(self, url: str, use_cache: bool, cache_ttl: Optional[int]):
+        if not (use_cache and settings.CACHE_ENABLED):
+            result = await self._scrape(url)
+            result["cache"] = "bypass"
+            return result
+
+        key = result_cache.make_key(url, self.mode, self.projection.cache_variant)
+        with self.timings.phase("cache"):
+            entry = await result_cache.get(key)
+
+        if entry is not None:
+            if entry.is_fresh(max_age=cache_ttl):
+                result_cache.hits += 1
+                return self._from_cache(entry, "hit")
+
+            if entry.can_revalidate:
+                with self.timings.phase("revalidate"):
+                    not_modified = await self._revalidate(url, entry)
+                if not_modified:
+                    await result_cache.refresh(key, entry, cache_ttl)
+                    result_cache.revalidated += 1
+                    return self._from_cache(entry, "revalidated")
+
+        result_cache.misses += 1
+        result = await self._scrape(url)
+
+        # Only cache usable results so a transient failure is retried next time
+        if result.get("sections"):
+            validators = result.get("validators") or {}
+            await result_cache.set(
+                key,
+                {**result, "errors": list(self.errors)},
+                ttl=cache_ttl,
+                etag=validators.get("etag"),
+                last_modified=validators.get("last_modified"),
+            )
+
+        result["cache"] = "miss"
+        return result
+
+    def build_response(
+        self,
+        url: str,
+        result: Dict[str, Any],
+        processing_time: float,
+        include_timings: bool = False,
+    ) -> ScrapeResponse:
+        """Wrap a raw scrape result dict in the API response model"""
+        build_start = time.perf_counter()
+        interactions = result.get("interactions", {})
+        resources = result.get("resources")
+
+        # Everything here was produced (and typed) by the scrapers, so the
+        # models are constructed without validating the same data again
+        response = ScrapeResponse.model_construct(
+            result=ScrapeResult.model_construct(
+                url=url,
+                scrapedAt=datetime.utcnow().isoformat(),
+                meta=result.get("meta") or Meta(),
+                sections=result.get("sections", []),
+                interactions=Interactions.model_construct(
+                    clicks=[Click.model_construct(**click) for click in interactions.get("clicks", [])],
+                    scrolls=interactions.get("scrolls", 0),
+                    pages=interactions.get("pages", [])
+                ),
+                errors=[Error.model_construct(**error) for error in self.errors],
+                truncated=result.get("truncated", False)
+            ),
+            strategy=result.get("strategy", "static"),
+            processing_time=processing_time,
+            cache=result.get("cache"),
+            resources=ResourceStats.model_construct(**resources) if resources else None,
+            timings=None
+        )
+
+        build_time = time.perf_counter() - build_start
+        self.timings.add("build", build_time)
+        metrics.observe_phases({"build": build_time})
+        metrics.observe_scrape(response.strategy, processing_time)
+
+        if include_timings:
+            response.timings = self.timings.as_dict()
+        return response
+
+    def _from_cache(self, entry: CacheEntry, status: str) -> Dict[str, Any]:
+        result = dict(entry.result)
+        self.errors.extend(result.get("errors", []))
+        self.interactions.update(result.get("interactions", {}))
+        result["cache"] = status
+        return result
+
+    async def _revalidate(self, url: str, entry: CacheEntry) -> bool:
+        """Conditional GET; True if the server answered 304 Not Modified"""
+        headers = {}
+        if entry.etag:
+            headers["If-None-Match"] = entry.etag
+        if entry.last_modified:
+            headers["If-Modified-Since"] = entry.last_modified
+
+        try:
+            # Streamed so a changed page's body is not downloaded twice
+            async with http_client.stream(url, headers=headers) as response:
+                return response.status_code == 304
+        except Exception as e:
+            print(f"Revalidation failed for {url}: {str(e)}")
+            return False
+
+    async def _scrape(self, url: str) -> Dict[str, Any]:
+        plan = self._plan(url)
+
+        if self.mode == "static":
+            result = await self._scrape_static(url)
+        elif plan["mode"] == "js":
+            result = await self._scrape_js(url, plan)
+        else:
+            # Adaptive, including domains whose profile says static
+            result = await self._scrape_adaptive(url, plan)
+
+        if plan["profile"] and result.get("strategy") == plan["mode"]:
+            result["strategy"] = f"{plan['mode']}:profile"
+
+        await self._record_profile(url, bool(result.get("sections")) or result.get("unchanged", False))
+        metrics.observe_errors(self.errors)
+        return result
+
+    async def _scrape_static(self, url: str) -> Dict[str, Any]:
+        scraper = StaticScraper(url)
+
+        scraper.errors = self.errors
+        scraper.interactions = self.interactions
+        scraper.timings = self.timings
+        scraper.projection = self.projection
+
+        async with admission.slot("static", self.priority):
+            return await scraper.scrape()
+
+    async def _scrape_js(self, url: str, plan: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        plan = plan or self._plan(url)
+        scraper = self._js_scraper(url, plan)
+        async with admission.slot("js", self.priority):
+            result = await scraper.scrape()
+        await self._observe_render(scraper)
+        return result
+
+    async def _scrape_adaptive(self, url: str, plan: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """
+        Try the static scraper first and only escalate to Chromium when needed.
+        When the domain profile says static is enough, only a page that comes
+        back empty (PROFILE_ESCALATION_REASONS) is escalated.
+        """
+        plan = plan or self._plan(url)
+        static_scraper = StaticScraper(url)
+        static_scraper.timings = self.timings
+        static_scraper.projection = self.projection
+        async with admission.slot("static", self.priority):
+            result = await static_scraper.scrape()
+
+        reason = self._static_reason(result, static_scraper.errors)
+        self._observe_static(reason)
+        if plan["mode"] == "static" and reason not in self.PROFILE_ESCALATION_REASONS:
+            reason = None
+
+        if reason is None:
+            self.errors.extend(static_scraper.errors)
+            self.interactions.update(result.get("interactions", {}))
+            result["interactions"] = self.interactions
+            result["strategy"] = "static"
+            return result
+
+        print(f"Static result insufficient for {url} ({reason}), escalating to JS")
+        try:
+            static_result = result
+            result = await self._scrape_js(url, plan)
+        except AdmissionRejected as e:
+            # Under load, a usable static result beats no result
+            if not static_result.get("sections"):
+                raise
+            return self._shed_render(static_result, static_scraper.errors, e)
+
+        if result.get("strategy") == "js":
+            result["strategy"] = f"js:escalated:{reason}"
+        return result
+
+    def _shed_render(self, result: Dict[str, Any], static_errors: list, rejection: AdmissionRejected) -> Dict[str, Any]:
+        """The static result of an adaptive scrape whose JS render was not admitted"""
+        print(f"JS render not admitted ({rejection}), returning the static result")
+        self.errors.extend(static_errors)
+        self.errors.append({"message": f"JS render skipped: {rejection}", "phase": "admission"})
+        self.interactions.update(result.get("interactions", {}))
+        result["interactions"] = self.interactions
+        result["strategy"] = "static:shed"
+        return result
+
+    def _static_reason(self, result: Dict[str, Any], errors: list) -> Optional[str]:
+        # Same content as the client's snapshot, which was good enough then
+        if result.get("unchanged"):
+            return None
+
+        sections = result.get("sections", [])
+        return self._check_static_sufficiency(
+            bool(sections),
+            " ".join(section.content.text for section in sections),
+            result.get("spa_root", False),
+            errors
+        )
+
+    def _check_static_sufficiency(
+        self,
+        has_sections: bool,
+        text: str,
+        spa_root: bool,
+        errors: list,
+    ) -> Optional[str]:
+        """Return the reason the static result is not good enough, or None"""
+        if not has_sections and errors:
+            return "fetch-error"
+
+        if spa_root:
+            return "spa-root"
+
+        if not has_sections:
+            return "no-sections"
+
+        if not ContentUtils.estimate_text_completeness(text, settings.USE_JS_THRESHOLD):
+            return "insufficient-text"
+
+        return None
+
+    # ---------------- DOMAIN PROFILES ---------------- #
+
+    def _plan(self, url: str) -> Dict[str, Any]:
+        """
+        Strategy and interaction phases for url. Only adaptive scrapes use
+        (and teach) the domain profile; an explicit static / js mode is
+        always honoured.
+        """
+        plan = {"mode": self.mode, "scroll": True, "click": True, "profile": False}
+
+        if self.mode == "adaptive":
+            learned = domain_profiles.plan(url)
+            if learned is not None:
+                plan.update(learned)
+                plan["profile"] = learned["mode"] != "adaptive"
+
+        return plan
+
+    def _observe_static(self, reason: Optional[str]):
+        # A failed fetch says nothing about whether the site needs JS
+        if reason != "fetch-error":
+            self.observation["static_sufficient"] = reason is None
+
+    def _js_scraper(self, url: str, plan: Dict[str, Any]) -> JSScraper:
+        scraper = JSScraper(url, scroll=plan["scroll"], click=plan["click"])
+        scraper.errors = self.errors
+        scraper.interactions = self.interactions
+        scraper.timings = self.timings
+        scraper.projection = self.projection
+        # Start from the cookies / localStorage the domain's last render left
+        scraper.storage_state = storage_states.state_for(url)
+        return scraper
+
+    async def _observe_render(self, scraper: JSScraper):
+        if scraper.render_time is not None:
+            self.observation["render_time"] = scraper.render_time
+            await storage_states.save(scraper.url, scraper.storage_state)
+        for phase, gain in scraper.phase_gains.items():
+            self.observation[f"{phase}_gain"] = gain
+
+    async def _record_profile(self, url: str, succeeded: bool):
+        if not succeeded and self.errors:
+            self.observation["failure"] = self.errors[-1]["message"]
+        await domain_profiles.record(url, self.observation)
+
+    # ---------------- STREAMING ---------------- #
+
+    async def scrape_stream(
+        self,
+        url: str,
+        use_cache: bool = True,
+        cache_ttl: Optional[int] = None,
+    ) -> AsyncIterator[Tuple[str, Any]]:
+        """
+        Yield a scrape as ("meta", Meta), one ("section", Section) per section,
+        ("interactions", Interactions), ("errors", [Error]) and finally
+        ("end", {"strategy", "cache", "resources", "truncated", "fingerprint",
+        "unchanged", "timings"}).
+
+        The page is walked first (a large one by a StreamingParser as it
+        downloads); then each section is built on a worker thread and
+        yielded as soon as it is ready, with only STREAM_SECTION_BUFFER built
+        ahead. Sections are never held together, so streamed results are
+        only read from the cache, not written to it. As with scrape(), no
+        section is built when the page fingerprint is the projection's
+        known_fingerprint.
+        """
+        if use_cache and settings.CACHE_ENABLED:
+            with self.timings.phase("cache"):
+                key = result_cache.make_key(url, self.mode, self.projection.cache_variant)
+                entry = await result_cache.get(key)
+            if entry is not None and entry.is_fresh(max_age=cache_ttl):
+                result_cache.hits += 1
+                result = self._from_cache(entry, "hit")
+
+                yield "meta", result["meta"]
+                for section in result.get("sections", []):
+                    yield "section", section
+                yield "interactions", Interactions(**self.interactions)
+                yield "errors", [Error(**error) for error in self.errors]
+                metrics.observe_phases(self.timings.phases)
+                yield "end", {
+                    "strategy": result.get("strategy"),
+                    "cache": "hit",
+                    "resources": result.get("resources"),
+                    "truncated": result.get("truncated", False),
+                    "fingerprint": result.get("fingerprint"),
+                    "unchanged": False,
+                    "timings": self.timings.as_dict()
+                }
+                return
+
+        document, strategy = await self._load_document(url)
+        fingerprint = document.fingerprint
+        unchanged = fingerprint == self.projection.known_fingerprint
+
+        yield "meta", document.meta
+        if not unchanged:
+            async for section in parse_executor.iterate(self._build_sections(document)):
+                yield "section", section
+
+        self.errors.extend(document.parser.errors)
+        metrics.observe_phases(self.timings.phases)
+        metrics.observe_errors(self.errors)
+
+        yield "interactions", Interactions(**self.interactions)
+        yield "errors", [Error(**error) for error in self.errors]
+        yield "end", {
+            "strategy": strategy,
+            "cache": "bypass",
+            "resources": self.resources,
+            "truncated": self.truncated and strategy.startswith("static"),
+            "fingerprint": fingerprint,
+            "unchanged": unchanged,
+            "timings": self.timings.as_dict()
+        }
+
+    def _build_sections(self, document: ParsedDocument) -> Iterator[Section]:
+        """A document's sections, built one at a time (on a worker thread)"""
+        sections = document.iter_sections()
+        while True:
+            build_start = time.perf_counter()
+            section = next(sections, None)
+            self.timings.add("build", time.perf_counter() - build_start)
+            if section is None:
+                return
+            yield section
+
+    async def _load_document(self, url: str) -> Tuple[ParsedDocument, str]:
+        """Fetch (and render if needed) a page and walk it, following the plan for url"""
+        document, strategy = await self._load_planned_document(url)
+        await self._record_profile(url, document.has_sections)
+        return document, strategy
+
+    async def _load_planned_document(self, url: str) -> Tuple[ParsedDocument, str]:
+        """The streaming counterpart of _scrape: same plan, escalation and shedding"""
+        plan = self._plan(url)
+        suffix = ":profile" if plan["profile"] else ""
+        document = None
+
+        if plan["mode"] != "js":
+            document = await self._load_static(url)
+            if self.mode == "static":
+                return document, "static"
+
+            if document.fingerprint == self.projection.known_fingerprint:
+                # Same content as the client's snapshot, which was good enough then
+                reason = None
+            else:
+                reason = self._check_static_sufficiency(
+                    document.has_sections,
+                    document.text,
+                    document.spa_root,
+                    self.errors
+                )
+            self._observe_static(reason)
+            if plan["mode"] == "static" and reason not in self.PROFILE_ESCALATION_REASONS:
+                reason = None
+            if reason is None:
+                return document, "static" + suffix
+
+            print(f"Static result insufficient for {url} ({reason}), escalating to JS")
+            strategy = f"js:escalated:{reason}"
+        else:
+            strategy = "js" + suffix
+
+        scraper = self._js_scraper(url, plan)
+        try:
+            async with admission.slot("js", self.priority):
+                html = await scraper.render()
+        except AdmissionRejected as e:
+            # Under load, a usable static result beats no result
+            if document is None or not document.has_sections:
+                raise
+            print(f"JS render not admitted ({e}), returning the static result")
+            self.errors.append({"message": f"JS render skipped: {e}", "phase": "admission"})
+            return document, "static:shed"
+        except Exception as e:
+            self.errors.append({"message": str(e), "phase": "render"})
+            self.resources = scraper.resources
+
+            # Fall back to the static page, fetching it if we have not yet
+            if document is None:
+                document = await self._load_static(url)
+            return document, "static"
+
+        self.resources = scraper.resources
+        await self._observe_render(scraper)
+        parser = get_parser(url, projection=self.projection)
+        with self.timings.phase("parse"):
+            return await asyncio.to_thread(parser.load, html), strategy
 
+    async def _load_static(self, url: str) -> ParsedDocument:
+        scraper = StaticScraper(url)
         scraper.errors = self.errors
         scraper.interactions = self.interactions
+        scraper.timings = self.timings
+        scraper.projection = self.projection
+        parser = get_parser(url, projection=self.projection)
+        try:
+            async with admission.slot("static", self.priority):
+                document = await scraper.load(parser)
+        except AdmissionRejected:
+            raise
+        except Exception as e:
+            self.errors.append({"message": str(e), "phase": "fetch"})
+            document = await asyncio.to_thread(parser.load, "")
 
-        return await scraper.scrape()
+        self.truncated = scraper.truncated
+        return document
@@ -0,0 +1,179 @@
+import asyncio
+import json
+import sqlite3
+import threading
+import time
+from typing import Dict, Any, List, Optional, Tuple
+
+from app.models import ScrapeResponse, Section, SectionChanges
+from app.scraper.utils import URLUtils, ContentUtils
+from app.config import settings
+
+
+class SnapshotStore:
+    """
+    Section fingerprints of past scrapes, so a later scrape of the same URL
+    can return only what changed since (see ScrapeRequest.since).
+
+    A snapshot id is derived from the URL and the page fingerprint, so an
+    unchanged page keeps its snapshot id across scrapes.
+    """
+
+    def __init__(self, db_path: Optional[str] = settings.SNAPSHOT_DB_PATH):
+        self.db_path = db_path
+        self._db: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    # ---------------- LIFECYCLE ---------------- #
+
+    def open(self):
+        if self._db is not None:
+            return
+
+        self._db = sqlite3.connect(self.db_path or ":memory:", check_same_thread=False)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS snapshots ("
+            "id TEXT PRIMARY KEY, url TEXT NOT NULL, fingerprint TEXT NOT NULL, "
+            "sections TEXT NOT NULL, created_at REAL NOT NULL)"
+        )
+        self._db.execute(
+            "DELETE FROM snapshots WHERE created_at < ?",
+            (time.time() - settings.SNAPSHOT_RETENTION,),
+        )
+        self._db.commit()
+
+    def close(self):
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+
+    # ---------------- ACCESS ---------------- #
+
+    async def get(self, snapshot_id: str) -> Optional[Dict[str, Any]]:
+        """{"id", "url", "fingerprint", "sections": [[section id, fingerprint]]}, or None"""
+        if self._db is None:
+            return None
+        return await asyncio.to_thread(self._db_get, snapshot_id)
+
+    async def save(self, url: str, fingerprint: str, sections: List[Section]) -> str:
+        return await self.save_fingerprints(url, fingerprint, [[section.id, section.fingerprint] for section in sections])
+
+    async def save_fingerprints(self, url: str, fingerprint: str, sections: List[List[str]]) -> str:
+        """save() given [section id, fingerprint] pairs instead of sections"""
+        url = URLUtils.canonicalize_url(url)
+        snapshot_id = ContentUtils.generate_fingerprint([url, fingerprint])
+
+        if self._db is not None:
+            await asyncio.to_thread(self._db_set, snapshot_id, url, fingerprint, json.dumps(sections))
+        return snapshot_id
+
+    async def track(
+        self,
+        url: str,
+        result: Dict[str, Any],
+        response: ScrapeResponse,
+        since: Optional[Dict[str, Any]] = None,
+    ):
+        """
+        Record the scrape as a snapshot and, given the since snapshot,
+        reduce response.result.sections to the added and modified ones.
+        """
+        fingerprint = result.get("fingerprint")
+        if not settings.SNAPSHOTS_ENABLED or fingerprint is None:
+            return
+
+        if since is not None and (result.get("unchanged") or fingerprint == since["fingerprint"]):
+            # The client already has this page; nothing to diff
+            if self._db is not None:
+                await asyncio.to_thread(self._db_touch, since["id"])
+            response.snapshot = since["id"]
+            response.changes = SectionChanges(since=since["id"], unchanged=True)
+            response.result.sections = []
+            return
+
+        if not response.result.sections:
+            return
+
+        response.snapshot = await self.save(url, fingerprint, response.result.sections)
+        if since is not None:
+            response.changes, response.result.sections = self.diff(since, response.result.sections)
+
+    async def track_stream(
+        self,
+        url: str,
+        fingerprint: Optional[str],
+        unchanged: bool,
+        sections: List[List[str]],
+        since: Optional[Dict[str, Any]] = None,
+    ) -> Tuple[Optional[str], Optional[SectionChanges]]:
+        """
+        track() for a streamed scrape, whose sections were sent as they were
+        built: record its [section id, fingerprint] pairs and return
+        (snapshot id, changes since).
+        """
+        if not settings.SNAPSHOTS_ENABLED or fingerprint is None:
+            return None, None
+
+        if since is not None and (unchanged or fingerprint == since["fingerprint"]):
+            if self._db is not None:
+                await asyncio.to_thread(self._db_touch, since["id"])
+            return since["id"], SectionChanges(since=since["id"], unchanged=True)
+
+        if not sections:
+            return None, None
+
+        snapshot_id = await self.save_fingerprints(url, fingerprint, sections)
+        return snapshot_id, self.changes(since, sections) if since is not None else None
+
+    # ---------------- DIFF ---------------- #
+
+    def diff(self, since: Dict[str, Any], sections: List[Section]) -> Tuple[SectionChanges, List[Section]]:
+        """Changes against since, and the sections that were added or modified"""
+        changes = self.changes(since, [[section.id, section.fingerprint] for section in sections])
+        changed = set(changes.added) | set(changes.modified)
+        return changes, [section for section in sections if section.id in changed]
+
+    def changes(self, since: Dict[str, Any], sections: List[List[str]]) -> SectionChanges:
+        """Changes against since of the [section id, fingerprint] pairs of a scrape"""
+        previous = dict(since["sections"])
+        changes = SectionChanges(since=since["id"])
+
+        for section_id, fingerprint in sections:
+            if section_id not in previous:
+                changes.added.append(section_id)
+            elif previous[section_id] != fingerprint:
+                changes.modified.append(section_id)
+
+        current = {section_id for section_id, _ in sections}
+        changes.removed = [section_id for section_id in previous if section_id not in current]
+        return changes
+
+    # ---------------- PERSISTENCE ---------------- #
+
+    def _db_get(self, snapshot_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._db.execute(
+                "SELECT id, url, fingerprint, sections FROM snapshots WHERE id = ? AND created_at >= ?",
+                (snapshot_id, time.time() - settings.SNAPSHOT_RETENTION),
+            ).fetchone()
+
+        if row is None:
+            return None
+        return {"id": row[0], "url": row[1], "fingerprint": row[2], "sections": json.loads(row[3])}
+
+    def _db_set(self, snapshot_id: str, url: str, fingerprint: str, sections: str):
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO snapshots (id, url, fingerprint, sections, created_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (snapshot_id, url, fingerprint, sections, time.time()),
+            )
+            self._db.commit()
+
+    def _db_touch(self, snapshot_id: str):
+        with self._lock:
+            self._db.execute("UPDATE snapshots SET created_at = ? WHERE id = ?", (time.time(), snapshot_id))
+            self._db.commit()
+
+
+snapshots = SnapshotStore()
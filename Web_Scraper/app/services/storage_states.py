@@ -0,0 +1,173 @@
+import asyncio
+import json
+import sqlite3
+import threading
+import time
+from typing import Dict, Any, Optional
+from urllib.parse import urlparse
+
+from app.services.domain_profiles import domain_profiles, DomainProfileStore
+from app.config import settings
+
+
+class StorageStateStore:
+    """
+    Playwright storage state (cookies and localStorage) per domain, kept in
+    memory and persisted to SQLite (STORAGE_STATE_DB_PATH).
+
+    A render starts from the state its domain was left in by the previous
+    one, so consent banners that were already answered and first-visit
+    redirects are not shown again. A state captured by accepting the
+    consent banner (POST /api/storage-states/consent) is marked as such
+    and kept for STORAGE_STATE_CONSENT_TTL; the renders that reuse it keep
+    refreshing it.
+
+    Only cookies and origins of the domain itself (and its subdomains) are
+    kept, not those of third parties loaded by the page.
+    """
+
+    def __init__(self, db_path: Optional[str] = settings.STORAGE_STATE_DB_PATH):
+        self.db_path = db_path
+        self._states: Dict[str, Dict[str, Any]] = {}
+        self._db: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return settings.STORAGE_STATES_ENABLED
+
+    # ---------------- LIFECYCLE ---------------- #
+
+    def open(self):
+        if not self.db_path or self._db is not None:
+            return
+
+        self._db = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS storage_states ("
+            "domain TEXT PRIMARY KEY, state TEXT NOT NULL, consent INTEGER NOT NULL, "
+            "expires_at REAL NOT NULL, updated_at REAL NOT NULL)"
+        )
+        self._db.execute("DELETE FROM storage_states WHERE expires_at < ?", (time.time(),))
+        self._db.commit()
+
+        rows = self._db.execute("SELECT domain, state, consent, expires_at, updated_at FROM storage_states")
+        for domain, state, consent, expires_at, updated_at in rows:
+            self._states[domain] = {
+                "state": json.loads(state),
+                "consent": bool(consent),
+                "expires_at": expires_at,
+                "updated_at": updated_at,
+            }
+
+    def close(self):
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+
+    # ---------------- ACCESS ---------------- #
+
+    def get(self, domain: str) -> Optional[Dict[str, Any]]:
+        """{"state", "consent", "expires_at", "updated_at"} of a domain, or None"""
+        entry = self._states.get(domain)
+        if entry is not None and entry["expires_at"] < time.time():
+            self._states.pop(domain, None)
+            return None
+        return entry
+
+    def state_for(self, url: str) -> Optional[Dict[str, Any]]:
+        """Storage state to load into a new context rendering url"""
+        if not self.enabled:
+            return None
+
+        entry = self.get(domain_profiles.domain_for(url))
+        return entry["state"] if entry is not None else None
+
+    async def save(self, url: str, state: Optional[Dict[str, Any]], consent: bool = False):
+        """Remember the state a render of url left its context in"""
+        if not self.enabled or not state:
+            return
+
+        domain = domain_profiles.domain_for(url)
+        state = self._own_state(domain, state)
+        data = json.dumps(state)
+        if len(data) > settings.STORAGE_STATE_MAX_BYTES:
+            print(f"Storage state for {domain} is {len(data)} bytes, not keeping it")
+            return
+
+        # A consent state stays one while renders that started from it refresh it
+        previous = self.get(domain)
+        consent = consent or (previous is not None and previous["consent"])
+
+        now = time.time()
+        ttl = settings.STORAGE_STATE_CONSENT_TTL if consent else settings.STORAGE_STATE_TTL
+        entry = self._states[domain] = {
+            "state": state,
+            "consent": consent,
+            "expires_at": now + ttl,
+            "updated_at": now,
+        }
+
+        if self._db is not None:
+            await asyncio.to_thread(self._db_set, domain, data, consent, entry["expires_at"], now)
+
+    async def delete(self, domain: str) -> bool:
+        if self._states.pop(domain, None) is None:
+            return False
+
+        if self._db is not None:
+            await asyncio.to_thread(self._db_delete, domain)
+        return True
+
+    def describe(self, domain: str) -> Optional[Dict[str, Any]]:
+        entry = self.get(domain)
+        if entry is None:
+            return None
+
+        return {
+            "domain": domain,
+            "consent": entry["consent"],
+            "cookies": len(entry["state"].get("cookies", [])),
+            "origins": len(entry["state"].get("origins", [])),
+            "expires_at": entry["expires_at"],
+            "updated_at": entry["updated_at"],
+        }
+
+    # ---------------- FILTERING ---------------- #
+
+    @staticmethod
+    def _own_state(domain: str, state: Dict[str, Any]) -> Dict[str, Any]:
+        """Cookies and origins of domain, its subdomains and parents; expired cookies are dropped"""
+        def belongs(host: str) -> bool:
+            host = DomainProfileStore.normalize_domain(host.lstrip("."))
+            return host == domain or domain.endswith("." + host) or host.endswith("." + domain)
+
+        now = time.time()
+        cookies = [
+            cookie for cookie in state.get("cookies", [])
+            if belongs(cookie.get("domain", "")) and not (0 < cookie.get("expires", -1) < now)
+        ]
+        origins = [
+            origin for origin in state.get("origins", [])
+            if belongs(urlparse(origin.get("origin", "")).hostname or "")
+        ]
+        return {"cookies": cookies, "origins": origins}
+
+    # ---------------- PERSISTENCE ---------------- #
+
+    def _db_set(self, domain: str, state: str, consent: bool, expires_at: float, updated_at: float):
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO storage_states (domain, state, consent, expires_at, updated_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (domain, state, int(consent), expires_at, updated_at),
+            )
+            self._db.commit()
+
+    def _db_delete(self, domain: str):
+        with self._lock:
+            self._db.execute("DELETE FROM storage_states WHERE domain = ?", (domain,))
+            self._db.commit()
+
+
+storage_states = StorageStateStore()
@@ -0,0 +1,154 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional
+
+# Deterministic filler text, so every run serves byte-identical pages
+WORDS = (
+    "scraper section content render parse browser static dynamic page "
+    "network latency throughput element heading article layout"
+).split()
+
+
+def _text(seed: int, words: int) -> str:
+    return " ".join(WORDS[(seed * 7 + i * 3) % len(WORDS)] for i in range(words))
+
+
+def _page(title: str, body: str, head: str = "") -> str:
+    return (
+        "<!doctype html><html lang=\"en\"><head><meta charset=\"utf-8\">"
+        f"<title>{title}</title><meta name=\"description\" content=\"{title} fixture\">{head}"
+        f"</head><body>{body}</body></html>"
+    )
+
+
+def static_page() -> str:
+    """A typical server-rendered article"""
+    sections = "".join(
+        f"<section><h2>Topic {i}</h2><p>{_text(i, 80)}</p>"
+        f"<a href=\"/static?ref={i}\">More on topic {i}</a></section>"
+        for i in range(8)
+    )
+    body = (
+        "<header><nav><a href=\"/\">Home</a> <a href=\"/static\">Docs</a></nav>"
+        "<h1>Static fixture</h1></header>"
+        f"<main>{sections}</main><footer><p>Footer {_text(99, 12)}</p></footer>"
+    )
+    return _page("Static", body)
+
+
+def spa_page() -> str:
+    """Empty mount point filled by an inline script (needs JS)"""
+    items = "".join(f"<section><h2>Card {i}</h2><p>{_text(i, 40)}</p></section>" for i in range(10))
+    script = (
+        "<script>document.addEventListener('DOMContentLoaded', () => {"
+        "setTimeout(() => { document.getElementById('root').innerHTML = "
+        f"'<main><h1>SPA fixture</h1>{items}</main>'; }}, 50); }});</script>"
+    )
+    return _page("SPA", "<div id=\"root\"></div>" + script)
+
+
+def infinite_scroll_page() -> str:
+    """Appends a batch of items whenever the bottom is reached, five times"""
+    script = (
+        "<script>let batch = 0;"
+        "function load() { const list = document.getElementById('list');"
+        "for (let i = 0; i < 20; i++) { const p = document.createElement('p');"
+        "p.style.height = '80px'; p.textContent = 'Item ' + (batch * 20 + i) + ' "
+        f"{_text(3, 12)}'; list.appendChild(p); }} batch++; }}"
+        "load(); window.addEventListener('scroll', () => {"
+        "if (batch < 6 && window.innerHeight + window.scrollY >= document.body.scrollHeight - 50) "
+        "setTimeout(load, 100); });</script>"
+    )
+    body = "<main><h1>Infinite scroll fixture</h1><section id=\"list\"></section></main>" + script
+    return _page("Infinite scroll", body)
+
+
+def huge_dom_page() -> str:
+    """~1 MB of markup, large enough to be parsed in a worker process"""
+    rows = "".join(
+        f"<div class=\"row\"><span>{i}</span><p>{_text(i, 25)}</p>"
+        f"<a href=\"/item/{i}\">item {i}</a><img src=\"/img/{i}.png\" alt=\"\"></div>"
+        for i in range(4000)
+    )
+    body = f"<main><h1>Huge DOM fixture</h1><section>{rows}</section></main>"
+    return _page("Huge DOM", body)
+
+
+def nested_sections_page() -> str:
+    """Semantic sections nested several levels deep"""
+    def nest(depth: int, index: int) -> str:
+        if depth == 0:
+            return f"<p>{_text(index, 30)}</p>"
+        children = "".join(nest(depth - 1, index * 3 + i) for i in range(3))
+        tag = "article" if depth % 2 else "section"
+        return f"<{tag}><h3>Level {depth} / {index}</h3><p>{_text(index, 10)}</p>{children}</{tag}>"
+
+    body = "<header><h1>Nested fixture</h1></header><main>" + nest(4, 1) + "</main>"
+    return _page("Nested", body)
+
+
+# Fixture name -> (path, page builder, needs JavaScript)
+FIXTURES: Dict[str, tuple] = {
+    "static": ("/static", static_page, False),
+    "spa": ("/spa", spa_page, True),
+    "infinite_scroll": ("/infinite-scroll", infinite_scroll_page, True),
+    "huge_dom": ("/huge-dom", huge_dom_page, False),
+    "nested_sections": ("/nested-sections", nested_sections_page, False),
+}
+
+
+class FixtureServer:
+    """Serves the fixture corpus from memory on 127.0.0.1, in a background thread"""
+
+    def __init__(self, port: int = 0):
+        self.port = port
+        self.pages: Dict[str, bytes] = {
+            path: build().encode("utf-8") for path, build, _ in FIXTURES.values()
+        }
+        self._server: Optional[ThreadingHTTPServer] = None
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self.port}"
+
+    def url(self, fixture: str) -> str:
+        return self.base_url + FIXTURES[fixture][0]
+
+    def start(self):
+        pages = self.pages
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            # Headers and body are separate writes; without this, Nagle's
+            # algorithm adds ~40 ms to every keep-alive response
+            disable_nagle_algorithm = True
+
+            def do_GET(self):
+                body = pages.get(self.path.split("?", 1)[0])
+                if body is None:
+                    # Images and links in the fixtures all end up here
+                    body = b"not found"
+                    self.send_response(404)
+                    self.send_header("Content-Type", "text/plain")
+                else:
+                    self.send_response(200)
+                    self.send_header("Content-Type", "text/html; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", self.port), Handler)
+        self._server.daemon_threads = True
+        self.port = self._server.server_address[1]
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
@@ -0,0 +1,502 @@
+"""
+Offline benchmark suite.
+
+Serves a corpus of fixture pages from a local HTTP server and measures
+the scrapers against it. Nothing touches the network.
+
+    python -m benchmarks.run
+    python -m benchmarks.run --targets static,api --concurrency 1,8 --requests 50
+    python -m benchmarks.run --compare benchmarks/results/baseline.json
+
+Targets:
+    parse      every parser backend on every fixture (no I/O)
+    serialize  response building + JSON encoding, FastAPI's default
+               path against FastJSONResponse (no I/O)
+    static     StaticScraper
+    js         JSScraper (skipped if Chromium cannot be launched)
+    api        POST /api/scrape on a uvicorn subprocess
+
+Results are written as JSON (benchmarks/results/ by default). With
+--compare, p95 latency and pages/sec are checked against an earlier
+run and the exit code is 1 if any result regressed by more than
+--threshold.
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from typing import Dict, Any, List, Optional, Callable, Awaitable, Tuple
+
+# Benchmarks measure scraping, not learned shortcuts or leftover state
+os.environ.setdefault("PROFILES_ENABLED", "false")
+os.environ.setdefault("CACHE_ENABLED", "false")
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+import httpx
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from benchmarks.fixtures import FIXTURES, FixtureServer
+from app.config import settings
+from app.scraper.parsers import PARSERS
+from app.scraper.static_scraper import StaticScraper
+from app.scraper.js_scraper import JSScraper
+from app.scraper.browser_pool import browser_pool
+from app.scraper.http_client import http_client
+from app.scraper.executor import parse_executor
+from app.services.scraping_service import ScrapingService
+from app.models import ScrapeResponse
+from app.api.responses import FastJSONResponse
+
+TARGETS = ["parse", "serialize", "static", "js", "api"]
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), "results")
+
+# (succeeded, phase timings) for one scrape
+Call = Callable[[], Awaitable[Tuple[bool, Dict[str, float]]]]
+
+
+# ---------------- STATISTICS ---------------- #
+
+def percentile(values: List[float], q: float) -> Optional[float]:
+    """Nearest-rank percentile (q in 0..100)"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(1, int(round(q / 100 * len(ordered) + 0.5)))
+    return ordered[min(rank, len(ordered)) - 1]
+
+
+def summarize(latencies: List[float], phases: List[Dict[str, float]], errors: int, wall_time: float) -> Dict[str, Any]:
+    phase_totals: Dict[str, float] = {}
+    for timings in phases:
+        for phase, seconds in timings.items():
+            phase_totals[phase] = phase_totals.get(phase, 0.0) + seconds
+
+    return {
+        "requests": len(latencies) + errors,
+        "errors": errors,
+        "latency": {
+            "p50": percentile(latencies, 50),
+            "p95": percentile(latencies, 95),
+            "p99": percentile(latencies, 99),
+            "mean": sum(latencies) / len(latencies) if latencies else None,
+            "max": max(latencies) if latencies else None,
+        },
+        "pages_per_sec": len(latencies) / wall_time if wall_time > 0 else None,
+        # Mean seconds per successful request
+        "phases": {
+            phase: total / len(phases) for phase, total in sorted(phase_totals.items())
+        } if phases else {},
+    }
+
+
+def peak_rss_mb(pid: Optional[int] = None) -> Optional[float]:
+    """Peak RSS of this process, or of pid (Linux only)"""
+    if pid is not None:
+        try:
+            with open(f"/proc/{pid}/status") as status:
+                for line in status:
+                    if line.startswith("VmHWM:"):
+                        return int(line.split()[1]) / 1024
+        except OSError:
+            return None
+        return None
+
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+# ---------------- LOAD ---------------- #
+
+async def run_load(call: Call, requests: int, concurrency: int, warmup: int = 1) -> Dict[str, Any]:
+    # Unmeasured requests first: connection setup, worker start, first launch
+    for _ in range(warmup):
+        try:
+            await call()
+        except Exception:
+            pass
+
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: List[float] = []
+    phases: List[Dict[str, float]] = []
+    errors = 0
+
+    async def one():
+        nonlocal errors
+        async with semaphore:
+            start = time.perf_counter()
+            try:
+                ok, timings = await call()
+            except Exception:
+                ok, timings = False, {}
+            elapsed = time.perf_counter() - start
+
+        if ok:
+            latencies.append(elapsed)
+            phases.append(timings)
+        else:
+            errors += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(requests)))
+    return summarize(latencies, phases, errors, time.perf_counter() - start)
+
+
+def static_call(url: str) -> Call:
+    async def call():
+        scraper = StaticScraper(url)
+        await scraper.scrape()
+        # An SPA shell without sections is still a successful fetch
+        return not scraper.errors, scraper.timings.phases
+    return call
+
+
+def js_call(url: str) -> Call:
+    async def call():
+        scraper = JSScraper(url)
+        result = await scraper.scrape()
+        ok = result.get("strategy") == "js" and bool(result.get("sections"))
+        return ok, scraper.timings.phases
+    return call
+
+
+def api_call(client: httpx.AsyncClient, url: str) -> Call:
+    async def call():
+        response = await client.post(
+            "/api/scrape",
+            json={"url": url, "include_timings": True, "use_cache": False}
+        )
+        if response.status_code != 200:
+            return False, {}
+        data = response.json()
+        return not data["result"]["errors"], data.get("timings") or {}
+    return call
+
+
+# ---------------- TARGETS ---------------- #
+
+def bench_parse(server: FixtureServer, fixtures: List[str], requests: int) -> List[Dict[str, Any]]:
+    results = []
+    for fixture in fixtures:
+        html = server.pages[FIXTURES[fixture][0]].decode("utf-8")
+        for backend, parser_class in PARSERS.items():
+            latencies = []
+            start = time.perf_counter()
+            for _ in range(requests):
+                parse_start = time.perf_counter()
+                parser_class(server.url(fixture)).parse(html)
+                latencies.append(time.perf_counter() - parse_start)
+
+            summary = summarize(latencies, [], 0, time.perf_counter() - start)
+            results.append({
+                "target": f"parse:{backend}",
+                "fixture": fixture,
+                "concurrency": 1,
+                **summary,
+                "peak_rss_mb": peak_rss_mb(),
+            })
+    return results
+
+
+def bench_serialize(server: FixtureServer, fixtures: List[str], requests: int) -> List[Dict[str, Any]]:
+    def standard(result: Dict[str, Any]) -> bytes:
+        # What FastAPI does with a returned model: validate it against
+        # response_model, run jsonable_encoder, then json.dumps
+        response = ScrapingService().build_response("", result, 0)
+        validated = ScrapeResponse.model_validate(response.model_dump())
+        return JSONResponse(jsonable_encoder(validated.model_dump(mode="json"))).body
+
+    def fast(result: Dict[str, Any]) -> bytes:
+        return FastJSONResponse(ScrapingService().build_response("", result, 0)).body
+
+    results = []
+    for fixture in fixtures:
+        html = server.pages[FIXTURES[fixture][0]].decode("utf-8")
+        result = PARSERS[settings.PARSER_BACKEND](server.url(fixture)).parse(html)
+
+        for name, serialize in (("standard", standard), ("fast", fast)):
+            latencies = []
+            start = time.perf_counter()
+            for _ in range(requests):
+                serialize_start = time.perf_counter()
+                body = serialize(result)
+                latencies.append(time.perf_counter() - serialize_start)
+
+            summary = summarize(latencies, [], 0, time.perf_counter() - start)
+            results.append({
+                "target": f"serialize:{name}",
+                "fixture": fixture,
+                "concurrency": 1,
+                **summary,
+                "bytes": len(body),
+                "peak_rss_mb": peak_rss_mb(),
+            })
+    return results
+
+
+async def bench_in_process(
+    target: str,
+    server: FixtureServer,
+    fixtures: List[str],
+    concurrencies: List[int],
+    requests: int,
+    warmup: int,
+) -> List[Dict[str, Any]]:
+    make_call = static_call if target == "static" else js_call
+    results = []
+    for fixture in fixtures:
+        for concurrency in concurrencies:
+            summary = await run_load(make_call(server.url(fixture)), requests, concurrency, warmup)
+            results.append({
+                "target": target,
+                "fixture": fixture,
+                "concurrency": concurrency,
+                **summary,
+                # Cumulative for the whole run; Chromium processes are not included
+                "peak_rss_mb": peak_rss_mb(),
+            })
+    return results
+
+
+async def bench_api(
+    server: FixtureServer,
+    fixtures: List[str],
+    concurrencies: List[int],
+    requests: int,
+    warmup: int,
+    port: int,
+) -> List[Dict[str, Any]]:
+    with tempfile.TemporaryDirectory() as tmp:
+        env = dict(
+            os.environ,
+            JOB_DB_PATH=os.path.join(tmp, "jobs.sqlite3"),
+            PROFILE_DB_PATH="",
+            CACHE_DB_PATH="",
+        )
+        process = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "app.main:app", "--host", "127.0.0.1", "--port", str(port)],
+            env=env,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+        try:
+            async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}", timeout=120) as client:
+                await wait_until_ready(client, process)
+
+                results = []
+                for fixture in fixtures:
+                    for concurrency in concurrencies:
+                        summary = await run_load(api_call(client, server.url(fixture)), requests, concurrency, warmup)
+                        results.append({
+                            "target": "api",
+                            "fixture": fixture,
+                            "concurrency": concurrency,
+                            **summary,
+                            "peak_rss_mb": peak_rss_mb(process.pid),
+                        })
+                return results
+        finally:
+            process.terminate()
+            process.wait(timeout=30)
+
+
+async def wait_until_ready(client: httpx.AsyncClient, process: subprocess.Popen, timeout: float = 60):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"API server exited with code {process.returncode}")
+        try:
+            if (await client.get("/api/healthz")).status_code == 200:
+                return
+        except httpx.TransportError:
+            pass
+        await asyncio.sleep(0.25)
+    raise RuntimeError("API server did not become ready")
+
+
+# ---------------- REPORTING ---------------- #
+
+def compare(results: List[Dict[str, Any]], baseline: Dict[str, Any], threshold: float) -> List[Dict[str, Any]]:
+    """Results whose p95 latency rose or throughput fell by more than threshold"""
+    previous = {
+        (item["target"], item["fixture"], item["concurrency"]): item
+        for item in baseline.get("results", [])
+    }
+
+    regressions = []
+    for item in results:
+        old = previous.get((item["target"], item["fixture"], item["concurrency"]))
+        if old is None:
+            continue
+
+        checks = [
+            ("p95", item["latency"]["p95"], old["latency"]["p95"], lambda new, before: new > before * (1 + threshold)),
+            ("pages_per_sec", item["pages_per_sec"], old["pages_per_sec"], lambda new, before: new < before * (1 - threshold)),
+        ]
+        for metric, new, before, regressed in checks:
+            if new is not None and before and regressed(new, before):
+                regressions.append({
+                    "target": item["target"],
+                    "fixture": item["fixture"],
+                    "concurrency": item["concurrency"],
+                    "metric": metric,
+                    "baseline": before,
+                    "current": new,
+                    "change": (new - before) / before,
+                })
+    return regressions
+
+
+def print_table(results: List[Dict[str, Any]]):
+    def ms(value: Optional[float]) -> str:
+        return f"{value * 1000:9.1f}" if value is not None else "        -"
+
+    print(f"{'target':<20}{'fixture':<17}{'conc':>5}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'pages/s':>10}{'errors':>8}{'rss MB':>9}")
+    for item in results:
+        latency = item["latency"]
+        pages = f"{item['pages_per_sec']:10.1f}" if item["pages_per_sec"] is not None else "         -"
+        rss = f"{item['peak_rss_mb']:9.1f}" if item.get("peak_rss_mb") is not None else "        -"
+        print(
+            f"{item['target']:<20}{item['fixture']:<17}{item['concurrency']:>5}"
+            f" {ms(latency['p50'])} {ms(latency['p95'])} {ms(latency['p99'])}{pages}{item['errors']:>8}{rss}"
+        )
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except Exception:
+        return None
+
+
+# ---------------- MAIN ---------------- #
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Offline scraper benchmarks")
+    parser.add_argument("--targets", default=",".join(TARGETS), help=f"comma-separated subset of {TARGETS}")
+    parser.add_argument("--fixtures", default=",".join(FIXTURES), help=f"comma-separated subset of {list(FIXTURES)}")
+    parser.add_argument("--concurrency", default="1,4", help="comma-separated concurrency levels")
+    parser.add_argument("--requests", type=int, default=20, help="requests per target, fixture and concurrency")
+    parser.add_argument("--warmup", type=int, default=1, help="unmeasured requests before each measurement")
+    parser.add_argument("--api-port", type=int, default=8765)
+    parser.add_argument("--output", help="result file (default: benchmarks/results/<timestamp>.json)")
+    parser.add_argument("--compare", help="earlier result file to check for regressions")
+    parser.add_argument("--threshold", type=float, default=0.15, help="allowed relative slowdown (0.15 = 15%%)")
+    return parser.parse_args(argv)
+
+
+async def run(args: argparse.Namespace) -> Dict[str, Any]:
+    targets = [target for target in args.targets.split(",") if target]
+    fixtures = [fixture for fixture in args.fixtures.split(",") if fixture]
+    concurrencies = [int(level) for level in args.concurrency.split(",") if level]
+
+    unknown = set(targets) - set(TARGETS) or set(fixtures) - set(FIXTURES)
+    if unknown:
+        raise SystemExit(f"Unknown targets / fixtures: {', '.join(sorted(unknown))}")
+
+    server = FixtureServer()
+    server.start()
+    print(f"Serving fixtures on {server.base_url}")
+
+    results: List[Dict[str, Any]] = []
+    skipped: Dict[str, str] = {}
+    try:
+        if "parse" in targets:
+            results += bench_parse(server, fixtures, args.requests)
+
+        if "serialize" in targets:
+            results += bench_serialize(server, fixtures, args.requests)
+
+        if "static" in targets or "js" in targets:
+            await http_client.start()
+            parse_executor.start()
+            try:
+                if "static" in targets:
+                    results += await bench_in_process("static", server, fixtures, concurrencies, args.requests, args.warmup)
+
+                if "js" in targets:
+                    try:
+                        await browser_pool.start()
+                    except Exception as e:
+                        skipped["js"] = f"browser could not be launched: {str(e).splitlines()[0]}"
+                    else:
+                        results += await bench_in_process("js", server, fixtures, concurrencies, args.requests, args.warmup)
+            finally:
+                await browser_pool.close()
+                await http_client.close()
+                parse_executor.close()
+
+        if "api" in targets:
+            results += await bench_api(server, fixtures, concurrencies, args.requests, args.warmup, args.api_port)
+    finally:
+        server.stop()
+
+    return {
+        "meta": {
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "commit": git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "requests": args.requests,
+            "warmup": args.warmup,
+            "parser_backend": settings.PARSER_BACKEND,
+            "parse_workers": settings.PARSE_WORKERS,
+            "skipped": skipped,
+        },
+        "results": results,
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = parse_args(argv)
+    report = asyncio.run(run(args))
+
+    print()
+    print_table(report["results"])
+    for target, reason in report["meta"]["skipped"].items():
+        print(f"Skipped {target}: {reason}")
+
+    exit_code = 0
+    if args.compare:
+        with open(args.compare) as baseline_file:
+            regressions = compare(report["results"], json.load(baseline_file), args.threshold)
+        report["regressions"] = regressions
+
+        for item in regressions:
+            print(
+                f"REGRESSION {item['target']} {item['fixture']} c={item['concurrency']} "
+                f"{item['metric']}: {item['baseline']:.4f} -> {item['current']:.4f} ({item['change']:+.0%})"
+            )
+        if regressions:
+            exit_code = 1
+        else:
+            print(f"No regressions against {args.compare}")
+
+    output = args.output
+    if output is None:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        output = os.path.join(RESULTS_DIR, datetime.now().strftime("%Y%m%d-%H%M%S") + ".json")
+    with open(output, "w") as output_file:
+        json.dump(report, output_file, indent=2)
+    print(f"Results written to {output}")
+
+    return exit_code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,66 @@
+import pytest
+
+from app.config import settings
+from app.services import scraping_service
+from app.services.domain_profiles import DomainProfileStore
+from app.services.scraping_service import ScrapingService
+from benchmarks.fixtures import FixtureServer
+
+
+@pytest.fixture
+def fixture_server():
+    server = FixtureServer()
+    server.start()
+    yield server
+    server.stop()
+
+
+@pytest.fixture
+def profiles(monkeypatch):
+    store = DomainProfileStore(db_path=None)
+    monkeypatch.setattr(scraping_service, "domain_profiles", store)
+    monkeypatch.setattr(settings, "PROFILES_ENABLED", True)
+    return store
+
+
+@pytest.fixture
+def renders(monkeypatch):
+    """Stand-in for Chromium: records the URLs that were escalated to JS"""
+    rendered = []
+
+    async def scrape_js(self, url, plan=None):
+        rendered.append(url)
+        return {"meta": None, "sections": [], "strategy": "js"}
+
+    monkeypatch.setattr(ScrapingService, "_scrape_js", scrape_js)
+    return rendered
+
+
+async def _scrape(url, mode="adaptive"):
+    return await ScrapingService(mode=mode).scrape(url, use_cache=False)
+
+
+@pytest.mark.asyncio
+async def test_static_profile_still_escalates_empty_pages(fixture_server, profiles, renders):
+    static_url = fixture_server.url("static")
+    for _ in range(6):
+        await _scrape(static_url)
+    assert profiles.plan(static_url)["mode"] == "static"
+    assert (await _scrape(static_url))["strategy"] == "static:profile"
+
+    # An SPA route on the same (mostly static) domain
+    spa_url = fixture_server.url("spa")
+    result = await _scrape(spa_url)
+
+    assert renders == [spa_url]
+    assert result["strategy"] == "js:escalated:spa-root"
+
+
+@pytest.mark.asyncio
+async def test_explicit_static_mode_does_not_train_the_profile(fixture_server, profiles, renders):
+    url = fixture_server.url("static")
+    for _ in range(6):
+        await _scrape(url, mode="static")
+
+    assert profiles.plan(url) is None
+    assert renders == []
@@ -0,0 +1,38 @@
+import pytest
+
+from app.scraper.parsers import BeautifulSoupParser, SelectolaxParser, StreamingParser
+from benchmarks.fixtures import FIXTURES
+
+# Small enough that every fixture is split across many feed() calls, with
+# tags and multi-byte characters cut in half
+CHUNK_SIZE = 997
+
+
+def _parse_streamed(url: str, html: str):
+    parser = StreamingParser(url)
+    data = html.encode("utf-8")
+    for start in range(0, len(data), CHUNK_SIZE):
+        parser.feed(data[start:start + CHUNK_SIZE])
+    return parser.finish()
+
+
+def _sections(result):
+    # rawHtml is each engine's own serialization of the markup (attribute
+    # order, void tags), so it is the one field that may differ
+    return [section.model_dump(exclude={"rawHtml"}) for section in result["sections"]]
+
+
+@pytest.mark.skipif(SelectolaxParser is None, reason="selectolax is not installed")
+@pytest.mark.parametrize("fixture", sorted(FIXTURES))
+def test_parsers_agree(fixture):
+    path, build, _ = FIXTURES[fixture]
+    url = "http://fixtures.test" + path
+    html = build()
+
+    expected = BeautifulSoupParser(url).parse(html)
+    for result in (SelectolaxParser(url).parse(html), _parse_streamed(url, html)):
+        assert result["meta"] == expected["meta"]
+        assert _sections(result) == _sections(expected)
+        assert result["spa_root"] == expected["spa_root"]
+        assert result["pagination"] == expected["pagination"]
+        assert result["fingerprint"] == expected["fingerprint"]
@@ -0,0 +1,57 @@
+import pytest
+
+from app.config import settings
+from app.scraper import rate_limiter as rate_limiter_module
+from app.scraper.rate_limiter import HostRateLimiter
+
+URL = "http://example.test/page"
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Fake monotonic clock; tests advance it past RATE_LIMIT_DECREASE_INTERVAL"""
+    now = [1000.0]
+    monkeypatch.setattr(rate_limiter_module.time, "monotonic", lambda: now[0])
+    return now
+
+
+def _observe(limiter, clock, latency, kind="fetch"):
+    clock[0] += settings.RATE_LIMIT_DECREASE_INTERVAL
+    limiter.observe(URL, 200, latency, kind=kind)
+
+
+def _rate(limiter):
+    return limiter._bucket(URL).rate
+
+
+def test_navigations_do_not_throttle_static_fetches(clock):
+    limiter = HostRateLimiter()
+    for _ in range(5):
+        _observe(limiter, clock, 0.05)
+        _observe(limiter, clock, 1.2, kind="navigation")
+
+    assert _rate(limiter) > settings.RATE_LIMIT_INITIAL_RPS
+
+
+def test_rate_recovers_after_an_unusually_fast_response(clock):
+    limiter = HostRateLimiter()
+    _observe(limiter, clock, 0.01)
+    for _ in range(30):
+        _observe(limiter, clock, 0.2)
+
+    rate = _rate(limiter)
+    for _ in range(10):
+        _observe(limiter, clock, 0.2)
+
+    assert _rate(limiter) > rate
+    assert _rate(limiter) > settings.RATE_LIMIT_MIN_RPS
+
+
+def test_buckets_are_bounded(monkeypatch):
+    monkeypatch.setattr(settings, "RATE_LIMIT_MAX_HOSTS", 3)
+    limiter = HostRateLimiter()
+    for host in range(5):
+        limiter.observe(f"http://host{host}.test/", 200, 0.1)
+
+    assert limiter.stats()["hosts"] == 3
+    assert list(limiter._buckets) == ["host2.test", "host3.test", "host4.test"]